@@ -0,0 +1,223 @@
+"""Baseline schema and time-series indexes for climate data
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_climate_data_station_timestamp_source", "climate_data", ["station_id", "timestamp", "data_source"]),
+    ("ix_climate_data_timestamp_id", "climate_data", ["timestamp", "id"]),
+    ("ix_climate_data_created_at", "climate_data", ["created_at"]),
+    ("ix_risk_assessments_climate_data_id", "risk_assessments", ["climate_data_id"]),
+    ("ix_risk_assessments_created_at", "risk_assessments", ["created_at"])
+]
+
+
+def _create_table(existing, name, *columns, indexes=(), unique_indexes=()):
+    """Create a table and its column indexes unless it already exists."""
+    if name in existing:
+        return
+    op.create_table(name, *columns)
+    for column in indexes:
+        op.create_index(f"ix_{name}_{column}", name, [column])
+    for column in unique_indexes:
+        op.create_index(f"ix_{name}_{column}", name, [column], unique=True)
+
+
+def _create_tables(existing):
+    """Baseline tables, as the models defined them at this revision."""
+    _create_table(
+        existing, "weather_stations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("station_id", sa.String(50), nullable=False),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("elevation", sa.Float()),
+        sa.Column("country", sa.String(100)),
+        sa.Column("state", sa.String(100)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        indexes=["id"], unique_indexes=["station_id"]
+    )
+
+    _create_table(
+        existing, "climate_data",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("station_id", sa.Integer(), sa.ForeignKey("weather_stations.id"), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        *[
+            sa.Column(name, sa.Float())
+            for name in (
+                "temperature", "humidity", "pressure", "wind_speed", "wind_direction",
+                "precipitation", "visibility", "cloud_cover", "uv_index",
+                "pm25", "pm10", "co", "no2", "so2", "o3"
+            )
+        ],
+        sa.Column("data_source", sa.String(100)),
+        sa.Column("quality_score", sa.Float()),
+        sa.Column("blockchain_hash", sa.String(66)),
+        sa.Column("ipfs_hash", sa.String(100)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        indexes=["id"]
+    )
+
+    _create_table(
+        existing, "risk_assessments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("climate_data_id", sa.Integer(), sa.ForeignKey("climate_data.id"), nullable=False),
+        *[
+            sa.Column(name, sa.Float())
+            for name in (
+                "flood_risk", "drought_risk", "storm_risk", "heat_wave_risk",
+                "cold_wave_risk", "wildfire_risk", "overall_risk"
+            )
+        ],
+        sa.Column("model_version", sa.String(50)),
+        sa.Column("confidence_score", sa.Float()),
+        sa.Column("prediction_horizon", sa.Integer()),
+        sa.Column("risk_factors", sa.Text()),
+        sa.Column("recommendations", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        indexes=["id"]
+    )
+
+    _create_table(
+        existing, "climate_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("station_id", sa.Integer(), sa.ForeignKey("weather_stations.id"), nullable=False),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("metric", sa.String(30), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float()),
+        sa.Column("minimum", sa.Float()),
+        sa.Column("maximum", sa.Float()),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "granularity", "bucket_start", "metric", "station_id", name="uq_climate_rollups_bucket"
+        ),
+        indexes=["id", "computed_at"]
+    )
+
+    _create_table(
+        existing, "emergency_alerts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("alert_id", sa.String(100), nullable=False),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column(
+            "severity", sa.Enum("LOW", "MEDIUM", "HIGH", "CRITICAL", name="alertseverity"), nullable=False
+        ),
+        sa.Column("status", sa.Enum("ACTIVE", "RESOLVED", "CANCELLED", name="alertstatus")),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("radius", sa.Float()),
+        sa.Column("location_name", sa.String(200)),
+        sa.Column("risk_type", sa.String(50)),
+        sa.Column("risk_score", sa.Float()),
+        sa.Column("probability", sa.Float()),
+        sa.Column("start_time", sa.DateTime(timezone=True)),
+        sa.Column("end_time", sa.DateTime(timezone=True)),
+        sa.Column("issued_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("blockchain_hash", sa.String(66)),
+        sa.Column("verification_status", sa.Boolean()),
+        sa.Column("issuer", sa.String(100)),
+        sa.Column("source", sa.String(100)),
+        sa.Column("contact_info", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        indexes=["id"], unique_indexes=["alert_id"]
+    )
+
+    _create_table(
+        existing, "emergency_responses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("response_id", sa.String(100), nullable=False),
+        sa.Column("alert_id", sa.String(100), nullable=False),
+        sa.Column("response_type", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="responsestatus")
+        ),
+        sa.Column("priority", sa.Integer()),
+        sa.Column("personnel_count", sa.Integer()),
+        sa.Column("equipment_list", sa.Text()),
+        sa.Column("estimated_cost", sa.Float()),
+        sa.Column("deployment_location", sa.String(200)),
+        sa.Column("start_time", sa.DateTime(timezone=True)),
+        sa.Column("end_time", sa.DateTime(timezone=True)),
+        sa.Column("estimated_duration", sa.Integer()),
+        sa.Column("lead_agency", sa.String(100)),
+        sa.Column("supporting_agencies", sa.Text()),
+        sa.Column("contact_person", sa.String(100)),
+        sa.Column("contact_phone", sa.String(20)),
+        sa.Column("completion_percentage", sa.Float()),
+        sa.Column("status_updates", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        indexes=["id"], unique_indexes=["response_id"]
+    )
+
+    _create_table(
+        existing, "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("first_name", sa.String(100)),
+        sa.Column("last_name", sa.String(100)),
+        sa.Column("phone_number", sa.String(20)),
+        sa.Column(
+            "role",
+            sa.Enum(
+                "CITIZEN", "GOVERNMENT", "EMERGENCY_RESPONDER", "RESEARCHER", "ADMIN", name="userrole"
+            )
+        ),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("organization", sa.String(200)),
+        sa.Column("department", sa.String(100)),
+        sa.Column("position", sa.String(100)),
+        sa.Column("default_latitude", sa.String(20)),
+        sa.Column("default_longitude", sa.String(20)),
+        sa.Column("notification_radius", sa.Integer()),
+        sa.Column("wallet_address", sa.String(42)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_login", sa.DateTime(timezone=True)),
+        indexes=["id"], unique_indexes=["email", "username"]
+    )
+
+
+def upgrade():
+    # Tables have been created by create_tables() at startup so far; create
+    # any that are missing, then add the indexes to databases that predate them
+    bind = op.get_bind()
+    _create_tables(set(sa.inspect(bind).get_table_names()))
+
+    # Build indexes without blocking ingestion on PostgreSQL
+    concurrently = bind.dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, if_not_exists=True, postgresql_concurrently=concurrently
+            )
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
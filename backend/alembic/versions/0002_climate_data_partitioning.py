@@ -0,0 +1,36 @@
+"""Monthly range partitioning of climate data (PostgreSQL, opt-in)
+
+Applied only when CLIMATE_DATA_PARTITIONING is enabled. To enable it on a
+database already at this revision, run ``alembic downgrade 0001`` and
+``alembic upgrade head`` with the setting on.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+from app.core.config import settings
+from app.db.partitioning import (
+    is_partitioned, partition_climate_data, supports_partitioning, unpartition_climate_data
+)
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    connection = op.get_bind()
+    if not settings.CLIMATE_DATA_PARTITIONING or not supports_partitioning(connection):
+        return
+    if not is_partitioned(connection):
+        partition_climate_data(connection)
+
+
+def downgrade():
+    connection = op.get_bind()
+    if is_partitioned(connection):
+        unpartition_climate_data(connection)
@@ -0,0 +1,52 @@
+"""Unique ingestion dedup key on climate data
+
+Replaces the plain (station_id, timestamp, data_source) index with a unique
+one so concurrent ingestion can skip duplicates with ON CONFLICT DO NOTHING.
+Readings that already repeat the key are deleted first, keeping the oldest.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+from app.db.partitioning import delete_duplicate_readings, is_partitioned
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ["station_id", "timestamp", "data_source"]
+UNIQUE_INDEX = "uq_climate_data_station_timestamp_source"
+PLAIN_INDEX = "ix_climate_data_station_timestamp_source"
+
+
+def upgrade():
+    bind = op.get_bind()
+    delete_duplicate_readings(bind)
+
+    # Partitioned tables cannot be indexed concurrently
+    concurrently = bind.dialect.name == "postgresql" and not is_partitioned(bind)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            UNIQUE_INDEX, "climate_data", COLUMNS, unique=True,
+            if_not_exists=True, postgresql_concurrently=concurrently
+        )
+        op.drop_index(
+            PLAIN_INDEX, table_name="climate_data", if_exists=True, postgresql_concurrently=concurrently
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    concurrently = bind.dialect.name == "postgresql" and not is_partitioned(bind)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            PLAIN_INDEX, "climate_data", COLUMNS,
+            if_not_exists=True, postgresql_concurrently=concurrently
+        )
+        op.drop_index(
+            UNIQUE_INDEX, table_name="climate_data", if_exists=True, postgresql_concurrently=concurrently
+        )
@@ -4,10 +4,13 @@ import logging
 from typing import List, Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import select
 
-from app.db.database import get_db
+from app.db.database import SessionLocal, get_db, get_async_db
 from app.models.climate import ClimateData, WeatherStation, RiskAssessment
 from app.schemas.climate import (
     ClimateDataCreate, ClimateDataResponse,
@@ -16,14 +19,32 @@ from app.schemas.climate import (
 )
 from app.services.ai_prediction import PredictionService
 from app.services.data_ingestion import DataIngestionService
+from app.services.risk_batcher import RiskAssessmentBatcher
+from app.services.forecast_cache import ForecastCache
+from app.services.climate_rollups import climate_rollup_service
+from app.services.climate_export import (
+    EXPORT_FORMATS, ExportFormatError, climate_exporter, get_export_writer
+)
+from app.core.config import settings
 from app.core.security import get_current_active_user
 from app.models.user import User
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_after
+from app.utils.serialization import response_columns, rows_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+STATION_COLUMNS = response_columns(WeatherStation, WeatherStationResponse)
+CLIMATE_DATA_COLUMNS = response_columns(ClimateData, ClimateDataResponse)
+
 prediction_service = PredictionService()
 data_ingestion_service = DataIngestionService()
+risk_batcher = RiskAssessmentBatcher(prediction_service)
+forecast_cache = ForecastCache(
+    redis_url=settings.REDIS_URL if settings.FORECAST_CACHE_USE_REDIS else None,
+    serialize=lambda response: response.model_dump_json(),
+    deserialize=WeatherForecastResponse.model_validate_json
+)
 
 
 @router.post("/stations", response_model=WeatherStationResponse)
@@ -69,11 +90,18 @@ async def get_weather_stations(
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
     country: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get list of weather stations."""
+    """Get list of weather stations.
+    
+    Results are ordered by id. Pass the ``X-Next-Cursor`` response header
+    back as ``cursor`` to fetch the next page; ``skip`` is still accepted
+    for clients that page by position.
+    """
     try:
-        query = db.query(WeatherStation)
+        cursor_values = decode_cursor(cursor, 1)
+        query = select(*STATION_COLUMNS)
         
         if active_only:
             query = query.filter(WeatherStation.is_active == True)
@@ -81,9 +109,24 @@ async def get_weather_stations(
         if country:
             query = query.filter(WeatherStation.country.ilike(f"%{country}%"))
         
-        stations = query.offset(skip).limit(limit).all()
-        return stations
+        if cursor_values:
+            query = query.filter(keyset_after((WeatherStation.id,), cursor_values, descending=False))
+            skip = 0
+        
+        result = await db.execute(
+            query.order_by(WeatherStation.id).offset(skip).limit(limit + 1)
+        )
+        page = result.all()
+        
+        headers = {}
+        if len(page) > limit:
+            page = page[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(page[-1].id)
         
+        return rows_response(page, headers=headers)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching weather stations: {e}")
         raise HTTPException(
@@ -95,13 +138,14 @@ async def get_weather_stations(
 @router.get("/stations/{station_id}", response_model=WeatherStationResponse)
 async def get_weather_station(
     station_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get weather station by ID."""
     try:
-        station = db.query(WeatherStation).filter(
-            WeatherStation.station_id == station_id
-        ).first()
+        result = await db.execute(
+            select(WeatherStation).filter(WeatherStation.station_id == station_id)
+        )
+        station = result.scalars().first()
         
         if not station:
             raise HTTPException(
@@ -146,11 +190,9 @@ async def create_climate_data(
         db.commit()
         db.refresh(db_climate_data)
         
-        # Generate risk assessment
+        # Generate risk assessment (micro-batched with concurrent ingests)
         try:
-            risk_assessment = await prediction_service.generate_risk_assessment(
-                db_climate_data, db
-            )
+            risk_assessment = await risk_batcher.submit(db_climate_data)
             if risk_assessment:
                 db.add(risk_assessment)
                 db.commit()
@@ -162,6 +204,12 @@ async def create_climate_data(
         
     except HTTPException:
         raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Climate data for this station, timestamp and data source already exists"
+        )
     except Exception as e:
         logger.error(f"Error creating climate data: {e}")
         db.rollback()
@@ -178,11 +226,18 @@ async def get_climate_data(
     end_time: Optional[datetime] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get climate data with optional filters."""
+    """Get climate data with optional filters.
+    
+    Results are ordered newest first. Pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page; ``skip`` is still
+    accepted for clients that page by position.
+    """
     try:
-        query = db.query(ClimateData)
+        cursor_values = decode_cursor(cursor, 2)
+        query = select(*CLIMATE_DATA_COLUMNS)
         
         if station_id:
             query = query.filter(ClimateData.station_id == station_id)
@@ -193,9 +248,27 @@ async def get_climate_data(
         if end_time:
             query = query.filter(ClimateData.timestamp <= end_time)
         
-        climate_data = query.order_by(ClimateData.timestamp.desc()).offset(skip).limit(limit).all()
-        return climate_data
+        if cursor_values:
+            query = query.filter(
+                keyset_after((ClimateData.timestamp, ClimateData.id), cursor_values)
+            )
+            skip = 0
         
+        result = await db.execute(
+            query.order_by(ClimateData.timestamp.desc(), ClimateData.id.desc())
+            .offset(skip).limit(limit + 1)
+        )
+        page = result.all()
+        
+        headers = {}
+        if len(page) > limit:
+            page = page[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(page[-1].timestamp, page[-1].id)
+        
+        return rows_response(page, headers=headers)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching climate data: {e}")
         raise HTTPException(
@@ -204,36 +277,82 @@ async def get_climate_data(
         )
 
 
+@router.get("/data/export")
+async def export_climate_data(
+    format: str = Query("ndjson", description=f"One of {', '.join(EXPORT_FORMATS)}"),
+    station_id: Optional[int] = Query(None),
+    start_time: Optional[datetime] = Query(None),
+    end_time: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream climate data as NDJSON, CSV, Arrow IPC or Parquet.
+    
+    Rows are ordered by ``(timestamp, id)`` and read with keyset pagination
+    over server-side cursors, so exports of any size run in constant memory
+    and without ``OFFSET`` scans. Exports can span the whole table, so they
+    are limited to signed-in users.
+    """
+    try:
+        writer = get_export_writer(format)
+    except ExportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return StreamingResponse(
+        climate_exporter.stream(writer, station_id, start_time, end_time),
+        media_type=writer.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="climate_data.{writer.extension}"'
+        }
+    )
+
+
 @router.post("/forecast", response_model=WeatherForecastResponse)
 async def get_weather_forecast(
-    forecast_request: WeatherForecastRequest,
-    db: Session = Depends(get_db)
+    forecast_request: WeatherForecastRequest
 ):
     """Generate weather forecast for specific location."""
     try:
-        # Get forecast from AI prediction service
-        forecast_data = await prediction_service.generate_forecast(
-            latitude=forecast_request.latitude,
-            longitude=forecast_request.longitude,
-            hours=forecast_request.hours,
-            db=db
-        )
+        async def compute_forecast() -> WeatherForecastResponse:
+            # Followers await this computation after the leader's request may
+            # have ended, so it uses its own session rather than the leader's
+            with SessionLocal() as db:
+                # Get forecast from AI prediction service
+                forecast_data = await prediction_service.generate_forecast(
+                    latitude=forecast_request.latitude,
+                    longitude=forecast_request.longitude,
+                    hours=forecast_request.hours,
+                    db=db
+                )
+                
+                # Generate risk assessment for the forecast
+                risk_assessment = await prediction_service.generate_location_risk_assessment(
+                    latitude=forecast_request.latitude,
+                    longitude=forecast_request.longitude,
+                    forecast_data=forecast_data,
+                    db=db
+                )
+            
+            return WeatherForecastResponse(
+                latitude=forecast_request.latitude,
+                longitude=forecast_request.longitude,
+                forecast_data=forecast_data,
+                risk_assessment=risk_assessment,
+                generated_at=datetime.utcnow()
+            )
         
-        # Generate risk assessment for the forecast
-        risk_assessment = await prediction_service.generate_location_risk_assessment(
-            latitude=forecast_request.latitude,
-            longitude=forecast_request.longitude,
-            forecast_data=forecast_data,
-            db=db
+        # Nearby requests for the same horizon and model share one forecast
+        cache_key = forecast_cache.make_key(
+            forecast_request.latitude,
+            forecast_request.longitude,
+            forecast_request.hours,
+            prediction_service.model_version
         )
+        response = await forecast_cache.get_or_compute(cache_key, compute_forecast)
         
-        return WeatherForecastResponse(
-            latitude=forecast_request.latitude,
-            longitude=forecast_request.longitude,
-            forecast_data=forecast_data,
-            risk_assessment=risk_assessment,
-            generated_at=datetime.utcnow()
-        )
+        return response.model_copy(update={
+            "latitude": forecast_request.latitude,
+            "longitude": forecast_request.longitude
+        })
         
     except Exception as e:
         logger.error(f"Error generating weather forecast: {e}")
@@ -246,13 +365,14 @@ async def get_weather_forecast(
 @router.get("/risk-assessment/{climate_data_id}", response_model=RiskAssessmentResponse)
 async def get_risk_assessment(
     climate_data_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get risk assessment for specific climate data."""
     try:
-        risk_assessment = db.query(RiskAssessment).filter(
-            RiskAssessment.climate_data_id == climate_data_id
-        ).first()
+        result = await db.execute(
+            select(RiskAssessment).filter(RiskAssessment.climate_data_id == climate_data_id)
+        )
+        risk_assessment = result.scalars().first()
         
         if not risk_assessment:
             raise HTTPException(
@@ -276,7 +396,7 @@ async def get_risk_assessment(
 async def ingest_external_data(
     source: str = Query(..., description="Data source (openweather, noaa, etc.)"),
     station_ids: Optional[List[str]] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Ingest data from external weather APIs."""
@@ -317,7 +437,7 @@ async def ingest_external_data(
 async def get_climate_analytics_summary(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get climate data analytics summary."""
     try:
@@ -327,54 +447,26 @@ async def get_climate_analytics_summary(
         if not start_date:
             start_date = end_date - timedelta(days=30)
         
-        # Get basic statistics
-        total_records = db.query(func.count(ClimateData.id)).filter(
-            and_(
-                ClimateData.timestamp >= start_date,
-                ClimateData.timestamp <= end_date
-            )
-        ).scalar()
-        
-        # Get temperature statistics
-        temp_stats = db.query(
-            func.avg(ClimateData.temperature).label('avg_temp'),
-            func.min(ClimateData.temperature).label('min_temp'),
-            func.max(ClimateData.temperature).label('max_temp')
-        ).filter(
-            and_(
-                ClimateData.timestamp >= start_date,
-                ClimateData.timestamp <= end_date,
-                ClimateData.temperature.isnot(None)
-            )
-        ).first()
-        
-        # Get risk statistics
-        risk_stats = db.query(
-            func.avg(RiskAssessment.overall_risk).label('avg_risk'),
-            func.max(RiskAssessment.overall_risk).label('max_risk'),
-            func.count(RiskAssessment.id).label('total_assessments')
-        ).join(ClimateData).filter(
-            and_(
-                ClimateData.timestamp >= start_date,
-                ClimateData.timestamp <= end_date
-            )
-        ).first()
+        # Whole days and hours come from rollups, ragged edges from raw rows
+        summary = await db.run_sync(climate_rollup_service.summarize, start_date, end_date)
+        temp_stats = summary["temperature"]
+        risk_stats = summary["overall_risk"]
         
         return {
             "period": {
                 "start_date": start_date,
                 "end_date": end_date
             },
-            "total_records": total_records,
+            "total_records": summary["records"]["count"],
             "temperature_stats": {
-                "average": float(temp_stats.avg_temp) if temp_stats.avg_temp else None,
-                "minimum": float(temp_stats.min_temp) if temp_stats.min_temp else None,
-                "maximum": float(temp_stats.max_temp) if temp_stats.max_temp else None
+                "average": temp_stats["total"] / temp_stats["count"] if temp_stats["count"] else None,
+                "minimum": temp_stats["minimum"],
+                "maximum": temp_stats["maximum"]
             },
             "risk_stats": {
-                "average_risk": float(risk_stats.avg_risk) if risk_stats.avg_risk else None,
-                "maximum_risk": float(risk_stats.max_risk) if risk_stats.max_risk else None,
-                "total_assessments": risk_stats.total_assessments
+                "average_risk": risk_stats["total"] / risk_stats["count"] if risk_stats["count"] else None,
+                "maximum_risk": risk_stats["maximum"],
+                "total_assessments": summary["risk_assessments"]["count"]
             }
         }
         
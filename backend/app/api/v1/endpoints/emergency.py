@@ -1,15 +1,18 @@
 """Emergency response API endpoints."""
 
 import logging
+import math
 import uuid
+import numpy as np
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import status as http_status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from geopy.distance import geodesic
+from sqlalchemy import and_, func, select
 
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.emergency import EmergencyAlert, EmergencyResponse, AlertSeverity, AlertStatus
 from app.schemas.emergency import (
     EmergencyAlertCreate, EmergencyAlertResponse, EmergencyAlertUpdate,
@@ -20,10 +23,25 @@ from app.services.alert_service import AlertService
 from app.services.blockchain_service import BlockchainService
 from app.core.security import get_current_active_user
 from app.models.user import User, UserRole
+from app.utils.geo_index import EARTH_RADIUS_KM, haversine_km
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_after
+from app.utils.serialization import parse_json_list, response_columns, rows_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+KM_PER_DEGREE_ARC = math.radians(EARTH_RADIUS_KM)
+MAX_ALERT_RADIUS_KM = 1000  # Upper bound enforced by EmergencyAlertBase.radius
+ALERT_SCAN_CHUNK_SIZE = 200
+
+ALERT_COLUMNS = response_columns(EmergencyAlert, EmergencyAlertResponse)
+RESPONSE_COLUMNS = response_columns(EmergencyResponse, EmergencyResponseResponse)
+RESPONSE_CONVERTERS = {
+    "equipment_list": parse_json_list,
+    "supporting_agencies": parse_json_list,
+    "status_updates": parse_json_list
+}
+
 alert_service = AlertService()
 blockchain_service = BlockchainService()
 
@@ -87,6 +105,37 @@ async def create_emergency_alert(
         )
 
 
+def _apply_location_prefilter(query, latitude: float, longitude: float, default_radius: float):
+    """Restrict alerts in SQL to a conservative box around each alert's own radius.
+    
+    Latitude separation is a strict lower bound on great-circle distance.
+    The longitude bound is only applied where it is provably conservative:
+    away from the poles and when the box cannot cross the antimeridian.
+    """
+    effective_radius = func.coalesce(func.nullif(EmergencyAlert.radius, 0), default_radius)
+    query = query.filter(
+        func.abs(EmergencyAlert.latitude - latitude) * KM_PER_DEGREE_ARC <= effective_radius
+    )
+    
+    max_radius = max(default_radius, MAX_ALERT_RADIUS_KM)
+    band_latitude = abs(latitude) + max_radius / KM_PER_DEGREE_ARC
+    if band_latitude < 89.0:
+        # Chord-vs-arc slack stays under 5% while the longitude window is <= 60 degrees
+        km_per_degree_lon = 0.95 * KM_PER_DEGREE_ARC * math.cos(math.radians(band_latitude))
+        longitude_window = max_radius / km_per_degree_lon
+        if longitude_window <= 60.0 and abs(longitude) + longitude_window <= 180.0:
+            query = query.filter(
+                func.abs(EmergencyAlert.longitude - longitude) * km_per_degree_lon <= effective_radius
+            )
+    
+    return query
+
+
+def _apply_issued_at_cursor(query, cursor_values):
+    """Continue a newest-first (issued_at, id) scan after the cursor row."""
+    return query.filter(keyset_after((EmergencyAlert.issued_at, EmergencyAlert.id), cursor_values))
+
+
 @router.get("/alerts", response_model=List[EmergencyAlertResponse])
 async def get_emergency_alerts(
     latitude: Optional[float] = Query(None, ge=-90, le=90),
@@ -98,11 +147,18 @@ async def get_emergency_alerts(
     active_only: bool = Query(True),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get emergency alerts with optional location and other filters."""
+    """Get emergency alerts with optional location and other filters.
+    
+    Results are ordered newest first. Pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page; ``offset`` is still
+    accepted for clients that page by position.
+    """
     try:
-        query = db.query(EmergencyAlert)
+        cursor_values = decode_cursor(cursor, 2)
+        query = select(*ALERT_COLUMNS)
         
         # Filter by status
         if active_only:
@@ -118,36 +174,71 @@ async def get_emergency_alerts(
         if risk_type:
             query = query.filter(EmergencyAlert.risk_type.ilike(f"%{risk_type}%"))
         
-        # Get all alerts first, then filter by location if needed
-        alerts = query.order_by(EmergencyAlert.issued_at.desc()).all()
-        
-        # Filter by location if coordinates provided
-        if latitude is not None and longitude is not None:
-            user_location = (latitude, longitude)
-            filtered_alerts = []
+        if cursor_values:
+            query = _apply_issued_at_cursor(query, cursor_values)
+            offset = 0
+        
+        query = query.order_by(EmergencyAlert.issued_at.desc(), EmergencyAlert.id.desc())
+        
+        if latitude is None or longitude is None:
+            result = await db.execute(query.offset(offset).limit(limit + 1))
+            page = result.all()
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            # Use alert radius if available, otherwise use query radius
+            default_radius = radius or 50  # Default 50km
+            query = _apply_location_prefilter(query, latitude, longitude, default_radius)
+            
+            # Scan bounding-box survivors in keyset chunks, refining with haversine
+            page = []
+            skipped = 0
+            has_more = False
+            chunk_size = max(ALERT_SCAN_CHUNK_SIZE, 2 * (limit + offset))
+            chunk_query = query
             
-            for alert in alerts:
-                alert_location = (alert.latitude, alert.longitude)
-                distance = geodesic(user_location, alert_location).kilometers
+            while True:
+                result = await db.execute(chunk_query.limit(chunk_size))
+                chunk = result.all()
+                if not chunk:
+                    break
                 
-                # Use alert radius if available, otherwise use query radius
-                alert_radius = alert.radius or radius or 50  # Default 50km
+                distances = haversine_km(
+                    latitude, longitude,
+                    np.array([alert.latitude for alert in chunk], dtype=np.float64),
+                    np.array([alert.longitude for alert in chunk], dtype=np.float64)
+                )
+                radii = np.array(
+                    [alert.radius or default_radius for alert in chunk], dtype=np.float64
+                )
                 
-                if distance <= alert_radius:
-                    filtered_alerts.append(alert)
-            
-            alerts = filtered_alerts
+                for index in np.flatnonzero(distances <= radii):
+                    if skipped < offset:
+                        skipped += 1
+                    elif len(page) < limit:
+                        page.append(chunk[index])
+                    else:
+                        has_more = True
+                        break
+                
+                if has_more or len(chunk) < chunk_size:
+                    break
+                
+                last = chunk[-1]
+                chunk_query = _apply_issued_at_cursor(query, (last.issued_at, last.id))
         
-        # Apply pagination
-        total_alerts = len(alerts)
-        paginated_alerts = alerts[offset:offset + limit]
+        headers = {}
+        if has_more and page:
+            headers["X-Next-Cursor"] = encode_cursor(page[-1].issued_at, page[-1].id)
         
-        return paginated_alerts
+        return rows_response(page, headers=headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching emergency alerts: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch emergency alerts"
         )
 
@@ -155,13 +246,14 @@ async def get_emergency_alerts(
 @router.get("/alerts/{alert_id}", response_model=EmergencyAlertResponse)
 async def get_emergency_alert(
     alert_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific emergency alert by ID."""
     try:
-        alert = db.query(EmergencyAlert).filter(
-            EmergencyAlert.alert_id == alert_id
-        ).first()
+        result = await db.execute(
+            select(EmergencyAlert).filter(EmergencyAlert.alert_id == alert_id)
+        )
+        alert = result.scalars().first()
         
         if not alert:
             raise HTTPException(
@@ -309,11 +401,18 @@ async def get_emergency_responses(
     lead_agency: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get emergency responses with optional filters."""
+    """Get emergency responses with optional filters.
+    
+    Results are ordered newest first. Pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page; ``offset`` is still
+    accepted for clients that page by position.
+    """
     try:
-        query = db.query(EmergencyResponse)
+        cursor_values = decode_cursor(cursor, 2)
+        query = select(*RESPONSE_COLUMNS)
         
         if alert_id:
             query = query.filter(EmergencyResponse.alert_id == alert_id)
@@ -324,13 +423,31 @@ async def get_emergency_responses(
         if lead_agency:
             query = query.filter(EmergencyResponse.lead_agency.ilike(f"%{lead_agency}%"))
         
-        responses = query.order_by(EmergencyResponse.created_at.desc()).offset(offset).limit(limit).all()
-        return responses
+        if cursor_values:
+            query = query.filter(
+                keyset_after((EmergencyResponse.created_at, EmergencyResponse.id), cursor_values)
+            )
+            offset = 0
         
+        result = await db.execute(
+            query.order_by(EmergencyResponse.created_at.desc(), EmergencyResponse.id.desc())
+            .offset(offset).limit(limit + 1)
+        )
+        page = result.all()
+        
+        headers = {}
+        if len(page) > limit:
+            page = page[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(page[-1].created_at, page[-1].id)
+        
+        return rows_response(page, converters=RESPONSE_CONVERTERS, headers=headers)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching emergency responses: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch emergency responses"
         )
 
@@ -26,6 +26,13 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Climate data retention; monthly partitions are PostgreSQL only and
+    # applied by the 0002 migration
+    DATA_RETENTION_DAYS: int = 90
+    CLIMATE_DATA_PARTITIONING: bool = False
+    CLIMATE_DATA_PARTITION_MONTHS_AHEAD: int = 2
     
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379"
@@ -33,6 +40,10 @@ class Settings(BaseSettings):
     # Weather API settings
     OPENWEATHERMAP_API_KEY: str
     NOAA_API_KEY: Optional[str] = None
+    OPENWEATHER_BASE_URL: str = "https://api.openweathermap.org/data/2.5"
+    OPENWEATHER_CONCURRENCY: int = 10
+    OPENWEATHER_RATE_PER_SECOND: float = 1.0
+    OPENWEATHER_RATE_BURST: int = 10
     
     # Blockchain settings
     WEB3_PROVIDER_URL: str = "http://localhost:8545"
@@ -41,14 +52,58 @@ class Settings(BaseSettings):
     
     # AI/ML settings
     MODEL_PATH: str = "./models"
+    MODEL_WARMUP_ON_STARTUP: bool = True
+    MODEL_POLL_INTERVAL: int = 30  # Seconds between active version checks; 0 disables
+    # "keras", or "numpy" for API-only nodes serving small batches: it cuts per-call
+    # latency and skips TensorFlow, but batched forecast rollouts run slower on it
+    MODEL_RUNTIME: str = "keras"
     BATCH_SIZE: int = 32
     MAX_WORKERS: int = 4
+    RISK_BATCH_MAX_SIZE: int = 64
+    RISK_BATCH_MAX_WAIT_MS: float = 5.0
+    FORECAST_CACHE_TTL_SECONDS: float = 600.0
+    FORECAST_CACHE_MAX_ENTRIES: int = 10000
+    FORECAST_CACHE_CELL_DEG: float = 0.05
+    FORECAST_CACHE_USE_REDIS: bool = False
+    
+    # Climate analytics rollups (hourly/daily, compacted incrementally)
+    ROLLUP_INTERVAL_SECONDS: float = 300.0
+    ROLLUP_WATERMARK_LAG_SECONDS: float = 300.0
+    
+    # Climate data export (rows per server-side cursor fetch / keyset segment)
+    EXPORT_CHUNK_SIZE: int = 5000
+    EXPORT_SEGMENT_ROWS: int = 500000
     
     # External services
     IPFS_API_URL: str = "http://localhost:5001"
     MQTT_BROKER_HOST: str = "localhost"
     MQTT_BROKER_PORT: int = 1883
     
+    # IoT ingestion queue (overflow policy: block, drop_newest or drop_oldest)
+    IOT_QUEUE_MAX_SIZE: int = 10000
+    IOT_BATCH_SIZE: int = 500
+    IOT_FLUSH_INTERVAL_MS: float = 200.0
+    IOT_QUEUE_OVERFLOW_POLICY: str = "block"
+    IOT_QUEUE_BLOCK_TIMEOUT_SECONDS: float = 5.0
+    IOT_SENSOR_HISTORY: int = 8
+    IOT_SENSOR_STALE_SECONDS: float = 86400.0
+    
+    # IoT consumer sharding (mode: shared subscriptions or topic-hash)
+    IOT_SHARD_COUNT: int = 1
+    IOT_SHARDING_MODE: str = "shared"
+    IOT_SHARE_GROUP: str = "climate_guardian_ingest"
+    
+    # Notification fan-out (per channel worker pools and provider rate limits)
+    NOTIFICATION_PUSH_CONCURRENCY: int = 50
+    NOTIFICATION_PUSH_RATE: float = 100.0
+    NOTIFICATION_PUSH_BATCH_SIZE: int = 500
+    NOTIFICATION_EMAIL_CONCURRENCY: int = 20
+    NOTIFICATION_EMAIL_RATE: float = 14.0
+    NOTIFICATION_EMAIL_BATCH_SIZE: int = 50
+    NOTIFICATION_SMS_CONCURRENCY: int = 10
+    NOTIFICATION_SMS_RATE: float = 10.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 3
+    
     # Monitoring
     SENTRY_DSN: Optional[str] = None
     LOG_LEVEL: str = "INFO"
@@ -1,12 +1,17 @@
 """Database package initialization."""
 
-from app.db.database import engine, SessionLocal, get_db, create_tables
+from app.db.database import (
+    engine, SessionLocal, get_db, async_engine, AsyncSessionLocal, get_async_db, create_tables
+)
 from app.db.base import Base
 
 __all__ = [
     "engine",
     "SessionLocal", 
     "get_db",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_async_db",
     "create_tables",
     "Base"
 ]
@@ -2,32 +2,75 @@
 
 import logging
 from sqlalchemy import create_engine, event
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
+from app.db.base import Base
+from app.db.partitioning import ensure_partitions, is_partitioned
 
 logger = logging.getLogger(__name__)
 
+def get_pool_options(database_url: str) -> dict:
+    """Connection pool sizing for server databases.
+    
+    SQLite dialects pick their own pool (NullPool, StaticPool or
+    SingletonThreadPool depending on driver and URL), which reject queue
+    pool arguments.
+    """
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": 3600  # Recycle connections every hour
+    }
+
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,
-    pool_recycle=3600,  # Recycle connections every hour
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **get_pool_options(settings.DATABASE_URL)
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create Base class
-Base = declarative_base()
+def get_async_database_url() -> str:
+    """Async driver URL for the configured database."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Create async engine for request handlers and ingestion running on the event loop
+async_engine = create_async_engine(
+    get_async_database_url(),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **get_pool_options(get_async_database_url())
+)
+
+# Create AsyncSessionLocal class; objects stay usable after commit
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 
 @event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """Set SQLite pragmas for better performance (if using SQLite)."""
     if "sqlite" in settings.DATABASE_URL:
@@ -53,6 +96,17 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get async database session."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
 async def create_tables():
     """Create all database tables."""
     try:
@@ -61,6 +115,14 @@ async def create_tables():
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        
+        # Keep upcoming monthly partitions in place; a failure here must not stop startup
+        try:
+            with engine.begin() as connection:
+                if is_partitioned(connection):
+                    ensure_partitions(connection)
+        except Exception as e:
+            logger.error(f"Error creating climate data partitions: {e}")
         logger.info("Database tables created successfully")
         
     except Exception as e:
@@ -0,0 +1,303 @@
+"""Monthly time-range partitioning of climate data on PostgreSQL.
+
+When ``CLIMATE_DATA_PARTITIONING`` is enabled the ``climate_data`` table is
+converted (by the ``0002`` migration) into a table partitioned by range on
+``timestamp``, with one ``climate_data_pYYYYMM`` partition per month and a
+default partition for anything outside them. Retention then drops whole
+monthly partitions instead of deleting rows.
+
+PostgreSQL requires unique constraints on a partitioned table to include the
+partition key, so the primary key becomes ``(id, timestamp)`` and the foreign
+key from ``risk_assessments`` is dropped; ``cleanup_old_data`` removes the
+assessments of expired readings itself.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "climate_data"
+DEFAULT_PARTITION = f"{TABLE}_default"
+UNPARTITIONED_TABLE = f"{TABLE}_unpartitioned"
+PARTITIONED_TABLE = f"{TABLE}_partitioned"
+
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# Secondary indexes, recreated on the partitioned parent (and so on every partition)
+INDEXES = {
+    "ix_climate_data_timestamp_id": "timestamp, id",
+    "ix_climate_data_created_at": "created_at",
+    "ix_climate_data_id": "id"
+}
+# The ingestion dedup key; includes the partition key as PostgreSQL requires
+UNIQUE_INDEXES = {
+    "uq_climate_data_station_timestamp_source": "station_id, timestamp, data_source"
+}
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing ``value``, in UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Month start ``months`` after the month start ``value``."""
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(start: datetime) -> str:
+    """Name of the partition for the month starting at ``start``."""
+    return f"{TABLE}_p{start.year:04d}{start.month:02d}"
+
+
+def supports_partitioning(connection: Connection) -> bool:
+    """Whether the database can partition climate data."""
+    return connection.dialect.name == "postgresql"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether ``climate_data`` is a partitioned table."""
+    if not supports_partitioning(connection):
+        return False
+    return bool(connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {"table": TABLE}).scalar())
+
+
+def list_partitions(connection: Connection) -> List[Tuple[str, datetime, datetime]]:
+    """Monthly partitions as ``(name, start, end)``, oldest first."""
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+    ), {"table": TABLE}).scalars()
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            partitions.append((name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _create_partition(connection: Connection, start: datetime):
+    """Create the partition for the month starting at ``start``.
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows in its range, so those rows are moved: the default partition
+    is detached, the month created, the rows copied in through the parent
+    and the default partition reattached.
+    """
+    name = partition_name(start)
+    bounds = {"start": start, "end": add_months(start, 1)}
+    create = text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    )
+
+    in_range = f"FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end"
+    has_default = connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+    ).scalar()
+    if not has_default or not connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 {in_range})"), bounds
+    ).scalar():
+        connection.execute(create)
+        return
+
+    connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    connection.execute(create)
+    moved = connection.execute(text(f"INSERT INTO {TABLE} SELECT * {in_range}"), bounds).rowcount
+    connection.execute(text(f"DELETE {in_range}"), bounds)
+    connection.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info(f"Moved {moved} rows from {DEFAULT_PARTITION} into {name}")
+
+
+def ensure_partitions(
+    connection: Connection,
+    start: Optional[datetime] = None,
+    months_ahead: int = settings.CLIMATE_DATA_PARTITION_MONTHS_AHEAD
+) -> List[str]:
+    """Create the monthly partitions from ``start`` through ``months_ahead`` months from now."""
+    first = month_start(start or datetime.now(timezone.utc))
+    last = add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+
+    created = []
+    existing = {name for name, _, _ in list_partitions(connection)}
+    month = first
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            _create_partition(connection, month)
+            created.append(name)
+        month = add_months(month, 1)
+
+    if created:
+        logger.info(f"Created climate data partitions: {', '.join(created)}")
+    return created
+
+
+def drop_expired_partitions(connection: Connection, cutoff: datetime) -> List[str]:
+    """Drop monthly partitions that end at or before ``cutoff``, with their assessments."""
+    dropped = []
+    for name, _, end in list_partitions(connection):
+        if end > cutoff:
+            break
+        connection.execute(text(
+            f"DELETE FROM risk_assessments WHERE climate_data_id IN (SELECT id FROM {name})"
+        ))
+        connection.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    if dropped:
+        logger.info(f"Dropped expired climate data partitions: {', '.join(dropped)}")
+    return dropped
+
+
+def _delete_before(connection: Connection, table: str, cutoff: datetime) -> int:
+    """Delete readings older than ``cutoff`` from one table, with their assessments."""
+    connection.execute(text(
+        f"DELETE FROM risk_assessments WHERE climate_data_id IN "
+        f"(SELECT id FROM {table} WHERE timestamp < :cutoff)"
+    ), {"cutoff": cutoff})
+    return connection.execute(
+        text(f"DELETE FROM {table} WHERE timestamp < :cutoff"), {"cutoff": cutoff}
+    ).rowcount
+
+
+def cleanup_old_data(db: Session, retention_days: int = settings.DATA_RETENTION_DAYS) -> Dict[str, Any]:
+    """Apply the retention policy to climate data.
+
+    On a partitioned table whole expired months are dropped; only the month
+    straddling the cutoff and the default partition see a row-level delete.
+    Otherwise expired rows are deleted, using the timestamp index.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    connection = db.connection()
+
+    try:
+        if is_partitioned(connection):
+            dropped = drop_expired_partitions(connection, cutoff)
+            deleted = sum(
+                _delete_before(connection, name, cutoff)
+                for name, start, _ in list_partitions(connection) if start < cutoff
+            )
+            deleted += _delete_before(connection, DEFAULT_PARTITION, cutoff)
+            ensure_partitions(connection, start=cutoff)
+        else:
+            dropped = []
+            deleted = _delete_before(connection, TABLE, cutoff)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"Retention cleanup dropped {len(dropped)} partitions and deleted {deleted} rows "
+        f"older than {cutoff.isoformat()}"
+    )
+    return {"partitions_dropped": dropped, "records_deleted": deleted, "cutoff": cutoff}
+
+
+def delete_duplicate_readings(connection: Connection) -> int:
+    """Delete readings repeating an older one's dedup key, with their assessments."""
+    duplicates = (
+        f"SELECT id FROM {TABLE} c WHERE EXISTS (SELECT 1 FROM {TABLE} d "
+        f"WHERE d.station_id = c.station_id AND d.timestamp = c.timestamp "
+        f"AND d.data_source = c.data_source AND d.id < c.id)"
+    )
+    connection.execute(text(f"DELETE FROM risk_assessments WHERE climate_data_id IN ({duplicates})"))
+    deleted = connection.execute(text(f"DELETE FROM {TABLE} WHERE id IN ({duplicates})")).rowcount
+    if deleted:
+        logger.info(f"Deleted {deleted} duplicate climate readings")
+    return deleted
+
+
+def _create_indexes(connection: Connection):
+    """Recreate the secondary indexes of ``climate_data``."""
+    for name, columns in UNIQUE_INDEXES.items():
+        connection.execute(text(f"CREATE UNIQUE INDEX {name} ON {TABLE} ({columns})"))
+    for name, columns in INDEXES.items():
+        connection.execute(text(f"CREATE INDEX {name} ON {TABLE} ({columns})"))
+
+
+def partition_climate_data(connection: Connection):
+    """Convert ``climate_data`` into a monthly range-partitioned table, keeping its rows."""
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": TABLE}
+    ).scalar()
+
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(
+        f"CREATE TABLE {PARTITIONED_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE (timestamp)"
+    ))
+    connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {UNPARTITIONED_TABLE}"))
+    connection.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} RENAME TO {TABLE}"))
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+
+    oldest = connection.execute(text(f"SELECT min(timestamp) FROM {UNPARTITIONED_TABLE}")).scalar()
+    ensure_partitions(connection, start=oldest)
+
+    connection.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {UNPARTITIONED_TABLE}"))
+    # Also drops the risk_assessments foreign key, which cannot target a partitioned table
+    connection.execute(text(f"DROP TABLE {UNPARTITIONED_TABLE} CASCADE"))
+    delete_duplicate_readings(connection)
+
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id"))
+    connection.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, timestamp)"))
+    connection.execute(text(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT climate_data_station_id_fkey "
+        f"FOREIGN KEY (station_id) REFERENCES weather_stations (id)"
+    ))
+    _create_indexes(connection)
+
+    logger.info("Converted climate_data to a monthly partitioned table")
+
+
+def unpartition_climate_data(connection: Connection):
+    """Convert a partitioned ``climate_data`` back into a plain table."""
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": TABLE}
+    ).scalar()
+
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {PARTITIONED_TABLE}"))
+    connection.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS)"
+    ))
+    connection.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {PARTITIONED_TABLE}"))
+    connection.execute(text(f"DROP TABLE {PARTITIONED_TABLE} CASCADE"))
+
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id"))
+    connection.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)"))
+    connection.execute(text(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT climate_data_station_id_fkey "
+        f"FOREIGN KEY (station_id) REFERENCES weather_stations (id)"
+    ))
+    connection.execute(text(
+        "DELETE FROM risk_assessments WHERE climate_data_id NOT IN (SELECT id FROM climate_data)"
+    ))
+    connection.execute(text(
+        "ALTER TABLE risk_assessments ADD CONSTRAINT risk_assessments_climate_data_id_fkey "
+        f"FOREIGN KEY (climate_data_id) REFERENCES {TABLE} (id)"
+    ))
+    _create_indexes(connection)
+
+    logger.info("Converted climate_data back to a plain table")
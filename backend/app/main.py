@@ -13,7 +13,10 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.v1.endpoints import climate, emergency, auth, blockchain
 from app.core.config import settings
-from app.db.database import engine, create_tables
+from app.db.database import engine, async_engine, AsyncSessionLocal, create_tables
+from app.services.station_registry import station_registry
+from app.services.climate_rollups import climate_rollup_service
+from app.services.model_registry import model_registry
 
 # Configure logging
 logging.basicConfig(
@@ -35,9 +38,25 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ClimateGuardian AI Backend")
     await create_tables()
     logger.info("Database tables created successfully")
+    # Warm the sensor ID -> station cache used by IoT ingestion
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(station_registry.rebuild)
+    # Keep the analytics rollups compacted in the background
+    climate_rollup_service.start()
+    # Load and warm up the AI models without delaying startup
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        model_registry.start_warm_up()
+    # Switch to newly published model versions without restarting workers
+    model_registry.start_watching(settings.MODEL_POLL_INTERVAL)
     yield
     # Shutdown
     logger.info("Shutting down ClimateGuardian AI Backend")
+    await climate_rollup_service.stop()
+    await model_registry.stop()
+    await climate.risk_batcher.flush()
+    await climate.data_ingestion_service.close()
+    await climate.forecast_cache.close()
+    await async_engine.dispose()
 
 
 # Create FastAPI application
@@ -1,13 +1,23 @@
 """Machine Learning package initialization."""
 
-from app.ml.models.weather_predictor import WeatherPredictor
-from app.ml.models.risk_analyzer import RiskAnalyzer
-from app.ml.data.preprocessing import DataPreprocessor
-from app.ml.data.feature_engineering import FeatureEngineer
+from app.ml.features import RISK_FEATURES, WEATHER_FEATURES, risk_features, weather_features
 
 __all__ = [
     "WeatherPredictor",
     "RiskAnalyzer",
-    "DataPreprocessor",
-    "FeatureEngineer"
+    "WEATHER_FEATURES",
+    "RISK_FEATURES",
+    "weather_features",
+    "risk_features"
 ]
+
+
+def __getattr__(name):
+    """Import the TensorFlow-backed model classes only when they are used."""
+    if name == "WeatherPredictor":
+        from app.ml.models.weather_predictor import WeatherPredictor
+        return WeatherPredictor
+    if name == "RiskAnalyzer":
+        from app.ml.models.risk_analyzer import RiskAnalyzer
+        return RiskAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,197 @@
+"""Versioned store of trained model artifacts.
+
+Each published version lives in its own directory under the model path
+together with a ``manifest.json`` describing its models, scalers, feature
+schema and metrics::
+
+    models/
+        ACTIVE                  # name of the version being served
+        v20250101120000/
+            manifest.json
+            weather_predictor.h5
+            weather_scaler.pkl
+            weather_predictor.npz   # NumPy runtime export, see app.ml.runtime
+            risk_analyzer.h5
+            risk_scaler.pkl
+            risk_analyzer.npz
+
+Training writes its files into a new version directory and then publishes
+it; the manifest is written last, so a version without one is never
+served. Activating a version only rewrites the ``ACTIVE`` pointer, which
+every API worker polls, so a retrained model is picked up without a
+restart. Files are replaced atomically, so a reader never sees a partially
+written manifest or pointer.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.ml.features import RISK_FEATURES, WEATHER_FEATURES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+ACTIVE_FILE = "ACTIVE"
+
+WEATHER_MODEL_FILE = "weather_predictor.h5"
+WEATHER_SCALER_FILE = "weather_scaler.pkl"
+WEATHER_RUNTIME_FILE = "weather_predictor.npz"
+RISK_MODEL_FILE = "risk_analyzer.h5"
+RISK_SCALER_FILE = "risk_scaler.pkl"
+RISK_RUNTIME_FILE = "risk_analyzer.npz"
+
+# Files and input features of every model a version can contain
+COMPONENTS: Dict[str, Dict[str, Any]] = {
+    "weather": {
+        "model": WEATHER_MODEL_FILE,
+        "scaler": WEATHER_SCALER_FILE,
+        "runtime": WEATHER_RUNTIME_FILE,
+        "features": WEATHER_FEATURES
+    },
+    "risk": {
+        "model": RISK_MODEL_FILE,
+        "scaler": RISK_SCALER_FILE,
+        "runtime": RISK_RUNTIME_FILE,
+        "features": RISK_FEATURES
+    }
+}
+
+
+def _to_builtin(value: Any) -> Any:
+    """JSON fallback for NumPy scalars and arrays in metrics."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_atomic(path: str, content: str):
+    """Write ``content`` to ``path`` so readers see either the old or the new file."""
+    temp_path = f"{path}.tmp-{os.getpid()}"
+    with open(temp_path, "w") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+class ModelArtifactStore:
+    """Versioned model artifacts with manifests and an active version pointer."""
+
+    def __init__(self, root: str):
+        """Initialize model artifact store."""
+        self.root = root
+
+    def version_path(self, version: str) -> str:
+        """Directory holding the artifacts of ``version``."""
+        return os.path.join(self.root, version)
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        """Manifest of a published version."""
+        with open(os.path.join(self.version_path(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def active_version(self) -> Optional[str]:
+        """Version currently selected for serving, if any."""
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def active_path(self) -> str:
+        """Directory of the active version, or the store root when none is published."""
+        version = self.active_version()
+        return self.version_path(version) if version else self.root
+
+    def new_version(self) -> str:
+        """Create an empty directory for a version about to be trained."""
+        base = datetime.utcnow().strftime("v%Y%m%d%H%M%S")
+        version, suffix = base, 1
+        while os.path.exists(self.version_path(version)):
+            suffix += 1
+            version = f"{base}-{suffix}"
+        os.makedirs(self.version_path(version))
+        return version
+
+    def publish(
+        self,
+        version: str,
+        metrics: Optional[Dict[str, Dict[str, Any]]] = None,
+        activate: bool = True
+    ) -> Dict[str, Any]:
+        """Write the manifest of a trained version and optionally activate it.
+
+        ``metrics`` maps component names (``weather``, ``risk``) to their
+        training or evaluation metrics. Components the version did not
+        retrain are copied over from the active version, so every version
+        is complete and can be activated or rolled back to on its own.
+        """
+        path = self.version_path(version)
+        previous = self.active_version()
+        previous_manifest = self.manifest(previous) if previous in self.versions() else {}
+        components = {}
+
+        for name, files in COMPONENTS.items():
+            model_file = os.path.join(path, files["model"])
+            if not os.path.exists(model_file) and name in previous_manifest.get("components", {}):
+                inherited = previous_manifest["components"][name]
+                for key in ("model", "scaler", "runtime"):
+                    if inherited.get(key):
+                        shutil.copy2(
+                            os.path.join(self.version_path(previous), inherited[key]),
+                            os.path.join(path, inherited[key])
+                        )
+                components[name] = dict(inherited, inherited_from=previous)
+                continue
+
+            if not os.path.exists(model_file):
+                continue
+
+            components[name] = {
+                "model": files["model"],
+                "scaler": files["scaler"] if os.path.exists(os.path.join(path, files["scaler"])) else None,
+                "runtime": files["runtime"] if os.path.exists(os.path.join(path, files["runtime"])) else None,
+                "features": list(files["features"]),
+                "metrics": (metrics or {}).get(name, {})
+            }
+
+        if not components:
+            raise ValueError(f"Version {version} has no model artifacts to publish")
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "components": components
+        }
+        _write_atomic(
+            os.path.join(path, MANIFEST_FILE),
+            json.dumps(manifest, indent=2, default=_to_builtin)
+        )
+        logger.info(f"Published model version {version} ({', '.join(components)})")
+
+        if activate:
+            self.activate(version)
+        return manifest
+
+    def activate(self, version: str):
+        """Select a published version for serving in every worker."""
+        if version not in self.versions():
+            raise ValueError(f"Model version {version} has not been published")
+        os.makedirs(self.root, exist_ok=True)
+        _write_atomic(os.path.join(self.root, ACTIVE_FILE), version)
+        logger.info(f"Model version {version} marked active")
@@ -0,0 +1,185 @@
+"""Columnar feature pipeline shared by model training and serving.
+
+Weather and risk feature matrices are built here in one vectorized pass from
+any of the shapes climate readings come in: ORM objects or result rows, a
+pandas DataFrame, a NumPy structured array, or a mapping of column arrays.
+Training (``WeatherPredictor``, ``RiskAnalyzer``) and serving
+(``PredictionService``) both go through these functions, so a model always
+sees features encoded the same way it was trained on.
+"""
+
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+WEATHER_FEATURES = (
+    "temperature", "humidity", "pressure", "wind_speed",
+    "wind_direction", "precipitation", "visibility",
+    "cloud_cover", "uv_index", "pm25"
+)
+
+RISK_MEASUREMENTS = (
+    "temperature", "humidity", "pressure", "wind_speed",
+    "precipitation", "visibility", "cloud_cover", "uv_index",
+    "pm25", "pm10"
+)
+TEMPORAL_FEATURES = ("hour", "day_of_year", "hour_sin", "hour_cos", "day_sin")
+RISK_FEATURES = RISK_MEASUREMENTS + TEMPORAL_FEATURES
+
+# Value used for a missing measurement; anything not listed defaults to 0.0
+FEATURE_DEFAULTS: Dict[str, float] = {
+    "pressure": 1013.25,  # Standard sea-level pressure (hPa)
+    "visibility": 10.0    # Clear-air visibility (km)
+}
+
+_SECONDS_PER_HOUR = 3600
+
+
+def _is_columnar(source: Any) -> bool:
+    """Whether ``source`` already holds whole columns rather than rows."""
+    return (
+        isinstance(source, (pd.DataFrame, Mapping))
+        or (isinstance(source, np.ndarray) and source.dtype.names is not None)
+    )
+
+
+def _row_count(source: Any) -> int:
+    """Number of rows of a columnar source."""
+    if isinstance(source, Mapping) and not isinstance(source, pd.DataFrame):
+        # A mapping of column arrays; its own length counts columns
+        return len(next(iter(source.values()))) if source else 0
+    return len(source)
+
+
+def _has_column(source: Any, name: str) -> bool:
+    """Whether a columnar source has ``name``."""
+    if isinstance(source, np.ndarray):
+        return name in source.dtype.names
+    return name in source
+
+
+def numeric_columns(source: Any, names: Sequence[str]) -> np.ndarray:
+    """``(rows, len(names))`` float64 matrix of the named columns.
+
+    Missing values and absent columns are NaN.
+    """
+    if _is_columnar(source):
+        length = _row_count(source)
+        matrix = np.full((length, len(names)), np.nan)
+        for index, name in enumerate(names):
+            if _has_column(source, name):
+                matrix[:, index] = pd.to_numeric(
+                    np.asarray(source[name]), errors="coerce"
+                ).astype(np.float64)
+        return matrix
+
+    rows = list(source)
+    if not rows:
+        return np.empty((0, len(names)))
+    values = _row_values(rows, names)
+    if len(names) == 1:
+        values = [(value,) for value in values]
+    # None becomes NaN on conversion to float
+    return np.array(values, dtype=np.float64)
+
+
+def _row_values(rows: Sequence[Any], names: Sequence[str]) -> list:
+    """Tuple of the named attributes of every row.
+
+    Loaded ORM column values live in the instance ``__dict__``; reading them
+    from there skips the instrumented attribute descriptors, which dominate
+    the cost on large batches. Rows with expired or unset attributes, and
+    rows without a ``__dict__``, go through normal attribute access.
+    """
+    loaded = itemgetter(*names)
+    getter = attrgetter(*names)
+    values = []
+    for row in rows:
+        try:
+            values.append(loaded(row.__dict__))
+        except (AttributeError, KeyError):
+            values.append(getter(row))
+    return values
+
+
+def timestamp_column(source: Any, name: str = "timestamp") -> np.ndarray:
+    """Timestamps of ``source`` as UTC ``datetime64[s]``; missing values are NaT."""
+    if isinstance(source, pd.DataFrame) and name in source:
+        values = source[name].reset_index(drop=True)
+    elif _is_columnar(source) and _has_column(source, name):
+        values = pd.Series(np.asarray(source[name]))
+    elif _is_columnar(source):
+        values = pd.Series([None] * _row_count(source), dtype=object)
+    else:
+        # Python datetimes may mix naive and aware values; naive ones are taken as UTC
+        values = pd.Series([getattr(row, name, None) for row in source], dtype=object)
+
+    timestamps = pd.to_datetime(values, utc=True, errors="coerce")
+    return timestamps.dt.tz_localize(None).to_numpy(dtype="datetime64[s]")
+
+
+def fill_defaults(matrix: np.ndarray, names: Sequence[str]) -> np.ndarray:
+    """Replace NaN measurements with their ``FEATURE_DEFAULTS`` in place."""
+    defaults = np.array([FEATURE_DEFAULTS.get(name, 0.0) for name in names])
+    missing = np.isnan(matrix)
+    if missing.any():
+        matrix[missing] = np.broadcast_to(defaults, matrix.shape)[missing]
+    return matrix
+
+
+def temporal_features(timestamps: np.ndarray) -> np.ndarray:
+    """Hour, day of year and their cyclical encodings; NaN where the timestamp is missing."""
+    missing = np.isnat(timestamps)
+    seconds = timestamps.astype("datetime64[s]").astype(np.int64)
+    hour = ((seconds // _SECONDS_PER_HOUR) % 24).astype(np.float64)
+    day_of_year = (
+        timestamps.astype("datetime64[D]") - timestamps.astype("datetime64[Y]")
+    ).astype(np.float64) + 1
+
+    hour[missing] = np.nan
+    day_of_year[missing] = np.nan
+
+    return np.column_stack([
+        hour,
+        day_of_year,
+        np.sin(2 * np.pi * hour / 24),  # Cyclical hour encoding
+        np.cos(2 * np.pi * hour / 24),
+        np.sin(2 * np.pi * day_of_year / 365)  # Cyclical day encoding
+    ])
+
+
+def weather_features(source: Any) -> np.ndarray:
+    """``(rows, len(WEATHER_FEATURES))`` weather model inputs with defaults filled."""
+    return fill_defaults(numeric_columns(source, WEATHER_FEATURES), WEATHER_FEATURES)
+
+
+def risk_features(source: Any) -> np.ndarray:
+    """``(rows, len(RISK_FEATURES))`` risk model inputs.
+
+    Measurements are default-filled; the temporal columns are NaN for rows
+    without a timestamp, which callers should treat as not featurizable.
+    """
+    if not _is_columnar(source):
+        source = list(source)
+    measurements = fill_defaults(numeric_columns(source, RISK_MEASUREMENTS), RISK_MEASUREMENTS)
+    return np.hstack([measurements, temporal_features(timestamp_column(source))])
+
+
+def prepare_climate_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Clean a climate data frame for training or evaluation.
+
+    Drops rows without a timestamp, coerces the weather and risk measurement
+    columns to floats with their defaults filled, and orders the readings by
+    station and time.
+    """
+    frame = data.copy()
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True, errors="coerce")
+    frame = frame[frame["timestamp"].notna()]
+
+    names = tuple(dict.fromkeys(WEATHER_FEATURES + RISK_MEASUREMENTS))
+    frame[list(names)] = fill_defaults(numeric_columns(frame, names), names)
+
+    sort_columns = ["station_id", "timestamp"] if "station_id" in frame.columns else ["timestamp"]
+    return frame.sort_values(sort_columns, kind="stable")
@@ -11,6 +11,10 @@ from sklearn.model_selection import train_test_split
 import joblib
 import os
 
+from app.ml.artifacts import RISK_MODEL_FILE, RISK_RUNTIME_FILE, RISK_SCALER_FILE
+from app.ml.features import RISK_FEATURES, risk_features
+from app.ml.runtime import export_runtime
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,12 +30,7 @@ class RiskAnalyzer:
             'flood_risk', 'drought_risk', 'storm_risk',
             'heat_wave_risk', 'cold_wave_risk', 'wildfire_risk'
         ]
-        self.feature_columns = [
-            'temperature', 'humidity', 'pressure', 'wind_speed',
-            'precipitation', 'visibility', 'cloud_cover', 'uv_index',
-            'pm25', 'pm10', 'hour', 'day_of_year',
-            'hour_sin', 'hour_cos', 'day_sin'
-        ]
+        self.feature_columns = list(RISK_FEATURES)
         
         # Model architecture parameters
         self.hidden_layers = [128, 64, 32]
@@ -100,25 +99,9 @@ class RiskAnalyzer:
     def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Prepare features for risk analysis."""
         try:
-            features_df = data.copy()
-            
-            # Extract temporal features
-            features_df['hour'] = pd.to_datetime(features_df['timestamp']).dt.hour
-            features_df['day_of_year'] = pd.to_datetime(features_df['timestamp']).dt.dayofyear
-            
-            # Create cyclical features
-            features_df['hour_sin'] = np.sin(2 * np.pi * features_df['hour'] / 24)
-            features_df['hour_cos'] = np.cos(2 * np.pi * features_df['hour'] / 24)
-            features_df['day_sin'] = np.sin(2 * np.pi * features_df['day_of_year'] / 365)
-            
-            # Fill missing values
-            for col in self.feature_columns:
-                if col in features_df.columns:
-                    features_df[col] = features_df[col].fillna(features_df[col].median())
-                else:
-                    features_df[col] = 0.0
-            
-            return features_df[self.feature_columns]
+            return pd.DataFrame(
+                risk_features(data), columns=self.feature_columns, index=data.index
+            )
             
         except Exception as e:
             logger.error(f"Error preparing features: {e}")
@@ -302,12 +285,13 @@ class RiskAnalyzer:
         """Save model and scaler to disk."""
         try:
             if self.model is not None:
-                model_file = os.path.join(self.model_path, 'risk_analyzer.h5')
+                model_file = os.path.join(self.model_path, RISK_MODEL_FILE)
                 self.model.save(model_file)
                 logger.info(f"Saved risk analysis model to {model_file}")
+                self.export_runtime()
             
             if self.scaler is not None:
-                scaler_file = os.path.join(self.model_path, 'risk_scaler.pkl')
+                scaler_file = os.path.join(self.model_path, RISK_SCALER_FILE)
                 joblib.dump(self.scaler, scaler_file)
                 logger.info(f"Saved risk scaler to {scaler_file}")
                 
@@ -315,15 +299,32 @@ class RiskAnalyzer:
             logger.error(f"Error saving risk analysis model: {e}")
             raise
     
+    def export_runtime(self) -> Optional[str]:
+        """Export the model for the NumPy inference runtime used in serving."""
+        try:
+            runtime_file = os.path.join(self.model_path, RISK_RUNTIME_FILE)
+            export_runtime(self.model, runtime_file)
+            logger.info(f"Exported risk analysis runtime to {runtime_file}")
+            return runtime_file
+            
+        except ValueError as e:
+            # Serving falls back to the Keras model
+            logger.warning(f"Risk analysis model not exported for the NumPy runtime: {e}")
+            return None
+    
     def load_model(self):
         """Load model and scaler from disk."""
         try:
-            model_file = os.path.join(self.model_path, 'risk_analyzer.h5')
+            # Import here to avoid circular imports
+            from app.services.model_registry import model_registry
+            
+            model_file = os.path.join(self.model_path, RISK_MODEL_FILE)
             if os.path.exists(model_file):
-                self.model = tf.keras.models.load_model(model_file)
+                # Shared with the serving registry instead of loading another copy
+                self.model = model_registry.load_keras_model(model_file)
                 logger.info(f"Loaded risk analysis model from {model_file}")
             
-            scaler_file = os.path.join(self.model_path, 'risk_scaler.pkl')
+            scaler_file = os.path.join(self.model_path, RISK_SCALER_FILE)
             if os.path.exists(scaler_file):
                 self.scaler = joblib.load(scaler_file)
                 logger.info(f"Loaded risk scaler from {scaler_file}")
@@ -8,9 +8,14 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error
+from numpy.lib.stride_tricks import sliding_window_view
 import joblib
 import os
 
+from app.ml.artifacts import WEATHER_MODEL_FILE, WEATHER_RUNTIME_FILE, WEATHER_SCALER_FILE
+from app.ml.features import WEATHER_FEATURES, weather_features
+from app.ml.runtime import export_runtime
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,11 +27,7 @@ class WeatherPredictor:
         self.model_path = model_path
         self.model = None
         self.scaler = None
-        self.feature_columns = [
-            'temperature', 'humidity', 'pressure', 'wind_speed', 
-            'wind_direction', 'precipitation', 'visibility', 
-            'cloud_cover', 'uv_index', 'pm25'
-        ]
+        self.feature_columns = list(WEATHER_FEATURES)
         self.sequence_length = 24  # 24 hours of historical data
         self.prediction_horizon = 72  # Predict up to 72 hours ahead
         
@@ -95,77 +96,138 @@ class WeatherPredictor:
             raise
     
     def prepare_data(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, StandardScaler]:
-        """Prepare data for training."""
+        """Prepare scaled features and training window start rows.
+        
+        Returns the scaled ``(rows, features)`` matrix, the start row of
+        every window (see ``_window_starts``) and the fitted scaler.
+        """
         try:
-            # Sort by timestamp
-            data = data.sort_values('timestamp').copy()
-            
-            # Fill missing values
-            data[self.feature_columns] = data[self.feature_columns].fillna(method='ffill').fillna(method='bfill')
-            
-            # Extract features
-            features = data[self.feature_columns].values
+            features, stations = self._ordered_features(data)
             
             # Scale features
             scaler = StandardScaler()
-            features_scaled = scaler.fit_transform(features)
+            features_scaled = scaler.fit_transform(features).astype(np.float32)
             
-            # Create sequences
-            X, y = self._create_sequences(features_scaled)
+            # Windows are cut lazily from the scaled rows during training
+            starts = self._window_starts(len(features_scaled), stations)
+            if len(starts) == 0:
+                raise ValueError(
+                    f"No station has more than {self.sequence_length} consecutive readings"
+                )
             
-            logger.info(f"Prepared data: X shape {X.shape}, y shape {y.shape}")
-            return X, y, scaler
+            logger.info(f"Prepared data: {len(starts)} windows over {features_scaled.shape} features")
+            return features_scaled, starts, scaler
             
         except Exception as e:
             logger.error(f"Error preparing data: {e}")
             raise
     
-    def _create_sequences(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Create sequences for LSTM training."""
+    def _ordered_features(self, data: pd.DataFrame) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Weather features ordered by station and time, with each row's station."""
+        # Sort by station, then timestamp, so every station is one contiguous run
+        if 'station_id' in data.columns:
+            data = data.sort_values(['station_id', 'timestamp'], kind='stable')
+            stations = data['station_id'].to_numpy()
+        else:
+            data = data.sort_values('timestamp', kind='stable')
+            stations = None
+        
+        # Extract features (missing values default-filled as when serving)
+        return weather_features(data), stations
+    
+    def _window_starts(self, rows: int, stations: Optional[np.ndarray] = None) -> np.ndarray:
+        """Start row of every window whose inputs and target come from one station.
+        
+        A window covers ``sequence_length`` input rows plus the target row.
+        Stations are contiguous runs, so a window stays within one station
+        exactly when its first and target rows share a station.
+        """
+        starts = np.arange(max(rows - self.sequence_length, 0))
+        if stations is not None:
+            starts = starts[stations[starts] == stations[starts + self.sequence_length]]
+        return starts
+    
+    def _create_sequences(
+        self,
+        data: np.ndarray,
+        stations: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Create (windows, next-hour targets) arrays for LSTM evaluation."""
         try:
-            X, y = [], []
+            starts = self._window_starts(len(data), stations)
             
-            for i in range(self.sequence_length, len(data)):
-                # Input sequence (past 24 hours)
-                X.append(data[i-self.sequence_length:i])
-                # Target (next hour)
-                y.append(data[i])
+            # Strided view over every window; only the kept ones are copied
+            windows = sliding_window_view(data, self.sequence_length, axis=0)
+            X = np.swapaxes(windows, 1, 2)[starts]
+            y = data[starts + self.sequence_length]
             
-            return np.array(X), np.array(y)
+            return X, y
             
         except Exception as e:
             logger.error(f"Error creating sequences: {e}")
             raise
     
+    def _sequence_dataset(
+        self,
+        data: np.ndarray,
+        starts: np.ndarray,
+        batch_size: int = 32,
+        shuffle: bool = False
+    ) -> tf.data.Dataset:
+        """Batches of (windows, targets) gathered from ``data`` on the fly.
+        
+        Only the window start rows are shuffled and batched; each batch's
+        windows are gathered from the scaled rows when it is consumed, so
+        the full ``(windows, sequence_length, features)`` array never
+        exists in memory.
+        """
+        rows = tf.constant(data, dtype=tf.float32)
+        offsets = tf.range(self.sequence_length + 1, dtype=tf.int64)
+        
+        def gather_windows(batch_starts):
+            windows = tf.gather(rows, batch_starts[:, tf.newaxis] + offsets)
+            return windows[:, :-1], windows[:, -1]
+        
+        dataset = tf.data.Dataset.from_tensor_slices(starts.astype(np.int64))
+        if shuffle:
+            dataset = dataset.shuffle(len(starts), reshuffle_each_iteration=True)
+        return dataset.batch(batch_size).map(
+            gather_windows, num_parallel_calls=tf.data.AUTOTUNE
+        ).prefetch(tf.data.AUTOTUNE)
+    
     def train(self, training_data: pd.DataFrame, validation_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """Train the weather prediction model."""
         try:
             logger.info("Starting weather prediction model training")
             
             # Prepare training data
-            X_train, y_train, self.scaler = self.prepare_data(training_data)
+            train_features, train_starts, self.scaler = self.prepare_data(training_data)
+            train_dataset = self._sequence_dataset(train_features, train_starts, shuffle=True)
+            y_train = train_features[train_starts + self.sequence_length]
             
             # Prepare validation data if provided
             validation_data_prepared = None
             if validation_data is not None:
-                validation_features = validation_data[self.feature_columns].fillna(method='ffill').fillna(method='bfill')
-                validation_scaled = self.scaler.transform(validation_features.values)
-                X_val, y_val = self._create_sequences(validation_scaled)
-                validation_data_prepared = (X_val, y_val)
+                validation_features, validation_stations = self._ordered_features(validation_data)
+                validation_scaled = self.scaler.transform(validation_features).astype(np.float32)
+                val_starts = self._window_starts(len(validation_scaled), validation_stations)
+                if len(val_starts) > 0:
+                    validation_data_prepared = self._sequence_dataset(validation_scaled, val_starts)
+                    y_val = validation_scaled[val_starts + self.sequence_length]
             
             # Build model
-            input_shape = (X_train.shape[1], X_train.shape[2])
+            input_shape = (self.sequence_length, train_features.shape[1])
             self.model = self.build_model(input_shape)
             
             # Callbacks
             callbacks = [
                 tf.keras.callbacks.EarlyStopping(
-                    monitor='val_loss' if validation_data_prepared else 'loss',
+                    monitor='val_loss' if validation_data_prepared is not None else 'loss',
                     patience=10,
                     restore_best_weights=True
                 ),
                 tf.keras.callbacks.ReduceLROnPlateau(
-                    monitor='val_loss' if validation_data_prepared else 'loss',
+                    monitor='val_loss' if validation_data_prepared is not None else 'loss',
                     factor=0.5,
                     patience=5,
                     min_lr=1e-6
@@ -173,16 +235,15 @@ class WeatherPredictor:
                 tf.keras.callbacks.ModelCheckpoint(
                     filepath=os.path.join(self.model_path, 'weather_predictor_checkpoint.h5'),
                     save_best_only=True,
-                    monitor='val_loss' if validation_data_prepared else 'loss'
+                    monitor='val_loss' if validation_data_prepared is not None else 'loss'
                 )
             ]
             
             # Train model
             history = self.model.fit(
-                X_train, y_train,
+                train_dataset,
                 validation_data=validation_data_prepared,
                 epochs=100,
-                batch_size=32,
                 callbacks=callbacks,
                 verbose=1
             )
@@ -191,7 +252,9 @@ class WeatherPredictor:
             self.save_model()
             
             # Calculate training metrics
-            train_predictions = self.model.predict(X_train)
+            train_predictions = self.model.predict(
+                self._sequence_dataset(train_features, train_starts, batch_size=1024)
+            )
             train_mse = mean_squared_error(y_train, train_predictions)
             train_mae = mean_absolute_error(y_train, train_predictions)
             
@@ -202,8 +265,8 @@ class WeatherPredictor:
                 "final_loss": float(history.history['loss'][-1])
             }
             
-            if validation_data_prepared:
-                val_predictions = self.model.predict(X_val)
+            if validation_data_prepared is not None:
+                val_predictions = self.model.predict(validation_data_prepared)
                 val_mse = mean_squared_error(y_val, val_predictions)
                 val_mae = mean_absolute_error(y_val, val_predictions)
                 training_results.update({
@@ -259,12 +322,13 @@ class WeatherPredictor:
         """Save model and scaler to disk."""
         try:
             if self.model is not None:
-                model_file = os.path.join(self.model_path, 'weather_predictor.h5')
+                model_file = os.path.join(self.model_path, WEATHER_MODEL_FILE)
                 self.model.save(model_file)
                 logger.info(f"Saved weather prediction model to {model_file}")
+                self.export_runtime()
             
             if self.scaler is not None:
-                scaler_file = os.path.join(self.model_path, 'weather_scaler.pkl')
+                scaler_file = os.path.join(self.model_path, WEATHER_SCALER_FILE)
                 joblib.dump(self.scaler, scaler_file)
                 logger.info(f"Saved weather scaler to {scaler_file}")
                 
@@ -272,15 +336,32 @@ class WeatherPredictor:
             logger.error(f"Error saving weather prediction model: {e}")
             raise
     
+    def export_runtime(self) -> Optional[str]:
+        """Export the model for the NumPy inference runtime used in serving."""
+        try:
+            runtime_file = os.path.join(self.model_path, WEATHER_RUNTIME_FILE)
+            export_runtime(self.model, runtime_file)
+            logger.info(f"Exported weather prediction runtime to {runtime_file}")
+            return runtime_file
+            
+        except ValueError as e:
+            # Serving falls back to the Keras model
+            logger.warning(f"Weather prediction model not exported for the NumPy runtime: {e}")
+            return None
+    
     def load_model(self):
         """Load model and scaler from disk."""
         try:
-            model_file = os.path.join(self.model_path, 'weather_predictor.h5')
+            # Import here to avoid circular imports
+            from app.services.model_registry import model_registry
+            
+            model_file = os.path.join(self.model_path, WEATHER_MODEL_FILE)
             if os.path.exists(model_file):
-                self.model = tf.keras.models.load_model(model_file)
+                # Shared with the serving registry instead of loading another copy
+                self.model = model_registry.load_keras_model(model_file)
                 logger.info(f"Loaded weather prediction model from {model_file}")
             
-            scaler_file = os.path.join(self.model_path, 'weather_scaler.pkl')
+            scaler_file = os.path.join(self.model_path, WEATHER_SCALER_FILE)
             if os.path.exists(scaler_file):
                 self.scaler = joblib.load(scaler_file)
                 logger.info(f"Loaded weather scaler from {scaler_file}")
@@ -295,9 +376,9 @@ class WeatherPredictor:
                 self.load_model()
             
             # Prepare test data
-            test_features = test_data[self.feature_columns].fillna(method='ffill').fillna(method='bfill')
-            test_scaled = self.scaler.transform(test_features.values)
-            X_test, y_test = self._create_sequences(test_scaled)
+            test_features, test_stations = self._ordered_features(test_data)
+            test_scaled = self.scaler.transform(test_features)
+            X_test, y_test = self._create_sequences(test_scaled, test_stations)
             
             # Make predictions
             predictions = self.model.predict(X_test)
@@ -0,0 +1,243 @@
+"""Pure NumPy inference runtime for the served Keras models.
+
+The weather LSTM and the risk network are small, so on CPU the per-call
+overhead of Keras ``predict`` (and the memory held by TensorFlow itself)
+outweighs the arithmetic. ``export_runtime`` writes the trained weights of
+a Sequential model to a ``.npz`` file that ``NumpyModel`` evaluates with
+plain matrix products, without importing TensorFlow.
+
+Supported layers are LSTM, Dense, BatchNormalization (folded into a
+per-feature scale and shift) and the inference no-ops Dropout and
+InputLayer. Exporting any other layer raises ``ValueError``; such models
+are served through Keras instead.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    """Logistic sigmoid."""
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    """Rectified linear unit."""
+    return np.maximum(x, 0.0)
+
+
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh
+}
+
+
+def _activation_name(layer: Any, attribute: str) -> str:
+    """Name of a Keras layer activation, checked against the supported ones."""
+    name = layer.get_config()[attribute]
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation {name!r} in layer {layer.name}")
+    return name
+
+
+def export_layers(model: Any) -> List[Dict[str, Any]]:
+    """Inference weights of every layer of a Keras Sequential model."""
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+
+        if kind in ("Dropout", "InputLayer"):
+            continue
+
+        if kind == "Dense":
+            kernel = layer.kernel.numpy()
+            layers.append({
+                "type": "dense",
+                "activation": _activation_name(layer, "activation"),
+                "kernel": kernel,
+                "bias": layer.bias.numpy() if config["use_bias"] else np.zeros(kernel.shape[1])
+            })
+        elif kind == "LSTM":
+            if config.get("go_backwards") or config.get("stateful"):
+                raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+            kernel, recurrent_kernel = layer.cell.kernel.numpy(), layer.cell.recurrent_kernel.numpy()
+            layers.append({
+                "type": "lstm",
+                "activation": _activation_name(layer, "activation"),
+                "recurrent_activation": _activation_name(layer, "recurrent_activation"),
+                "return_sequences": bool(config["return_sequences"]),
+                "kernel": kernel,
+                "recurrent_kernel": recurrent_kernel,
+                "bias": layer.cell.bias.numpy() if config["use_bias"] else np.zeros(kernel.shape[1])
+            })
+        elif kind == "BatchNormalization":
+            # gamma * (x - mean) / sqrt(var + eps) + beta as one scale and shift
+            variance = layer.moving_variance.numpy()
+            mean = layer.moving_mean.numpy()
+            gamma = layer.gamma.numpy() if config["scale"] else np.ones_like(mean)
+            beta = layer.beta.numpy() if config["center"] else np.zeros_like(mean)
+            scale = gamma / np.sqrt(variance + config["epsilon"])
+            layers.append({"type": "affine", "scale": scale, "shift": beta - mean * scale})
+        else:
+            raise ValueError(f"Unsupported layer {layer.name} ({kind}) for the NumPy runtime")
+
+    return layers
+
+
+def export_runtime(model: Any, path: str):
+    """Write the NumPy runtime artifact of a Keras Sequential model."""
+    layers = export_layers(model)
+    arrays = {}
+    spec = []
+    for index, layer in enumerate(layers):
+        entry = {}
+        for key, value in layer.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{index}.{key}"] = value.astype(np.float32)
+            else:
+                entry[key] = value
+        spec.append(entry)
+
+    with open(path, "wb") as f:
+        np.savez(f, __spec__=np.array(json.dumps(spec)), **arrays)
+
+
+def _fuse_lstm_gates(layer: Dict[str, Any]) -> Dict[str, Any]:
+    """Rearrange a default tanh/sigmoid LSTM so each step needs one activation call.
+
+    Gate columns are reordered to i, f, o, c and the sigmoid gates are
+    scaled by 0.5, since ``sigmoid(x) == 0.5 * tanh(0.5 * x) + 0.5``; a
+    single ``tanh`` over all gates then yields every activation.
+    """
+    if layer["activation"] != "tanh" or layer["recurrent_activation"] != "sigmoid":
+        return layer
+
+    units = layer["recurrent_kernel"].shape[0]
+    order = np.r_[0:2 * units, 3 * units:4 * units, 2 * units:3 * units]
+    scale = np.ones(4 * units, dtype=np.float32)
+    scale[:3 * units] = 0.5
+    return dict(
+        layer,
+        fused=True,
+        kernel=layer["kernel"][:, order] * scale,
+        recurrent_kernel=layer["recurrent_kernel"][:, order] * scale,
+        bias=layer["bias"][order] * scale
+    )
+
+
+class NumpyModel:
+    """Sequential model evaluated with NumPy.
+
+    ``predict`` takes the same arguments as Keras ``predict`` so the model
+    can be served wherever a Keras model is.
+    """
+
+    def __init__(self, layers: List[Dict[str, Any]]):
+        """Initialize NumPy model from exported layers."""
+        self.layers = []
+        for layer in layers:
+            layer = {
+                key: value.astype(np.float32) if isinstance(value, np.ndarray) else value
+                for key, value in layer.items()
+            }
+            if layer["type"] == "lstm":
+                layer = _fuse_lstm_gates(layer)
+            self.layers.append(layer)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyModel":
+        """Load a runtime artifact written by ``export_runtime``."""
+        with np.load(path, allow_pickle=False) as archive:
+            spec = json.loads(str(archive["__spec__"]))
+            layers = []
+            for index, entry in enumerate(spec):
+                prefix = f"{index}."
+                layers.append(dict(entry, **{
+                    name[len(prefix):]: archive[name]
+                    for name in archive.files if name.startswith(prefix)
+                }))
+        return cls(layers)
+
+    @classmethod
+    def from_keras(cls, model: Any) -> "NumpyModel":
+        """Convert an in-memory Keras model."""
+        return cls(export_layers(model))
+
+    def predict(self, inputs: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        """Run inference on a batch."""
+        outputs = np.asarray(inputs, dtype=np.float32)
+        for layer in self.layers:
+            kind = layer["type"]
+            if kind == "dense":
+                outputs = ACTIVATIONS[layer["activation"]](outputs @ layer["kernel"] + layer["bias"])
+            elif kind == "affine":
+                outputs = outputs * layer["scale"] + layer["shift"]
+            else:
+                outputs = self._lstm(layer, outputs)
+        return outputs
+
+    __call__ = predict
+
+    @staticmethod
+    def _lstm(layer: Dict[str, Any], inputs: np.ndarray) -> np.ndarray:
+        """LSTM over ``(batch, steps, features)`` with Keras gate order i, f, c, o."""
+        if layer.get("fused"):
+            return NumpyModel._fused_lstm(layer, inputs)
+
+        activation = ACTIVATIONS[layer["activation"]]
+        recurrent_activation = ACTIVATIONS[layer["recurrent_activation"]]
+        recurrent_kernel = layer["recurrent_kernel"]
+        batch_size, steps, _ = inputs.shape
+        units = recurrent_kernel.shape[0]
+
+        # Input projections of every step in one product
+        projected = inputs @ layer["kernel"] + layer["bias"]
+        hidden = np.zeros((batch_size, units), dtype=np.float32)
+        cell = np.zeros((batch_size, units), dtype=np.float32)
+        sequence = np.empty((batch_size, steps, units), dtype=np.float32) if layer["return_sequences"] else None
+
+        for step in range(steps):
+            gates = projected[:, step] + hidden @ recurrent_kernel
+            input_gate = recurrent_activation(gates[:, :units])
+            forget_gate = recurrent_activation(gates[:, units:2 * units])
+            candidate = activation(gates[:, 2 * units:3 * units])
+            output_gate = recurrent_activation(gates[:, 3 * units:])
+            cell = forget_gate * cell + input_gate * candidate
+            hidden = output_gate * activation(cell)
+            if sequence is not None:
+                sequence[:, step] = hidden
+
+        return sequence if sequence is not None else hidden
+
+    @staticmethod
+    def _fused_lstm(layer: Dict[str, Any], inputs: np.ndarray) -> np.ndarray:
+        """LSTM with gates prepared by ``_fuse_lstm_gates``."""
+        recurrent_kernel = layer["recurrent_kernel"]
+        batch_size, steps, _ = inputs.shape
+        units = recurrent_kernel.shape[0]
+
+        projected = inputs @ layer["kernel"] + layer["bias"]
+        hidden = np.zeros((batch_size, units), dtype=np.float32)
+        cell = np.zeros((batch_size, units), dtype=np.float32)
+        gates = np.empty((batch_size, 4 * units), dtype=np.float32)
+        sequence = np.empty((batch_size, steps, units), dtype=np.float32) if layer["return_sequences"] else None
+
+        for step in range(steps):
+            np.dot(hidden, recurrent_kernel, out=gates)
+            gates += projected[:, step]
+            np.tanh(gates, out=gates)
+            sigmoid = gates[:, :3 * units]
+            sigmoid *= 0.5
+            sigmoid += 0.5
+            cell *= sigmoid[:, units:2 * units]
+            cell += sigmoid[:, :units] * gates[:, 3 * units:]
+            hidden = sigmoid[:, 2 * units:] * np.tanh(cell)
+            if sequence is not None:
+                sequence[:, step] = hidden
+
+        return sequence if sequence is not None else hidden
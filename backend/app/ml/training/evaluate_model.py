@@ -15,7 +15,8 @@ from app.db.database import get_db
 from app.models.climate import ClimateData, WeatherStation
 from app.ml.models.weather_predictor import WeatherPredictor
 from app.ml.models.risk_analyzer import RiskAnalyzer
-from app.ml.data.preprocessing import DataPreprocessor
+from app.ml.artifacts import ModelArtifactStore
+from app.ml.features import prepare_climate_frame
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +26,10 @@ class ModelEvaluator:
     
     def __init__(self, model_path: str = "./models"):
         """Initialize model evaluator."""
-        self.model_path = model_path
-        self.weather_predictor = WeatherPredictor(model_path)
-        self.risk_analyzer = RiskAnalyzer(model_path)
-        self.preprocessor = DataPreprocessor()
+        # Evaluate the version currently being served
+        self.model_path = ModelArtifactStore(model_path).active_path()
+        self.weather_predictor = WeatherPredictor(self.model_path)
+        self.risk_analyzer = RiskAnalyzer(self.model_path)
     
     def load_test_data(self, db: Session, days_back: int = 30) -> pd.DataFrame:
         """Load test data from database."""
@@ -67,8 +68,7 @@ class ModelEvaluator:
                 raise ValueError("Weather prediction model not found")
             
             # Prepare test data
-            cleaned_data = self.preprocessor.clean_climate_data(test_data)
-            processed_data = self.preprocessor.handle_missing_values(cleaned_data)
+            processed_data = prepare_climate_frame(test_data)
             
             # Evaluate model
             evaluation_results = self.weather_predictor.evaluate(processed_data)
@@ -207,8 +207,7 @@ class ModelEvaluator:
                 raise ValueError("Risk prediction model not found")
             
             # Prepare test data
-            cleaned_data = self.preprocessor.clean_climate_data(test_data)
-            processed_data = self.preprocessor.handle_missing_values(cleaned_data)
+            processed_data = prepare_climate_frame(test_data)
             
             # Evaluate model
             evaluation_results = self.risk_analyzer.evaluate(processed_data)
@@ -10,8 +10,8 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.models.climate import ClimateData, WeatherStation
 from app.ml.models.weather_predictor import WeatherPredictor
-from app.ml.data.preprocessing import DataPreprocessor
-from app.ml.data.feature_engineering import FeatureEngineer
+from app.ml.artifacts import ModelArtifactStore
+from app.ml.features import prepare_climate_frame
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +21,11 @@ class WeatherModelTrainer:
     
     def __init__(self, model_path: str = "./models"):
         """Initialize weather model trainer."""
-        self.model_path = model_path
-        self.predictor = WeatherPredictor(model_path)
-        self.preprocessor = DataPreprocessor()
-        self.feature_engineer = FeatureEngineer()
+        # Each run trains into its own version, published once it is evaluated
+        self.store = ModelArtifactStore(model_path)
+        self.model_version = self.store.new_version()
+        self.model_path = self.store.version_path(self.model_version)
+        self.predictor = WeatherPredictor(self.model_path)
     
     def load_training_data(self, db: Session, days_back: int = 365) -> pd.DataFrame:
         """Load training data from database."""
@@ -54,19 +55,8 @@ class WeatherModelTrainer:
     def prepare_training_data(self, raw_data: pd.DataFrame) -> pd.DataFrame:
         """Prepare data for training."""
         try:
-            # Clean data
-            cleaned_data = self.preprocessor.clean_climate_data(raw_data)
-            
-            # Handle missing values
-            processed_data = self.preprocessor.handle_missing_values(
-                cleaned_data, strategy='knn'
-            )
-            
-            # Create temporal features
-            enhanced_data = self.preprocessor.create_temporal_features(processed_data)
-            
-            # Create weather interactions
-            final_data = self.feature_engineer.create_weather_interactions(enhanced_data)
+            # Clean data and fill missing values with the shared serving defaults
+            final_data = prepare_climate_frame(raw_data)
             
             logger.info(f"Prepared training data: {len(final_data)} records")
             return final_data
@@ -106,12 +96,19 @@ class WeatherModelTrainer:
             # Evaluate on validation data
             evaluation_results = self.predictor.evaluate(val_data)
             
+            # Publish and activate the new version; API workers switch to it on their next poll
+            self.store.publish(
+                self.model_version,
+                metrics={"weather": {**training_results, **evaluation_results}}
+            )
+            
             # Combine results
             results = {
                 "training_completed": True,
                 "training_results": training_results,
                 "evaluation_results": evaluation_results,
                 "model_path": self.model_path,
+                "model_version": self.model_version,
                 "training_timestamp": datetime.utcnow().isoformat()
             }
             
@@ -178,7 +175,7 @@ def train_weather_model_cli():
         print(f"Training completed: {results['training_completed']}")
         print(f"Training MSE: {results['training_results']['train_mse']:.4f}")
         print(f"Validation MSE: {results['evaluation_results']['overall_mse']:.4f}")
-        print(f"Model saved to: {results['model_path']}")
+        print(f"Model version {results['model_version']} saved to: {results['model_path']}")
         
         return results
         
@@ -1,7 +1,7 @@
 """Database models package."""
 
 from app.models.user import User
-from app.models.climate import ClimateData, WeatherStation, RiskAssessment
+from app.models.climate import ClimateData, WeatherStation, RiskAssessment, ClimateRollup
 from app.models.emergency import EmergencyAlert, EmergencyResponse
 
 __all__ = [
@@ -9,6 +9,7 @@ __all__ = [
     "ClimateData",
     "WeatherStation", 
     "RiskAssessment",
+    "ClimateRollup",
     "EmergencyAlert",
     "EmergencyResponse"
 ]
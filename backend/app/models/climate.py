@@ -1,6 +1,8 @@
 """Climate data models."""
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -32,6 +34,15 @@ class ClimateData(Base):
     """Climate data model."""
     
     __tablename__ = "climate_data"
+    __table_args__ = (
+        # Per-station time ranges; unique as the ingestion dedup key
+        Index(
+            "uq_climate_data_station_timestamp_source", "station_id", "timestamp", "data_source",
+            unique=True
+        ),
+        # Time ranges across stations, retention and keyset ordering
+        Index("ix_climate_data_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     station_id = Column(Integer, ForeignKey("weather_stations.id"), nullable=False)
@@ -62,7 +73,8 @@ class ClimateData(Base):
     blockchain_hash = Column(String(66))  # Blockchain verification hash
     ipfs_hash = Column(String(100))       # IPFS storage hash
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Indexed for the incremental rollup compaction watermark
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     station = relationship("WeatherStation", back_populates="climate_data")
@@ -75,7 +87,7 @@ class RiskAssessment(Base):
     __tablename__ = "risk_assessments"
     
     id = Column(Integer, primary_key=True, index=True)
-    climate_data_id = Column(Integer, ForeignKey("climate_data.id"), nullable=False)
+    climate_data_id = Column(Integer, ForeignKey("climate_data.id"), nullable=False, index=True)
     
     # Risk scores (0-1 scale)
     flood_risk = Column(Float, default=0.0)
@@ -95,7 +107,37 @@ class RiskAssessment(Base):
     risk_factors = Column(Text)  # JSON string of contributing factors
     recommendations = Column(Text)  # JSON string of recommendations
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     climate_data = relationship("ClimateData", back_populates="risk_assessments")
+
+
+class ClimateRollup(Base):
+    """Per-station, per-metric aggregates of climate data over time buckets.
+    
+    Rows hold the count, sum, minimum and maximum of one metric for one
+    station over an hourly or daily bucket, so any range made of whole
+    buckets can be summarized without reading the raw readings.
+    """
+    
+    __tablename__ = "climate_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "bucket_start", "metric", "station_id",
+            name="uq_climate_rollups_bucket"
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    station_id = Column(Integer, ForeignKey("weather_stations.id"), nullable=False)
+    granularity = Column(String(10), nullable=False)  # hour, day
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    metric = Column(String(30), nullable=False)
+    
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float)
+    minimum = Column(Float)
+    maximum = Column(Float)
+    
+    computed_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -3,17 +3,16 @@
 import logging
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sklearn.preprocessing import StandardScaler
-import joblib
 import json
 
+from app.ml.features import risk_features, weather_features
 from app.models.climate import ClimateData, RiskAssessment
 from app.schemas.climate import ClimateDataResponse, RiskAssessmentResponse
-from app.core.config import settings
+from app.services.model_registry import ModelRegistry, model_registry
+from app.services.station_index import station_index
 
 logger = logging.getLogger(__name__)
 
@@ -21,122 +20,28 @@ logger = logging.getLogger(__name__)
 class PredictionService:
     """AI prediction service for climate risk assessment."""
     
-    def __init__(self):
-        """Initialize prediction service."""
-        self.model_path = settings.MODEL_PATH
-        self.weather_model = None
-        self.risk_model = None
-        self.scaler = None
-        self._load_models()
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        """Initialize prediction service.
+        
+        Models come from the process-wide registry and are loaded on first
+        use, so constructing the service is cheap.
+        """
+        self.registry = registry or model_registry
     
-    def _load_models(self):
-        """Load pre-trained models."""
-        try:
-            # Load weather prediction model
-            weather_model_path = f"{self.model_path}/weather_predictor.h5"
-            self.weather_model = tf.keras.models.load_model(weather_model_path)
-            
-            # Load risk assessment model
-            risk_model_path = f"{self.model_path}/risk_analyzer.h5"
-            self.risk_model = tf.keras.models.load_model(risk_model_path)
-            
-            # Load feature scaler
-            scaler_path = f"{self.model_path}/feature_scaler.pkl"
-            self.scaler = joblib.load(scaler_path)
-            
-            logger.info("AI models loaded successfully")
-            
-        except Exception as e:
-            logger.warning(f"Could not load AI models: {e}")
-            self._initialize_default_models()
-    
-    def _initialize_default_models(self):
-        """Initialize default models if pre-trained models are not available."""
-        try:
-            # Create simple LSTM model for weather prediction
-            self.weather_model = tf.keras.Sequential([
-                tf.keras.layers.LSTM(50, return_sequences=True, input_shape=(24, 10)),
-                tf.keras.layers.LSTM(50, return_sequences=False),
-                tf.keras.layers.Dense(25),
-                tf.keras.layers.Dense(10)
-            ])
-            self.weather_model.compile(optimizer='adam', loss='mse')
-            
-            # Create neural network for risk assessment
-            self.risk_model = tf.keras.Sequential([
-                tf.keras.layers.Dense(64, activation='relu', input_shape=(15,)),
-                tf.keras.layers.Dropout(0.3),
-                tf.keras.layers.Dense(32, activation='relu'),
-                tf.keras.layers.Dropout(0.3),
-                tf.keras.layers.Dense(16, activation='relu'),
-                tf.keras.layers.Dense(6, activation='sigmoid')  # 6 risk types
-            ])
-            self.risk_model.compile(optimizer='adam', loss='binary_crossentropy')
-            
-            # Initialize scaler
-            self.scaler = StandardScaler()
-            
-            logger.info("Default AI models initialized")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize default models: {e}")
+    @property
+    def model_version(self) -> str:
+        """Version of the models currently being served."""
+        return self.registry.version
     
     def _prepare_weather_features(self, climate_data: List[ClimateData]) -> np.ndarray:
         """Prepare features for weather prediction."""
         try:
-            features = []
-            for data in climate_data:
-                feature_vector = [
-                    data.temperature or 0.0,
-                    data.humidity or 0.0,
-                    data.pressure or 1013.25,
-                    data.wind_speed or 0.0,
-                    data.wind_direction or 0.0,
-                    data.precipitation or 0.0,
-                    data.visibility or 10.0,
-                    data.cloud_cover or 0.0,
-                    data.uv_index or 0.0,
-                    data.pm25 or 0.0
-                ]
-                features.append(feature_vector)
-            
-            return np.array(features)
+            return weather_features(climate_data)
             
         except Exception as e:
             logger.error(f"Error preparing weather features: {e}")
             return np.array([])
     
-    def _prepare_risk_features(self, climate_data: ClimateData) -> np.ndarray:
-        """Prepare features for risk assessment."""
-        try:
-            # Extract temporal features
-            hour = climate_data.timestamp.hour
-            day_of_year = climate_data.timestamp.timetuple().tm_yday
-            
-            feature_vector = [
-                climate_data.temperature or 0.0,
-                climate_data.humidity or 0.0,
-                climate_data.pressure or 1013.25,
-                climate_data.wind_speed or 0.0,
-                climate_data.precipitation or 0.0,
-                climate_data.visibility or 10.0,
-                climate_data.cloud_cover or 0.0,
-                climate_data.uv_index or 0.0,
-                climate_data.pm25 or 0.0,
-                climate_data.pm10 or 0.0,
-                hour,
-                day_of_year,
-                np.sin(2 * np.pi * hour / 24),  # Cyclical hour encoding
-                np.cos(2 * np.pi * hour / 24),
-                np.sin(2 * np.pi * day_of_year / 365)  # Cyclical day encoding
-            ]
-            
-            return np.array(feature_vector).reshape(1, -1)
-            
-        except Exception as e:
-            logger.error(f"Error preparing risk features: {e}")
-            return np.array([]).reshape(1, -1)
-    
     async def generate_forecast(
         self, 
         latitude: float, 
@@ -145,70 +50,115 @@ class PredictionService:
         db: Session
     ) -> List[ClimateDataResponse]:
         """Generate weather forecast for specific location."""
+        forecasts = await self.generate_forecasts([(latitude, longitude)], hours, db)
+        return forecasts[0]
+    
+    async def generate_forecasts(
+        self,
+        locations: List[Tuple[float, float]],
+        hours: int,
+        db: Session
+    ) -> List[List[ClimateDataResponse]]:
+        """Generate weather forecasts for many locations in one batched rollout."""
+        try:
+            models = await self.registry.aget()
+            forecasts: List[Optional[List[ClimateDataResponse]]] = [None] * len(locations)
+            windows = []
+            batch_indexes = []
+            
+            # Locations without enough history fall back to the default forecast
+            for index, (latitude, longitude) in enumerate(locations):
+                window = self._prepare_forecast_window(
+                    latitude, longitude, db, models.weather_scaler
+                )
+                if window is None or models.forecast_engine is None:
+                    forecasts[index] = self._generate_default_forecast(latitude, longitude, hours)
+                else:
+                    windows.append(window)
+                    batch_indexes.append(index)
+            
+            if windows:
+                # Step all location windows together as a single batch
+                predictions = models.forecast_engine.forecast(np.stack(windows), hours)
+                current_time = datetime.utcnow()
+                
+                for row, index in enumerate(batch_indexes):
+                    forecasts[index] = self._build_forecast_points(predictions[row], current_time)
+            
+            logger.info(
+                f"Generated {hours}-hour forecast for {len(locations)} locations "
+                f"({len(windows)} model-based)"
+            )
+            return forecasts
+            
+        except Exception as e:
+            logger.error(f"Error generating forecast: {e}")
+            return [
+                self._generate_default_forecast(latitude, longitude, hours)
+                for latitude, longitude in locations
+            ]
+    
+    def _prepare_forecast_window(
+        self,
+        latitude: float,
+        longitude: float,
+        db: Session,
+        scaler=None
+    ) -> Optional[np.ndarray]:
+        """Prepare the scaled 24-hour input window for a location."""
         try:
             # Get recent historical data for the location
             recent_data = self._get_recent_data_for_location(latitude, longitude, db)
             
             if len(recent_data) < 24:  # Need at least 24 hours of data
-                return self._generate_default_forecast(latitude, longitude, hours)
+                return None
             
             # Prepare features
             features = self._prepare_weather_features(recent_data[-24:])
             
             if features.size == 0:
-                return self._generate_default_forecast(latitude, longitude, hours)
+                return None
             
             # Scale features
-            if self.scaler:
-                features_scaled = self.scaler.transform(features)
-            else:
-                features_scaled = features
-            
-            # Reshape for LSTM input
-            features_reshaped = features_scaled.reshape(1, 24, -1)
-            
-            # Generate predictions
-            forecast_data = []
-            current_time = datetime.utcnow()
-            
-            for i in range(hours):
-                # Predict next time step
-                prediction = self.weather_model.predict(features_reshaped, verbose=0)
-                
-                # Create forecast data point
-                forecast_time = current_time + timedelta(hours=i+1)
-                forecast_point = ClimateDataResponse(
-                    id=0,  # Temporary ID for forecast
-                    station_id=0,  # No specific station for forecast
-                    timestamp=forecast_time,
-                    temperature=float(prediction[0][0]),
-                    humidity=float(prediction[0][1]),
-                    pressure=float(prediction[0][2]),
-                    wind_speed=float(prediction[0][3]),
-                    wind_direction=float(prediction[0][4]),
-                    precipitation=float(prediction[0][5]),
-                    visibility=float(prediction[0][6]),
-                    cloud_cover=float(prediction[0][7]),
-                    uv_index=float(prediction[0][8]),
-                    pm25=float(prediction[0][9]),
-                    data_source="AI_Forecast",
-                    quality_score=0.8,
-                    created_at=datetime.utcnow()
-                )
-                
-                forecast_data.append(forecast_point)
-                
-                # Update features for next prediction
-                new_features = np.append(features_scaled[1:], prediction.reshape(1, -1), axis=0)
-                features_reshaped = new_features.reshape(1, 24, -1)
-                features_scaled = new_features
+            if scaler:
+                features = scaler.transform(features)
             
-            logger.info(f"Generated {hours}-hour forecast for location ({latitude}, {longitude})")
-            return forecast_data
+            return features
             
         except Exception as e:
-            logger.error(f"Error generating forecast: {e}")
-            return self._generate_default_forecast(latitude, longitude, hours)
+            logger.error(f"Error preparing forecast window: {e}")
+            return None
+    
+    def _build_forecast_points(
+        self,
+        predictions: np.ndarray,
+        current_time: datetime
+    ) -> List[ClimateDataResponse]:
+        """Convert an (hours, features) prediction array into forecast points."""
+        forecast_data = []
+        created_at = datetime.utcnow()
+        
+        for i, prediction in enumerate(predictions.tolist()):
+            forecast_data.append(ClimateDataResponse(
+                id=0,  # Temporary ID for forecast
+                station_id=0,  # No specific station for forecast
+                timestamp=current_time + timedelta(hours=i+1),
+                temperature=prediction[0],
+                humidity=prediction[1],
+                pressure=prediction[2],
+                wind_speed=prediction[3],
+                wind_direction=prediction[4],
+                precipitation=prediction[5],
+                visibility=prediction[6],
+                cloud_cover=prediction[7],
+                uv_index=prediction[8],
+                pm25=prediction[9],
+                data_source="AI_Forecast",
+                quality_score=0.8,
+                created_at=created_at
+            ))
+        
+        return forecast_data
     
     def _get_recent_data_for_location(
         self, 
@@ -217,40 +167,82 @@ class PredictionService:
         db: Session,
         radius_km: float = 50.0
     ) -> List[ClimateData]:
-        """Get recent climate data for location within radius."""
+        """Get the recent time series of the nearest station within radius."""
         try:
-            # Simple distance calculation (for production, use PostGIS)
-            from sqlalchemy import func, and_
-            from app.models.climate import WeatherStation
-            
-            # Get stations within approximate radius
-            stations = db.query(WeatherStation).filter(
-                and_(
-                    WeatherStation.latitude.between(latitude - 0.5, latitude + 0.5),
-                    WeatherStation.longitude.between(longitude - 0.5, longitude + 0.5),
-                    WeatherStation.is_active == True
-                )
-            ).all()
+            series_by_station = self._get_recent_series_for_location(
+                latitude, longitude, db, radius_km=radius_km
+            )
             
-            if not stations:
+            if not series_by_station:
                 return []
             
-            station_ids = [station.id for station in stations]
-            
-            # Get recent data from these stations
-            recent_data = db.query(ClimateData).filter(
-                and_(
-                    ClimateData.station_id.in_(station_ids),
-                    ClimateData.timestamp >= datetime.utcnow() - timedelta(days=7)
-                )
-            ).order_by(ClimateData.timestamp.desc()).limit(100).all()
+            # Prefer the nearest station with a full input window
+            for _, _, series in series_by_station:
+                if len(series) >= 24:
+                    return series
             
-            return recent_data
+            return max((series for _, _, series in series_by_station), key=len)
             
         except Exception as e:
             logger.error(f"Error getting recent data for location: {e}")
             return []
     
+    def _get_recent_series_for_location(
+        self,
+        latitude: float,
+        longitude: float,
+        db: Session,
+        radius_km: float = 50.0,
+        max_stations: int = 5,
+        max_points: int = 100
+    ) -> List[Tuple[int, float, List[ClimateData]]]:
+        """Get per-station recent time series for the nearest stations within radius.
+        
+        Returns (station pk, distance_km, readings oldest to newest) tuples,
+        nearest station first.
+        """
+        from sqlalchemy import func, and_
+        
+        station_index.ensure_loaded(db)
+        nearby_stations = station_index.nearest(
+            latitude, longitude, k=max_stations, radius_km=radius_km
+        )
+        
+        if not nearby_stations:
+            return []
+        
+        station_ids = [station_pk for station_pk, _ in nearby_stations]
+        
+        # Rank readings per station so each station gets its own newest rows
+        ranked = db.query(
+            ClimateData.id.label("id"),
+            func.row_number().over(
+                partition_by=ClimateData.station_id,
+                order_by=ClimateData.timestamp.desc()
+            ).label("row_number")
+        ).filter(
+            and_(
+                ClimateData.station_id.in_(station_ids),
+                ClimateData.timestamp >= datetime.utcnow() - timedelta(days=7)
+            )
+        ).subquery()
+        
+        recent_data = db.query(ClimateData).join(
+            ranked, ClimateData.id == ranked.c.id
+        ).filter(
+            ranked.c.row_number <= max_points
+        ).order_by(ClimateData.station_id, ClimateData.timestamp).all()
+        
+        series: Dict[int, List[ClimateData]] = {}
+        for data in recent_data:
+            series.setdefault(data.station_id, []).append(data)
+        
+        return [
+            (station_pk, distance, series[station_pk])
+            for station_pk, distance in nearby_stations
+            if station_pk in series
+        ]
+    
     def _generate_default_forecast(
         self, 
         latitude: float, 
@@ -305,52 +297,90 @@ class PredictionService:
         db: Session
     ) -> Optional[RiskAssessment]:
         """Generate risk assessment for climate data."""
+        risk_assessments = await self.generate_risk_assessments([climate_data], db)
+        return risk_assessments[0]
+    
+    async def generate_risk_assessments(
+        self,
+        climate_data_batch: List[ClimateData],
+        db: Optional[Session] = None
+    ) -> List[Optional[RiskAssessment]]:
+        """Generate risk assessments for a batch of climate data with one model call."""
         try:
-            # Prepare features
-            features = self._prepare_risk_features(climate_data)
+            models = await self.registry.aget()
+            risk_assessments: List[Optional[RiskAssessment]] = [None] * len(climate_data_batch)
+            
+            # Featurize the whole batch at once, falling back to rules for rows
+            # that cannot be featurized (no timestamp) or when no risk model is served
+            all_features = risk_features(climate_data_batch)
+            featurized = np.isfinite(all_features).all(axis=1) & (models.risk_model is not None)
+            batch_indexes = np.flatnonzero(featurized).tolist()
+            
+            for index in np.flatnonzero(~featurized):
+                risk_assessments[index] = self._generate_default_risk_assessment(
+                    climate_data_batch[index]
+                )
             
-            if features.size == 0:
-                return self._generate_default_risk_assessment(climate_data)
+            if not batch_indexes:
+                return risk_assessments
+            
+            features = all_features[featurized]
             
             # Scale features
-            if self.scaler:
-                features_scaled = self.scaler.transform(features)
+            if models.risk_scaler:
+                features_scaled = models.risk_scaler.transform(features)
             else:
                 features_scaled = features
             
-            # Predict risks
-            risk_predictions = self.risk_model.predict(features_scaled, verbose=0)
-            
-            # Calculate overall risk
-            overall_risk = float(np.mean(risk_predictions[0]))
-            
-            # Generate explanations
-            risk_factors = self._generate_risk_explanations(climate_data, risk_predictions[0])
-            recommendations = self._generate_recommendations(risk_predictions[0])
-            
-            # Create risk assessment
-            risk_assessment = RiskAssessment(
-                climate_data_id=climate_data.id,
-                flood_risk=float(risk_predictions[0][0]),
-                drought_risk=float(risk_predictions[0][1]),
-                storm_risk=float(risk_predictions[0][2]),
-                heat_wave_risk=float(risk_predictions[0][3]),
-                cold_wave_risk=float(risk_predictions[0][4]),
-                wildfire_risk=float(risk_predictions[0][5]),
-                overall_risk=overall_risk,
-                model_version="v1.0",
-                confidence_score=0.85,
-                prediction_horizon=24,
-                risk_factors=json.dumps(risk_factors),
-                recommendations=json.dumps(recommendations)
+            # Predict risks for the whole batch
+            risk_predictions = models.risk_model.predict(
+                features_scaled, batch_size=len(batch_indexes), verbose=0
             )
             
-            logger.info(f"Generated risk assessment for climate data {climate_data.id}")
-            return risk_assessment
+            for row, index in enumerate(batch_indexes):
+                risk_assessments[index] = self._build_risk_assessment(
+                    climate_data_batch[index], risk_predictions[row], models.version
+                )
+            
+            logger.info(f"Generated {len(batch_indexes)} risk assessments in one batch")
+            return risk_assessments
             
         except Exception as e:
             logger.error(f"Error generating risk assessment: {e}")
-            return self._generate_default_risk_assessment(climate_data)
+            return [
+                self._generate_default_risk_assessment(climate_data)
+                for climate_data in climate_data_batch
+            ]
+    
+    def _build_risk_assessment(
+        self,
+        climate_data: ClimateData,
+        risk_predictions: np.ndarray,
+        model_version: str
+    ) -> RiskAssessment:
+        """Create a risk assessment from one row of model predictions."""
+        # Calculate overall risk
+        overall_risk = float(np.mean(risk_predictions))
+        
+        # Generate explanations
+        risk_factors = self._generate_risk_explanations(climate_data, risk_predictions)
+        recommendations = self._generate_recommendations(risk_predictions)
+        
+        return RiskAssessment(
+            climate_data_id=climate_data.id,
+            flood_risk=float(risk_predictions[0]),
+            drought_risk=float(risk_predictions[1]),
+            storm_risk=float(risk_predictions[2]),
+            heat_wave_risk=float(risk_predictions[3]),
+            cold_wave_risk=float(risk_predictions[4]),
+            wildfire_risk=float(risk_predictions[5]),
+            overall_risk=overall_risk,
+            model_version=model_version,
+            confidence_score=0.85,
+            prediction_horizon=24,
+            risk_factors=json.dumps(risk_factors),
+            recommendations=json.dumps(recommendations)
+        )
     
     def _generate_default_risk_assessment(self, climate_data: ClimateData) -> RiskAssessment:
         """Generate default risk assessment using rule-based approach."""
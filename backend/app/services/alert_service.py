@@ -7,10 +7,11 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from geopy.distance import geodesic
 
 from app.models.emergency import EmergencyAlert
 from app.models.user import User, UserRole
+from app.services.notification_pipeline import NotificationChannel, NotificationPipeline
+from app.services.user_location_index import user_location_index
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,34 @@ class AlertService:
             "push": self._send_push_notification,
             "webhook": self._send_webhook_notification
         }
+        self.user_fetch_chunk_size = 5000
+        self.notification_pipeline = NotificationPipeline([
+            NotificationChannel(
+                "push",
+                self._send_push_notification,
+                concurrency=settings.NOTIFICATION_PUSH_CONCURRENCY,
+                rate_per_second=settings.NOTIFICATION_PUSH_RATE,
+                send_batch=self._send_push_notifications_bulk,
+                batch_size=settings.NOTIFICATION_PUSH_BATCH_SIZE,
+                max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS
+            ),
+            NotificationChannel(
+                "email",
+                self._send_email_notification,
+                concurrency=settings.NOTIFICATION_EMAIL_CONCURRENCY,
+                rate_per_second=settings.NOTIFICATION_EMAIL_RATE,
+                send_batch=self._send_email_notifications_bulk,
+                batch_size=settings.NOTIFICATION_EMAIL_BATCH_SIZE,
+                max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS
+            ),
+            NotificationChannel(
+                "sms",
+                self._send_sms_notification,
+                concurrency=settings.NOTIFICATION_SMS_CONCURRENCY,
+                rate_per_second=settings.NOTIFICATION_SMS_RATE,
+                max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS
+            )
+        ])
     
     async def send_alert_notifications(
         self,
@@ -42,40 +71,17 @@ class AlertService:
                 logger.info(f"No users found in affected area for alert {alert.alert_id}")
                 return {"notifications_sent": 0, "errors": []}
             
-            # Send notifications
-            notification_results = {
-                "notifications_sent": 0,
-                "errors": [],
-                "channels_used": []
+            # Push is the primary channel, email secondary, SMS only for critical alerts
+            deliveries = {
+                "push": affected_users,
+                "email": [user for user in affected_users if user.email],
+                "sms": [
+                    user for user in affected_users if user.phone_number
+                ] if alert.severity.value == "critical" else []
             }
             
-            # Group users by notification preferences
-            for user in affected_users:
-                try:
-                    # Send push notification (primary channel)
-                    if await self._send_push_notification(user, alert):
-                        notification_results["notifications_sent"] += 1
-                        if "push" not in notification_results["channels_used"]:
-                            notification_results["channels_used"].append("push")
-                    
-                    # Send email notification (secondary channel)
-                    if user.email and await self._send_email_notification(user, alert):
-                        notification_results["notifications_sent"] += 1
-                        if "email" not in notification_results["channels_used"]:
-                            notification_results["channels_used"].append("email")
-                    
-                    # Send SMS for critical alerts
-                    if (alert.severity.value == "critical" and 
-                        user.phone_number and 
-                        await self._send_sms_notification(user, alert)):
-                        notification_results["notifications_sent"] += 1
-                        if "sms" not in notification_results["channels_used"]:
-                            notification_results["channels_used"].append("sms")
-                    
-                except Exception as e:
-                    error_msg = f"Error sending notification to user {user.id}: {e}"
-                    logger.error(error_msg)
-                    notification_results["errors"].append(error_msg)
+            # Fan out over all channels concurrently
+            notification_results = await self.notification_pipeline.dispatch(deliveries, alert)
             
             # Send to government agencies
             await self._notify_government_agencies(alert, db)
@@ -94,34 +100,31 @@ class AlertService:
     ) -> List[User]:
         """Find users in the affected area of the alert."""
         try:
-            # Get all active users with location preferences
-            users = db.query(User).filter(
-                and_(
-                    User.is_active == True,
-                    User.default_latitude.isnot(None),
-                    User.default_longitude.isnot(None)
-                )
-            ).all()
+            alert_radius = alert.radius or 50  # Default 50km radius
+            
+            # Prune to nearby users with the spatial index instead of scanning everyone
+            user_location_index.ensure_loaded(db)
+            nearby_users = user_location_index.find_users_in_range(
+                alert.latitude, alert.longitude, alert_radius
+            )
+            
+            if not nearby_users:
+                return []
             
+            user_ids = [user_id for user_id, _ in nearby_users]
             affected_users = []
-            alert_location = (alert.latitude, alert.longitude)
-            alert_radius = alert.radius or 50  # Default 50km radius
             
-            for user in users:
-                try:
-                    user_location = (float(user.default_latitude), float(user.default_longitude))
-                    distance = geodesic(alert_location, user_location).kilometers
-                    
-                    # Check if user is within alert radius or their notification radius
-                    user_radius = user.notification_radius or 50
-                    effective_radius = max(alert_radius, user_radius)
-                    
-                    if distance <= effective_radius:
-                        affected_users.append(user)
-                        
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Invalid location data for user {user.id}: {e}")
-                    continue
+            # Load the matched users in chunks to keep IN lists bounded
+            for start in range(0, len(user_ids), self.user_fetch_chunk_size):
+                chunk = user_ids[start:start + self.user_fetch_chunk_size]
+                affected_users.extend(
+                    db.query(User).filter(
+                        and_(
+                            User.id.in_(chunk),
+                            User.is_active == True
+                        )
+                    ).all()
+                )
             
             return affected_users
             
@@ -161,6 +164,39 @@ class AlertService:
             logger.error(f"Error sending push notification: {e}")
             return False
     
+    async def _send_push_notifications_bulk(
+        self,
+        users: List[User],
+        alert: EmergencyAlert
+    ) -> List[bool]:
+        """Send one multicast push notification to a batch of users."""
+        try:
+            # Mock multicast implementation
+            # In production, use Firebase Cloud Messaging multicast (up to 500 tokens)
+            
+            notification_data = {
+                "title": f"🚨 {alert.severity.value.upper()} ALERT",
+                "body": alert.title,
+                "data": {
+                    "alert_id": alert.alert_id,
+                    "severity": alert.severity.value,
+                    "location": alert.location_name or f"{alert.latitude}, {alert.longitude}",
+                    "type": alert.risk_type or "emergency"
+                },
+                "recipients": [user.id for user in users]
+            }
+            
+            # Log notification (replace with actual push service)
+            logger.info(f"Push notification sent to {len(users)} users: {notification_data['title']}")
+            
+            # Simulate successful delivery
+            await asyncio.sleep(0.1)
+            return [True] * len(users)
+            
+        except Exception as e:
+            logger.error(f"Error sending bulk push notification: {e}")
+            return [False] * len(users)
+    
     async def _send_email_notification(
         self,
         user: User,
@@ -204,6 +240,41 @@ class AlertService:
             logger.error(f"Error sending email notification: {e}")
             return False
     
+    async def _send_email_notifications_bulk(
+        self,
+        users: List[User],
+        alert: EmergencyAlert
+    ) -> List[bool]:
+        """Send one bulk email request to a batch of users."""
+        try:
+            # Mock bulk email implementation
+            # In production, use SES bulk templated email or SendGrid personalizations
+            
+            email_content = {
+                "to": [user.email for user in users],
+                "subject": f"Emergency Alert: {alert.title}",
+                "template_data": {
+                    "severity": alert.severity.value.upper(),
+                    "title": alert.title,
+                    "description": alert.description,
+                    "location": alert.location_name or f"{alert.latitude}, {alert.longitude}",
+                    "issued_at": str(alert.issued_at),
+                    "expires_at": str(alert.expires_at) if alert.expires_at else None,
+                    "contact": alert.contact_info or "Emergency Services"
+                }
+            }
+            
+            # Log email (replace with actual email service)
+            logger.info(f"Email notification sent to {len(email_content['to'])} users: {alert.title}")
+            
+            # Simulate successful delivery
+            await asyncio.sleep(0.1)
+            return [True] * len(users)
+            
+        except Exception as e:
+            logger.error(f"Error sending bulk email notification: {e}")
+            return [False] * len(users)
+    
     async def _send_sms_notification(
         self,
         user: User,
@@ -0,0 +1,452 @@
+"""Hourly and daily rollups of climate data for analytics."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.climate import ClimateData, ClimateRollup, RiskAssessment
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+RECORDS_METRIC = "records"
+ASSESSMENTS_METRIC = "risk_assessments"
+READING_METRICS = (
+    "temperature", "humidity", "pressure", "wind_speed", "precipitation",
+    "pm25", "pm10", "co", "no2", "so2", "o3"
+)
+RISK_METRICS = ("overall_risk",)
+
+
+def floor_hour(value: datetime) -> datetime:
+    """Start of the hour containing ``value``."""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    """Start of the first hour at or after ``value``."""
+    floored = floor_hour(value)
+    return floored if floored == value else floored + HOUR
+
+
+def floor_day(value: datetime) -> datetime:
+    """Start of the day containing ``value``."""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(value: datetime) -> datetime:
+    """Start of the first day at or after ``value``."""
+    floored = floor_day(value)
+    return floored if floored == value else floored + DAY
+
+
+def _merge(target: Dict[str, Any], count: int, total, minimum, maximum):
+    """Fold one aggregate into another."""
+    if not count:
+        return
+    target["count"] += count
+    target["total"] = (target["total"] or 0.0) + (total or 0.0)
+    if minimum is not None:
+        target["minimum"] = minimum if target["minimum"] is None else min(target["minimum"], minimum)
+    if maximum is not None:
+        target["maximum"] = maximum if target["maximum"] is None else max(target["maximum"], maximum)
+
+
+def _align(value: datetime, like: datetime) -> datetime:
+    """Express ``value`` with the same timezone awareness as ``like``."""
+    if value.tzinfo is None and like.tzinfo is not None:
+        return value.replace(tzinfo=timezone.utc)
+    if value.tzinfo is not None and like.tzinfo is None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _aggregate_columns(model, metrics: Sequence[str]) -> list:
+    """Row count followed by count, sum, min and max of each metric column."""
+    columns = [func.count(model.id)]
+    for metric in metrics:
+        column = getattr(model, metric)
+        columns += [func.count(column), func.sum(column), func.min(column), func.max(column)]
+    return columns
+
+
+def _empty_aggregate() -> Dict[str, Any]:
+    """Aggregate with no values."""
+    return {"count": 0, "total": None, "minimum": None, "maximum": None}
+
+
+class ClimateRollupService:
+    """Maintain and query hourly and daily climate rollups.
+
+    ``compact`` is an incremental job: it finds the hours touched by
+    readings and risk assessments created since the previous run (minus a
+    safety lag for transactions still in flight), recomputes the hourly
+    rollups of those hours from raw rows and the daily rollups of their
+    days from the hourly ones. Recomputing is idempotent, so overlapping
+    runs are harmless.
+
+    ``summarize`` answers a time range from daily rollups for whole days,
+    hourly rollups for the whole hours around them, and raw rows only for
+    the partial hours at either edge and readings timestamped after the
+    last compaction.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = settings.ROLLUP_INTERVAL_SECONDS,
+        watermark_lag_seconds: float = settings.ROLLUP_WATERMARK_LAG_SECONDS,
+        max_span_hours: int = 168
+    ):
+        """Initialize climate rollup service."""
+        self.interval_seconds = interval_seconds
+        self.watermark_lag = timedelta(seconds=watermark_lag_seconds)
+        self.max_span = timedelta(hours=max_span_hours)
+        self._task: Optional[asyncio.Task] = None
+
+    # Compaction
+
+    def _hour_bucket(self, db: Session, column):
+        """SQL expression truncating a timestamp column to the hour."""
+        if db.get_bind().dialect.name == "sqlite":
+            return func.strftime("%Y-%m-%d %H:00:00", column)
+        return func.date_trunc("hour", column)
+
+    @staticmethod
+    def _as_datetime(bucket: Any) -> datetime:
+        """Normalize an hour bucket returned by the database."""
+        if isinstance(bucket, str):
+            return datetime.strptime(bucket, "%Y-%m-%d %H:%M:%S")
+        if bucket.tzinfo is not None:
+            return bucket.astimezone(timezone.utc)
+        return bucket
+
+    def _dirty_hours(self, db: Session, since: Optional[datetime]) -> Set[datetime]:
+        """Hours with readings or risk assessments created after ``since``."""
+        reading_hour = self._hour_bucket(db, ClimateData.timestamp)
+
+        readings = select(reading_hour).distinct()
+        assessments = select(reading_hour).distinct().join(
+            RiskAssessment, RiskAssessment.climate_data_id == ClimateData.id
+        )
+        if since is not None:
+            readings = readings.filter(ClimateData.created_at > since)
+            assessments = assessments.filter(RiskAssessment.created_at > since)
+
+        return {
+            self._as_datetime(bucket)
+            for query in (readings, assessments)
+            for bucket in db.execute(query).scalars()
+            if bucket is not None
+        }
+
+    def _spans(self, hours: Iterable[datetime]) -> List[List[datetime]]:
+        """Group sorted bucket starts into spans of at most ``max_span``."""
+        spans: List[List[datetime]] = []
+        for hour in sorted(hours):
+            if spans and hour - spans[-1][0] < self.max_span:
+                spans[-1].append(hour)
+            else:
+                spans.append([hour])
+        return spans
+
+    def _hourly_rows(
+        self,
+        db: Session,
+        hours: Sequence[datetime],
+        computed_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """Recompute hourly rollup rows for a span of hours from raw data."""
+        wanted = set(hours)
+        window = and_(
+            ClimateData.timestamp >= hours[0],
+            ClimateData.timestamp < hours[-1] + HOUR
+        )
+        hour = self._hour_bucket(db, ClimateData.timestamp).label("hour")
+
+        readings = db.execute(
+            select(ClimateData.station_id, hour, *_aggregate_columns(ClimateData, READING_METRICS))
+            .filter(window)
+            .group_by(ClimateData.station_id, hour)
+        ).all()
+        assessments = db.execute(
+            select(ClimateData.station_id, hour, *_aggregate_columns(RiskAssessment, RISK_METRICS))
+            .join(RiskAssessment, RiskAssessment.climate_data_id == ClimateData.id)
+            .filter(window)
+            .group_by(ClimateData.station_id, hour)
+        ).all()
+
+        rows = []
+        for results, count_metric, metrics in (
+            (readings, RECORDS_METRIC, READING_METRICS),
+            (assessments, ASSESSMENTS_METRIC, RISK_METRICS)
+        ):
+            for station_id, bucket, count, *aggregates in results:
+                bucket = self._as_datetime(bucket)
+                if bucket not in wanted:
+                    continue
+
+                base = {
+                    "station_id": station_id,
+                    "granularity": "hour",
+                    "bucket_start": bucket,
+                    "computed_at": computed_at
+                }
+                rows.append({
+                    **base, "metric": count_metric, "count": count,
+                    "total": None, "minimum": None, "maximum": None
+                })
+                for index, metric in enumerate(metrics):
+                    metric_count, total, minimum, maximum = aggregates[4 * index:4 * index + 4]
+                    if metric_count:
+                        rows.append({
+                            **base, "metric": metric, "count": metric_count,
+                            "total": total, "minimum": minimum, "maximum": maximum
+                        })
+        return rows
+
+    def _daily_rows(
+        self,
+        db: Session,
+        days: Sequence[datetime],
+        computed_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """Recompute daily rollup rows for a span of days from hourly rollups."""
+        wanted = set(days)
+        hourly = db.execute(
+            select(
+                ClimateRollup.station_id, ClimateRollup.bucket_start, ClimateRollup.metric,
+                ClimateRollup.count, ClimateRollup.total,
+                ClimateRollup.minimum, ClimateRollup.maximum
+            ).filter(
+                ClimateRollup.granularity == "hour",
+                ClimateRollup.bucket_start >= days[0],
+                ClimateRollup.bucket_start < days[-1] + DAY
+            )
+        ).all()
+
+        daily: Dict[Tuple[int, datetime, str], Dict[str, Any]] = {}
+        for station_id, bucket, metric, count, total, minimum, maximum in hourly:
+            day = floor_day(self._as_datetime(bucket))
+            if day not in wanted:
+                continue
+            aggregate = daily.setdefault((station_id, day, metric), _empty_aggregate())
+            _merge(aggregate, count, total, minimum, maximum)
+
+        return [
+            {
+                "station_id": station_id,
+                "granularity": "day",
+                "bucket_start": day,
+                "metric": metric,
+                "computed_at": computed_at,
+                **aggregate
+            }
+            for (station_id, day, metric), aggregate in daily.items()
+        ]
+
+    def _replace(
+        self,
+        db: Session,
+        granularity: str,
+        buckets: Sequence[datetime],
+        rows: List[Dict[str, Any]]
+    ):
+        """Replace the rollups of a set of buckets with freshly computed rows."""
+        db.execute(
+            delete(ClimateRollup).where(
+                ClimateRollup.granularity == granularity,
+                ClimateRollup.bucket_start.in_(buckets)
+            )
+        )
+        if rows:
+            db.execute(insert(ClimateRollup), rows)
+
+    def last_compacted_at(self, db: Session) -> Optional[datetime]:
+        """Database time at which the latest compaction started."""
+        return db.scalar(select(func.max(ClimateRollup.computed_at)))
+
+    def compact(self, db: Session, full: bool = False) -> Dict[str, int]:
+        """Bring rollups up to date with data created since the last run."""
+        computed_at = db.scalar(select(func.now()))
+        last_run = None if full else self.last_compacted_at(db)
+        since = last_run - self.watermark_lag if last_run is not None else None
+
+        hours = self._dirty_hours(db, since)
+        days = {floor_day(hour) for hour in hours}
+
+        hourly_rows = daily_rows = 0
+        try:
+            for span in self._spans(hours):
+                rows = self._hourly_rows(db, span, computed_at)
+                self._replace(db, "hour", span, rows)
+                hourly_rows += len(rows)
+
+            # Daily rollups read the hourly rows written above
+            db.flush()
+            for span in self._spans(days):
+                rows = self._daily_rows(db, span, computed_at)
+                self._replace(db, "day", span, rows)
+                daily_rows += len(rows)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(
+            f"Compacted climate rollups for {len(hours)} hours and {len(days)} days "
+            f"({hourly_rows} hourly, {daily_rows} daily rows)"
+        )
+        return {
+            "hours": len(hours),
+            "days": len(days),
+            "hourly_rows": hourly_rows,
+            "daily_rows": daily_rows
+        }
+
+    # Queries
+
+    def _plan(
+        self,
+        start: datetime,
+        end: datetime,
+        fresh_from: Optional[datetime]
+    ) -> Tuple[List[Tuple[datetime, datetime]], List[Tuple[datetime, datetime]], List[tuple]]:
+        """Split ``[start, end]`` into daily, hourly and raw ranges.
+
+        Rollups are only trusted for hours before ``fresh_from``; later
+        data, and the partial hours at either edge, are read raw.
+        """
+        if fresh_from is None:
+            return [], [], [(start, end, True)]
+
+        hours_start = ceil_hour(start)
+        hours_end = min(floor_hour(end), floor_hour(_align(fresh_from, end)))
+        if hours_start >= hours_end:
+            return [], [], [(start, end, True)]
+
+        raw = [(hours_end, end, True)]
+        if start < hours_start:
+            raw.append((start, hours_start, False))
+
+        days_start, days_end = ceil_day(hours_start), floor_day(hours_end)
+        if days_start >= days_end:
+            return [], [(hours_start, hours_end)], raw
+
+        hourly = [(hours_start, days_start), (days_end, hours_end)]
+        return [(days_start, days_end)], [(a, b) for a, b in hourly if a < b], raw
+
+    @staticmethod
+    def _raw_window(ranges: List[tuple]):
+        """Filter matching raw readings in any of ``ranges``."""
+        return or_(*(
+            and_(
+                ClimateData.timestamp >= range_start,
+                ClimateData.timestamp <= range_end if inclusive else ClimateData.timestamp < range_end
+            )
+            for range_start, range_end, inclusive in ranges
+        ))
+
+    def summarize(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        reading_metrics: Sequence[str] = ("temperature",),
+        risk_metrics: Sequence[str] = RISK_METRICS
+    ) -> Dict[str, Dict[str, Any]]:
+        """Count, total, minimum and maximum per metric over ``[start, end]``.
+
+        The result always includes the ``records`` and ``risk_assessments``
+        counts alongside the requested metrics.
+        """
+        metrics = [RECORDS_METRIC, ASSESSMENTS_METRIC, *reading_metrics, *risk_metrics]
+        summary = {metric: _empty_aggregate() for metric in metrics}
+
+        daily, hourly, raw = self._plan(start, end, self.last_compacted_at(db))
+
+        bucket_filters = [
+            and_(
+                ClimateRollup.granularity == granularity,
+                ClimateRollup.bucket_start >= range_start,
+                ClimateRollup.bucket_start < range_end
+            )
+            for granularity, ranges in (("day", daily), ("hour", hourly))
+            for range_start, range_end in ranges
+        ]
+        if bucket_filters:
+            rolled_up = db.execute(
+                select(
+                    ClimateRollup.metric,
+                    func.sum(ClimateRollup.count),
+                    func.sum(ClimateRollup.total),
+                    func.min(ClimateRollup.minimum),
+                    func.max(ClimateRollup.maximum)
+                ).filter(
+                    ClimateRollup.metric.in_(metrics),
+                    or_(*bucket_filters)
+                ).group_by(ClimateRollup.metric)
+            ).all()
+            for metric, count, total, minimum, maximum in rolled_up:
+                _merge(summary[metric], count, total, minimum, maximum)
+
+        window = self._raw_window(raw)
+        reading_stats = db.execute(
+            select(*_aggregate_columns(ClimateData, reading_metrics)).filter(window)
+        ).first()
+        risk_stats = db.execute(
+            select(*_aggregate_columns(RiskAssessment, risk_metrics))
+            .select_from(RiskAssessment)
+            .join(ClimateData, RiskAssessment.climate_data_id == ClimateData.id)
+            .filter(window)
+        ).first()
+
+        for stats, count_metric, metric_names in (
+            (reading_stats, RECORDS_METRIC, reading_metrics),
+            (risk_stats, ASSESSMENTS_METRIC, risk_metrics)
+        ):
+            count, *aggregates = stats
+            _merge(summary[count_metric], count, None, None, None)
+            for index, metric in enumerate(metric_names):
+                _merge(summary[metric], *aggregates[4 * index:4 * index + 4])
+
+        return summary
+
+    # Background job
+
+    async def _run(self):
+        """Compact rollups every ``interval_seconds``."""
+        # Import here to avoid circular imports
+        from app.db.database import AsyncSessionLocal
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.run_sync(self.compact)
+            except Exception as e:
+                logger.error(f"Error compacting climate rollups: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start the periodic compaction job on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic compaction job."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+climate_rollup_service = ClimateRollupService()
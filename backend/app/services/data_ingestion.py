@@ -3,17 +3,29 @@
 import logging
 import asyncio
 import aiohttp
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 from app.models.climate import ClimateData, WeatherStation
 from app.core.config import settings
 from app.services.blockchain_service import BlockchainService
+from app.services.station_registry import station_registry
+from app.utils.rate_limiter import TokenBucket
+from app.utils.weather_apis import WeatherAPIClient
 
 logger = logging.getLogger(__name__)
 
+CLIMATE_DATA_COLUMNS = frozenset(
+    column.name for column in ClimateData.__table__.columns
+    if column.name not in ("id", "created_at")
+)
+
 
 class DataIngestionService:
     """Service for ingesting data from external sources."""
@@ -23,55 +35,79 @@ class DataIngestionService:
         self.openweather_api_key = settings.OPENWEATHERMAP_API_KEY
         self.noaa_api_key = settings.NOAA_API_KEY
         self.blockchain_service = BlockchainService()
+        self.openweather_concurrency = max(1, settings.OPENWEATHER_CONCURRENCY)
+        self.openweather_limiter = TokenBucket(
+            settings.OPENWEATHER_RATE_PER_SECOND, settings.OPENWEATHER_RATE_BURST
+        )
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self.weather_client = WeatherAPIClient(
+            limiter=self.openweather_limiter,
+            concurrency=self.openweather_concurrency
+        )
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive HTTP session, created on first use."""
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.openweather_concurrency,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http_session
+    
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
     
     async def ingest_openweather_data(
         self,
         station_ids: Optional[List[str]] = None,
-        db: Session = None
+        db: AsyncSession = None
     ) -> Dict[str, Any]:
         """Ingest data from OpenWeatherMap API."""
         try:
             if not self.openweather_api_key:
                 raise ValueError("OpenWeatherMap API key not configured")
             
-            records_processed = 0
             errors = []
             
             # Get stations to process
             if station_ids:
-                stations = db.query(WeatherStation).filter(
+                query = select(WeatherStation).filter(
                     WeatherStation.station_id.in_(station_ids)
-                ).all()
+                )
             else:
-                stations = db.query(WeatherStation).filter(
+                query = select(WeatherStation).filter(
                     WeatherStation.is_active == True
-                ).limit(50).all()  # Limit to avoid API rate limits
-            
-            async with aiohttp.ClientSession() as session:
-                for station in stations:
-                    try:
-                        # Get current weather data
-                        weather_data = await self._fetch_openweather_current(
-                            session, station.latitude, station.longitude
-                        )
-                        
-                        if weather_data:
-                            # Create climate data record
-                            climate_data = await self._create_climate_data_from_openweather(
-                                weather_data, station, db
-                            )
-                            
-                            if climate_data:
-                                records_processed += 1
-                                logger.info(f"Processed OpenWeather data for station {station.station_id}")
-                        
-                        # Rate limiting
-                        await asyncio.sleep(0.1)
-                        
-                    except Exception as e:
-                        error_msg = f"Error processing station {station.station_id}: {e}"
-                        logger.error(error_msg)
-                        errors.append(error_msg)
+                )
+            stations = (await db.execute(query)).scalars().all()
+            
+            session = self._get_http_session()
+            readings = []
+            for station, weather_data in await self._fetch_openweather_stations(session, stations):
+                # The weather client logs failed fetches and returns None for them
+                if not weather_data:
+                    error_msg = f"No data returned for station {station.station_id}"
+                    logger.warning(error_msg)
+                    errors.append(error_msg)
+                    continue
+                try:
+                    readings.append(self._normalize_openweather(weather_data, station))
+                except Exception as e:
+                    error_msg = f"Error processing station {station.station_id}: {e}"
+                    logger.error(error_msg)
+                    errors.append(error_msg)
+            
+            # Store all readings in one batch
+            batch_result = await self.ingest_climate_batch_async(readings, db)
+            records_processed = batch_result["records_processed"]
+            errors.extend(batch_result["errors"])
             
             return {
                 "records_processed": records_processed,
@@ -87,110 +123,167 @@ class DataIngestionService:
                 "source": "OpenWeatherMap"
             }
     
-    async def _fetch_openweather_current(
+    async def _fetch_openweather_stations(
         self,
         session: aiohttp.ClientSession,
-        latitude: float,
-        longitude: float
-    ) -> Optional[Dict[str, Any]]:
-        """Fetch current weather data from OpenWeatherMap."""
-        try:
-            url = "https://api.openweathermap.org/data/2.5/weather"
-            params = {
-                "lat": latitude,
-                "lon": longitude,
-                "appid": self.openweather_api_key,
-                "units": "metric"
-            }
-            
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(f"OpenWeather API error: {response.status}")
-                    return None
-                    
-        except Exception as e:
-            logger.error(f"Error fetching OpenWeather data: {e}")
-            return None
+        stations: List[WeatherStation]
+    ) -> List[Tuple[WeatherStation, Any]]:
+        """Fetch current weather for stations concurrently within the API quota.
+        
+        Requests go through the shared weather client, which packs stations
+        with a known OpenWeatherMap city into group requests and keeps every
+        request within the shared rate limiter.
+        """
+        self.weather_client.session = session
+        results = await self.weather_client.get_current_weather_openweather_many(
+            [(station.latitude, station.longitude) for station in stations],
+            parse=False
+        )
+        return list(zip(stations, results))
     
-    async def _create_climate_data_from_openweather(
+    def _normalize_openweather(
         self,
         weather_data: Dict[str, Any],
-        station: WeatherStation,
+        station: WeatherStation
+    ) -> Dict[str, Any]:
+        """Normalize an OpenWeatherMap response into a climate data reading."""
+        # Extract weather parameters
+        main = weather_data.get("main", {})
+        wind = weather_data.get("wind", {})
+        clouds = weather_data.get("clouds", {})
+        visibility = weather_data.get("visibility", 10000) / 1000  # Convert to km
+        
+        return {
+            "station_id": station.id,
+            "timestamp": datetime.utcfromtimestamp(weather_data.get("dt", 0)),
+            "temperature": main.get("temp"),
+            "humidity": main.get("humidity"),
+            "pressure": main.get("pressure"),
+            "wind_speed": wind.get("speed"),
+            "wind_direction": wind.get("deg"),
+            "precipitation": weather_data.get("rain", {}).get("1h", 0) + 
+                             weather_data.get("snow", {}).get("1h", 0),
+            "visibility": visibility,
+            "cloud_cover": clouds.get("all"),
+            "data_source": "OpenWeatherMap",
+            "quality_score": 0.9
+        }
+    
+    def _dedup_key(self, station_id: int, timestamp: datetime, data_source: Optional[str]) -> Tuple:
+        """Deduplication key for a reading, with timestamps compared as naive UTC."""
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return station_id, timestamp, data_source
+    
+    def ingest_climate_batch(
+        self,
+        readings: List[Dict[str, Any]],
         db: Session
-    ) -> Optional[ClimateData]:
-        """Create ClimateData record from OpenWeatherMap response."""
+    ) -> Dict[str, Any]:
+        """Insert a batch of normalized readings in one statement and one commit.
+        
+        Each reading is a dict of ``ClimateData`` column values and must carry
+        ``station_id``, ``timestamp`` and ``data_source``. Readings that
+        duplicate an existing row, or each other, on that key are skipped.
+        Blockchain hashes are computed before insert.
+        """
+        if not readings:
+            return {"records_processed": 0, "duplicates": 0, "errors": []}
+        
         try:
-            # Extract weather parameters
-            main = weather_data.get("main", {})
-            wind = weather_data.get("wind", {})
-            clouds = weather_data.get("clouds", {})
-            visibility = weather_data.get("visibility", 10000) / 1000  # Convert to km
-            
-            # Create climate data record
-            climate_data = ClimateData(
-                station_id=station.id,
-                timestamp=datetime.utcfromtimestamp(weather_data.get("dt", 0)),
-                temperature=main.get("temp"),
-                humidity=main.get("humidity"),
-                pressure=main.get("pressure"),
-                wind_speed=wind.get("speed"),
-                wind_direction=wind.get("deg"),
-                precipitation=weather_data.get("rain", {}).get("1h", 0) + 
-                            weather_data.get("snow", {}).get("1h", 0),
-                visibility=visibility,
-                cloud_cover=clouds.get("all"),
-                data_source="OpenWeatherMap",
-                quality_score=0.9
-            )
-            
-            # Check for duplicate records
-            existing = db.query(ClimateData).filter(
-                and_(
-                    ClimateData.station_id == station.id,
-                    ClimateData.timestamp == climate_data.timestamp,
-                    ClimateData.data_source == "OpenWeatherMap"
+            # Drop duplicates within the batch
+            unique_readings = {}
+            for reading in readings:
+                key = self._dedup_key(
+                    reading["station_id"], reading["timestamp"], reading.get("data_source")
                 )
-            ).first()
+                unique_readings.setdefault(key, reading)
             
-            if existing:
-                logger.debug(f"Duplicate record found for station {station.station_id}")
-                return None
+            rows = []
+            for reading in unique_readings.values():
+                row = {column: reading.get(column) for column in CLIMATE_DATA_COLUMNS}
+                if not row["blockchain_hash"]:
+                    row["blockchain_hash"] = self._generate_reading_hash(row)
+                rows.append(row)
             
-            # Save to database
-            db.add(climate_data)
+            inserted = self._insert_readings_if_absent(rows, db)
             db.commit()
-            db.refresh(climate_data)
-            
-            # Submit to blockchain for verification
-            try:
-                data_hash = self.blockchain_service.generate_data_hash({
-                    "station_id": station.id,
-                    "timestamp": climate_data.timestamp.isoformat(),
-                    "temperature": climate_data.temperature,
-                    "humidity": climate_data.humidity,
-                    "pressure": climate_data.pressure
-                })
-                
-                # Store hash for later blockchain submission
-                climate_data.blockchain_hash = data_hash
-                db.commit()
-                
-            except Exception as e:
-                logger.warning(f"Could not generate blockchain hash: {e}")
             
-            return climate_data
+            duplicates = len(readings) - inserted
+            logger.info(f"Ingested {inserted} climate readings ({duplicates} duplicates skipped)")
+            return {"records_processed": inserted, "duplicates": duplicates, "errors": []}
             
         except Exception as e:
-            logger.error(f"Error creating climate data from OpenWeather: {e}")
+            logger.error(f"Error ingesting climate data batch: {e}")
             db.rollback()
+            return {"records_processed": 0, "duplicates": 0, "errors": [str(e)]}
+    
+    def _insert_readings_if_absent(self, rows: List[Dict[str, Any]], db: Session) -> int:
+        """Insert reading rows, skipping any whose dedup key already exists; returns rows inserted.
+        
+        The unique index on the dedup key makes this safe against concurrent
+        batches carrying the same readings.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            result = db.execute(
+                dialect_insert(ClimateData).on_conflict_do_nothing(
+                    index_elements=["station_id", "timestamp", "data_source"]
+                ).returning(ClimateData.id),
+                rows
+            )
+            return len(result.all())
+        
+        # Portable fallback: skip readings already stored, then insert the rest
+        timestamps = [row["timestamp"] for row in rows]
+        existing = db.query(
+            ClimateData.station_id, ClimateData.timestamp, ClimateData.data_source
+        ).filter(
+            and_(
+                ClimateData.station_id.in_({row["station_id"] for row in rows}),
+                ClimateData.timestamp >= min(timestamps),
+                ClimateData.timestamp <= max(timestamps),
+                ClimateData.data_source.in_({row["data_source"] for row in rows})
+            )
+        ).all()
+        existing_keys = {self._dedup_key(*row) for row in existing}
+        
+        rows = [
+            row for row in rows
+            if self._dedup_key(row["station_id"], row["timestamp"], row["data_source"]) not in existing_keys
+        ]
+        if rows:
+            db.execute(insert(ClimateData), rows)
+        return len(rows)
+    
+    async def ingest_climate_batch_async(
+        self,
+        readings: List[Dict[str, Any]],
+        db: AsyncSession
+    ) -> Dict[str, Any]:
+        """Run ``ingest_climate_batch`` on an async session without blocking the event loop."""
+        return await db.run_sync(lambda session: self.ingest_climate_batch(readings, session))
+    
+    def _generate_reading_hash(self, reading: Dict[str, Any]) -> Optional[str]:
+        """Generate the blockchain verification hash for a reading."""
+        try:
+            return self.blockchain_service.generate_data_hash({
+                "station_id": reading["station_id"],
+                "timestamp": reading["timestamp"].isoformat(),
+                "temperature": reading.get("temperature"),
+                "humidity": reading.get("humidity"),
+                "pressure": reading.get("pressure")
+            }) or None
+            
+        except Exception as e:
+            logger.warning(f"Could not generate blockchain hash: {e}")
             return None
     
     async def ingest_noaa_data(
         self,
         station_ids: Optional[List[str]] = None,
-        db: Session = None
+        db: AsyncSession = None
     ) -> Dict[str, Any]:
         """Ingest data from NOAA API."""
         try:
@@ -202,22 +295,23 @@ class DataIngestionService:
                     "source": "NOAA"
                 }
             
-            records_processed = 0
             errors = []
             
             # Get stations to process
             if station_ids:
-                stations = db.query(WeatherStation).filter(
+                query = select(WeatherStation).filter(
                     WeatherStation.station_id.in_(station_ids)
-                ).all()
+                )
             else:
-                stations = db.query(WeatherStation).filter(
+                query = select(WeatherStation).filter(
                     and_(
                         WeatherStation.is_active == True,
                         WeatherStation.country == "US"  # NOAA primarily covers US
                     )
-                ).limit(20).all()
+                ).limit(20)
+            stations = (await db.execute(query)).scalars().all()
             
+            readings = []
             async with aiohttp.ClientSession() as session:
                 for station in stations:
                     try:
@@ -227,14 +321,7 @@ class DataIngestionService:
                         )
                         
                         if noaa_data:
-                            # Process NOAA data
-                            climate_data = await self._create_climate_data_from_noaa(
-                                noaa_data, station, db
-                            )
-                            
-                            if climate_data:
-                                records_processed += 1
-                                logger.info(f"Processed NOAA data for station {station.station_id}")
+                            readings.append(self._normalize_noaa(noaa_data, station))
                         
                         # Rate limiting for NOAA API
                         await asyncio.sleep(0.2)
@@ -244,6 +331,11 @@ class DataIngestionService:
                         logger.error(error_msg)
                         errors.append(error_msg)
             
+            # Store all readings in one batch
+            batch_result = await self.ingest_climate_batch_async(readings, db)
+            records_processed = batch_result["records_processed"]
+            errors.extend(batch_result["errors"])
+            
             return {
                 "records_processed": records_processed,
                 "errors": errors,
@@ -287,73 +379,45 @@ class DataIngestionService:
             logger.error(f"Error fetching NOAA data: {e}")
             return None
     
-    async def _create_climate_data_from_noaa(
+    def _normalize_noaa(
         self,
         noaa_data: Dict[str, Any],
-        station: WeatherStation,
-        db: Session
-    ) -> Optional[ClimateData]:
-        """Create ClimateData record from NOAA response."""
-        try:
-            # Parse NOAA timestamp
-            timestamp_str = noaa_data.get("timestamp")
-            if timestamp_str:
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            else:
-                timestamp = datetime.utcnow()
-            
-            # Extract weather parameters from NOAA format
-            temperature = self._extract_noaa_value(noaa_data.get("temperature"))
-            humidity = self._extract_noaa_value(noaa_data.get("relativeHumidity"))
-            pressure = self._extract_noaa_value(noaa_data.get("barometricPressure"))
-            wind_speed = self._extract_noaa_value(noaa_data.get("windSpeed"))
-            wind_direction = self._extract_noaa_value(noaa_data.get("windDirection"))
-            visibility = self._extract_noaa_value(noaa_data.get("visibility"))
-            
-            # Convert units if necessary
-            if pressure:
-                pressure = pressure / 100  # Convert Pa to hPa
-            if visibility:
-                visibility = visibility / 1000  # Convert m to km
-            
-            # Create climate data record
-            climate_data = ClimateData(
-                station_id=station.id,
-                timestamp=timestamp,
-                temperature=temperature,
-                humidity=humidity,
-                pressure=pressure,
-                wind_speed=wind_speed,
-                wind_direction=wind_direction,
-                visibility=visibility,
-                data_source="NOAA",
-                quality_score=0.95  # NOAA typically has high quality data
-            )
-            
-            # Check for duplicates
-            existing = db.query(ClimateData).filter(
-                and_(
-                    ClimateData.station_id == station.id,
-                    ClimateData.timestamp == climate_data.timestamp,
-                    ClimateData.data_source == "NOAA"
-                )
-            ).first()
-            
-            if existing:
-                logger.debug(f"Duplicate NOAA record found for station {station.station_id}")
-                return None
-            
-            # Save to database
-            db.add(climate_data)
-            db.commit()
-            db.refresh(climate_data)
-            
-            return climate_data
-            
-        except Exception as e:
-            logger.error(f"Error creating climate data from NOAA: {e}")
-            db.rollback()
-            return None
+        station: WeatherStation
+    ) -> Dict[str, Any]:
+        """Normalize a NOAA observation into a climate data reading."""
+        # Parse NOAA timestamp
+        timestamp_str = noaa_data.get("timestamp")
+        if timestamp_str:
+            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        else:
+            timestamp = datetime.utcnow()
+        
+        # Extract weather parameters from NOAA format
+        temperature = self._extract_noaa_value(noaa_data.get("temperature"))
+        humidity = self._extract_noaa_value(noaa_data.get("relativeHumidity"))
+        pressure = self._extract_noaa_value(noaa_data.get("barometricPressure"))
+        wind_speed = self._extract_noaa_value(noaa_data.get("windSpeed"))
+        wind_direction = self._extract_noaa_value(noaa_data.get("windDirection"))
+        visibility = self._extract_noaa_value(noaa_data.get("visibility"))
+        
+        # Convert units if necessary
+        if pressure:
+            pressure = pressure / 100  # Convert Pa to hPa
+        if visibility:
+            visibility = visibility / 1000  # Convert m to km
+        
+        return {
+            "station_id": station.id,
+            "timestamp": timestamp,
+            "temperature": temperature,
+            "humidity": humidity,
+            "pressure": pressure,
+            "wind_speed": wind_speed,
+            "wind_direction": wind_direction,
+            "visibility": visibility,
+            "data_source": "NOAA",
+            "quality_score": 0.95  # NOAA typically has high quality data
+        }
     
     def _extract_noaa_value(self, noaa_field: Optional[Dict[str, Any]]) -> Optional[float]:
         """Extract numeric value from NOAA field format."""
@@ -367,67 +431,164 @@ class DataIngestionService:
         except (ValueError, TypeError):
             return None
     
-    async def ingest_iot_sensor_data(
+    def _normalize_iot(
         self,
         sensor_data: Dict[str, Any],
-        db: Session
-    ) -> Optional[ClimateData]:
-        """Ingest data from IoT sensors."""
+        station_pk: int
+    ) -> Dict[str, Any]:
+        """Normalize an IoT sensor payload into a climate data reading."""
+        return {
+            "station_id": station_pk,
+            "timestamp": self._iot_timestamp(sensor_data),
+            "temperature": sensor_data.get("temperature"),
+            "humidity": sensor_data.get("humidity"),
+            "pressure": sensor_data.get("pressure"),
+            "wind_speed": sensor_data.get("wind_speed"),
+            "wind_direction": sensor_data.get("wind_direction"),
+            "precipitation": sensor_data.get("precipitation"),
+            "pm25": sensor_data.get("pm25"),
+            "pm10": sensor_data.get("pm10"),
+            "co": sensor_data.get("co"),
+            "no2": sensor_data.get("no2"),
+            "so2": sensor_data.get("so2"),
+            "o3": sensor_data.get("o3"),
+            "data_source": "IoT_Sensor",
+            "quality_score": sensor_data.get("quality_score", 0.8)
+        }
+    
+    def _iot_timestamp(self, sensor_data: Dict[str, Any]) -> datetime:
+        """Naive UTC measurement time of a payload, falling back to when it was received.
+        
+        Readings in one batch share a station and data source, so stamping
+        them with the ingestion time would collide on the dedup key.
+        """
+        for field in ("timestamp", "received_at"):
+            timestamp = sensor_data.get(field)
+            if isinstance(timestamp, str):
+                try:
+                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                except ValueError:
+                    logger.warning(f"Invalid IoT {field} {timestamp!r}")
+                    continue
+            if isinstance(timestamp, datetime):
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+                return timestamp
+        return datetime.utcnow()
+    
+    async def ingest_iot_sensor_batch(
+        self,
+        sensor_data_batch: List[Dict[str, Any]],
+        db: AsyncSession
+    ) -> Dict[str, Any]:
+        """Ingest a batch of IoT sensor payloads with one station lookup and one commit."""
         try:
-            # Find or create station for IoT sensor
-            sensor_id = sensor_data.get("sensor_id")
-            latitude = sensor_data.get("latitude")
-            longitude = sensor_data.get("longitude")
-            
-            if not all([sensor_id, latitude, longitude]):
-                raise ValueError("Missing required IoT sensor fields")
-            
-            # Find existing station or create new one
-            station = db.query(WeatherStation).filter(
-                WeatherStation.station_id == sensor_id
-            ).first()
-            
-            if not station:
-                station = WeatherStation(
-                    station_id=sensor_id,
-                    name=f"IoT Sensor {sensor_id}",
-                    latitude=latitude,
-                    longitude=longitude,
-                    country="Unknown",
-                    is_active=True
+            valid_batch = [
+                sensor_data for sensor_data in sensor_data_batch
+                if all([
+                    sensor_data.get("sensor_id"),
+                    sensor_data.get("latitude"),
+                    sensor_data.get("longitude")
+                ])
+            ]
+            errors = []
+            if len(valid_batch) < len(sensor_data_batch):
+                errors.append(
+                    f"{len(sensor_data_batch) - len(valid_batch)} payloads missing required IoT sensor fields"
                 )
-                db.add(station)
-                db.commit()
-                db.refresh(station)
             
-            # Create climate data record
-            climate_data = ClimateData(
-                station_id=station.id,
-                timestamp=datetime.utcnow(),
-                temperature=sensor_data.get("temperature"),
-                humidity=sensor_data.get("humidity"),
-                pressure=sensor_data.get("pressure"),
-                wind_speed=sensor_data.get("wind_speed"),
-                wind_direction=sensor_data.get("wind_direction"),
-                precipitation=sensor_data.get("precipitation"),
-                pm25=sensor_data.get("pm25"),
-                pm10=sensor_data.get("pm10"),
-                co=sensor_data.get("co"),
-                no2=sensor_data.get("no2"),
-                so2=sensor_data.get("so2"),
-                o3=sensor_data.get("o3"),
-                data_source="IoT_Sensor",
-                quality_score=sensor_data.get("quality_score", 0.8)
-            )
-            
-            db.add(climate_data)
-            db.commit()
-            db.refresh(climate_data)
+            if not valid_batch:
+                return {"records_processed": 0, "duplicates": 0, "errors": errors}
             
-            logger.info(f"Ingested IoT sensor data from {sensor_id}")
-            return climate_data
+            result = await db.run_sync(
+                lambda session: self._ingest_iot_readings(valid_batch, session)
+            )
+            result["errors"] = errors + result["errors"]
+            return result
             
         except Exception as e:
-            logger.error(f"Error ingesting IoT sensor data: {e}")
-            db.rollback()
-            return None
+            logger.error(f"Error ingesting IoT sensor batch: {e}")
+            await db.rollback()
+            return {"records_processed": 0, "duplicates": 0, "errors": [str(e)]}
+    
+    def _ingest_iot_readings(
+        self,
+        sensor_data_batch: List[Dict[str, Any]],
+        db: Session
+    ) -> Dict[str, Any]:
+        """Resolve stations and store a validated IoT batch in one transaction."""
+        station_pks = self._resolve_iot_stations(sensor_data_batch, db)
+        readings = [
+            self._normalize_iot(sensor_data, station_pks[sensor_data["sensor_id"]])
+            for sensor_data in sensor_data_batch
+        ]
+        return self.ingest_climate_batch(readings, db)
+    
+    def _resolve_iot_stations(
+        self,
+        sensor_data_batch: List[Dict[str, Any]],
+        db: Session
+    ) -> Dict[str, int]:
+        """Map a batch's sensor IDs to station pks, creating unseen stations.
+        
+        Known sensors are answered from the station registry without a
+        query. Unseen sensors are inserted in one statement that skips rows
+        another worker created concurrently, then read back together.
+        """
+        station_registry.ensure_loaded(db)
+        
+        first_payloads = {}
+        for sensor_data in sensor_data_batch:
+            first_payloads.setdefault(sensor_data["sensor_id"], sensor_data)
+        
+        station_pks = station_registry.lookup(first_payloads)
+        missing = [sensor_id for sensor_id in first_payloads if sensor_id not in station_pks]
+        if not missing:
+            return station_pks
+        
+        rows = [
+            {
+                "station_id": sensor_id,
+                "name": f"IoT Sensor {sensor_id}",
+                "latitude": first_payloads[sensor_id]["latitude"],
+                "longitude": first_payloads[sensor_id]["longitude"],
+                "country": "Unknown",
+                "is_active": True
+            }
+            for sensor_id in missing
+        ]
+        self._insert_stations_if_absent(rows, db)
+        
+        # Import here to avoid circular imports
+        from app.services.station_index import station_index
+        
+        # Created here or concurrently elsewhere; committed together with the readings
+        stations = db.query(WeatherStation).filter(
+            WeatherStation.station_id.in_(missing)
+        ).all()
+        for station in stations:
+            station_pks[station.station_id] = station.id
+            station_registry.stage(db, station.station_id, station.id)
+            station_index.refresh_station(station, db)
+        
+        return station_pks
+    
+    def _insert_stations_if_absent(self, rows: List[Dict[str, Any]], db: Session):
+        """Insert station rows, skipping any whose station_id already exists."""
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            db.execute(
+                dialect_insert(WeatherStation).values(rows).on_conflict_do_nothing(
+                    index_elements=["station_id"]
+                )
+            )
+            return
+        
+        # Portable fallback: one savepoint per new station
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(WeatherStation), [row])
+            except IntegrityError:
+                logger.debug(f"Station {row['station_id']} was created concurrently")
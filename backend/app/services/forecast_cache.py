@@ -0,0 +1,168 @@
+"""TTL/LRU response cache with single-flight coalescing for forecasts."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastCache:
+    """Cache forecast responses per quantized location cell.
+
+    Keys combine a ``cell_size_deg`` grid cell, the forecast horizon and the
+    model version, so nearby requests share an entry and a model swap never
+    serves stale predictions. Entries expire after ``ttl_seconds`` and the
+    in-memory store is bounded to ``max_entries`` in LRU order. Concurrent
+    misses for the same key await a single computation.
+
+    With ``redis_url`` set, entries are also written to Redis so they are
+    shared across worker processes; Redis errors degrade to memory only.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.FORECAST_CACHE_TTL_SECONDS,
+        max_entries: int = settings.FORECAST_CACHE_MAX_ENTRIES,
+        cell_size_deg: float = settings.FORECAST_CACHE_CELL_DEG,
+        redis_url: Optional[str] = None,
+        serialize: Optional[Callable[[Any], str]] = None,
+        deserialize: Optional[Callable[[str], Any]] = None
+    ):
+        """Initialize forecast cache."""
+        if redis_url and (serialize is None or deserialize is None):
+            raise ValueError("Redis backend requires serialize and deserialize")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.cell_size_deg = cell_size_deg
+        self.redis_url = redis_url
+        self.serialize = serialize
+        self.deserialize = deserialize
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def make_key(
+        self,
+        latitude: float,
+        longitude: float,
+        hours: int,
+        model_version: str
+    ) -> str:
+        """Cache key for the grid cell containing a location."""
+        cell_lat = round(latitude / self.cell_size_deg)
+        cell_lon = round(longitude / self.cell_size_deg)
+        return f"forecast:{model_version}:{hours}:{cell_lat}:{cell_lon}"
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value for ``key``, computing it once on a miss."""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # A cancelled caller must not cancel the computation others await
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Fetch from Redis or compute, then store the value."""
+        value = await self._get_remote(key)
+        if value is None:
+            value = await compute()
+            await self._set_remote(key, value)
+
+        self._set_local(key, value)
+        return value
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        """Read an unexpired entry from memory and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any):
+        """Store an entry in memory, evicting the least recently used."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_redis(self):
+        """Lazily create the Redis client."""
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    async def _get_remote(self, key: str) -> Optional[Any]:
+        """Read an entry from Redis, if configured."""
+        if not self.redis_url:
+            return None
+        try:
+            raw = await self._get_redis().get(key)
+            return self.deserialize(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"Forecast cache Redis read failed: {e}")
+            return None
+
+    async def _set_remote(self, key: str, value: Any):
+        """Write an entry to Redis with the cache TTL, if configured."""
+        if not self.redis_url:
+            return
+        try:
+            await self._get_redis().set(
+                key, self.serialize(value), ex=max(1, int(self.ttl_seconds))
+            )
+        except Exception as e:
+            logger.warning(f"Forecast cache Redis write failed: {e}")
+
+    def clear(self):
+        """Drop all in-memory entries."""
+        self._entries.clear()
+
+    async def close(self):
+        """Close the Redis connection, if open."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit, miss and coalescing counters."""
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
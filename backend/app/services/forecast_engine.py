@@ -0,0 +1,100 @@
+"""Batched autoregressive forecasting engine."""
+
+import logging
+from typing import Any
+import numpy as np
+
+from app.ml.runtime import NumpyModel
+
+logger = logging.getLogger(__name__)
+
+
+class WindowRingBuffer:
+    """Preallocated rolling window over the last N time steps of many series.
+
+    The buffer is stored twice back to back (length ``2 * sequence_length``)
+    so the current window is always a contiguous slice and pushing a new
+    step never shifts or copies the history.
+    """
+
+    def __init__(self, windows: np.ndarray):
+        """Initialize ring buffer from initial windows of shape (batch, steps, features)."""
+        batch_size, sequence_length, n_features = windows.shape
+        self.sequence_length = sequence_length
+        self.head = 0
+        self.buffer = np.empty(
+            (batch_size, 2 * sequence_length, n_features), dtype=np.float32
+        )
+        self.buffer[:, :sequence_length] = windows
+        self.buffer[:, sequence_length:] = windows
+
+    def window(self) -> np.ndarray:
+        """Return the current windows ordered oldest to newest."""
+        return self.buffer[:, self.head:self.head + self.sequence_length]
+
+    def push(self, step: np.ndarray):
+        """Append one time step of shape (batch, features) to every window."""
+        self.buffer[:, self.head] = step
+        self.buffer[:, self.head + self.sequence_length] = step
+        self.head = (self.head + 1) % self.sequence_length
+
+
+class BatchForecastEngine:
+    """Multi-horizon forecasting that steps many location windows as one batch."""
+
+    def __init__(self, model: Any, sequence_length: int = 24, n_features: int = 10):
+        """Initialize forecast engine around a Keras or NumPy runtime sequence model."""
+        self.model = model
+        self.sequence_length = sequence_length
+        self.n_features = n_features
+        if isinstance(model, NumpyModel):
+            self._step = model.predict
+        else:
+            self._step = self._compile_keras_step()
+
+    def _compile_keras_step(self):
+        """Single inference step of a Keras model without Keras predict overhead."""
+        # Import here to keep TensorFlow off the import path for the NumPy runtime
+        import tensorflow as tf
+
+        step = tf.function(
+            lambda windows: self.model(windows, training=False),
+            input_signature=[
+                tf.TensorSpec(shape=(None, self.sequence_length, self.n_features), dtype=tf.float32)
+            ],
+            reduce_retracing=True
+        )
+        return lambda windows: step(tf.constant(windows)).numpy()
+
+    def forecast(self, windows: np.ndarray, hours: int) -> np.ndarray:
+        """Roll the model forward ``hours`` steps for every window in the batch.
+
+        Args:
+            windows: Array of shape (batch, sequence_length, n_features), or a
+                single window of shape (sequence_length, n_features).
+            hours: Number of steps to predict.
+
+        Returns:
+            Array of shape (batch, hours, n_features).
+        """
+        windows = np.asarray(windows, dtype=np.float32)
+        if windows.ndim == 2:
+            windows = windows[np.newaxis]
+
+        if windows.shape[1:] != (self.sequence_length, self.n_features):
+            raise ValueError(
+                f"Expected windows of shape (batch, {self.sequence_length}, "
+                f"{self.n_features}), got {windows.shape}"
+            )
+
+        batch_size = windows.shape[0]
+        predictions = np.empty((batch_size, hours, self.n_features), dtype=np.float32)
+        ring = WindowRingBuffer(windows)
+
+        for i in range(hours):
+            step = self._step(ring.window())
+            predictions[:, i] = step
+            ring.push(step)
+
+        logger.debug(f"Forecast {hours} steps for {batch_size} windows")
+        return predictions
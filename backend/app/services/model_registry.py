@@ -0,0 +1,373 @@
+"""Process-wide registry of the served AI models."""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.artifacts import (
+    COMPONENTS, RISK_MODEL_FILE, RISK_RUNTIME_FILE, RISK_SCALER_FILE,
+    WEATHER_MODEL_FILE, WEATHER_RUNTIME_FILE, WEATHER_SCALER_FILE, ModelArtifactStore
+)
+from app.ml.features import RISK_FEATURES, WEATHER_FEATURES
+from app.ml.runtime import NumpyModel
+from app.services.forecast_engine import BatchForecastEngine
+
+logger = logging.getLogger(__name__)
+
+WEATHER_SEQUENCE_LENGTH = 24
+DEFAULT_MODEL_VERSION = "v1.0"
+
+
+class ModelBundle:
+    """Models served together under one version.
+
+    A bundle is never mutated once published; swapping versions replaces
+    the whole bundle, so a request that took a bundle keeps a consistent
+    set of models even if a swap happens mid-request.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        weather_model: Any,
+        risk_model: Any,
+        weather_scaler: Any = None,
+        risk_scaler: Any = None,
+        source: Optional[str] = None,
+        manifest: Optional[Dict[str, Any]] = None
+    ):
+        """Initialize model bundle."""
+        self.version = version
+        self.weather_model = weather_model
+        self.risk_model = risk_model
+        self.weather_scaler = weather_scaler
+        self.risk_scaler = risk_scaler
+        self.source = source
+        self.manifest = manifest or {}
+        self.forecast_engine = None
+        self.warmed_up = False
+
+        if weather_model is not None:
+            try:
+                self.forecast_engine = BatchForecastEngine(
+                    weather_model, WEATHER_SEQUENCE_LENGTH, len(WEATHER_FEATURES)
+                )
+            except Exception as e:
+                logger.error(f"Failed to build forecast engine: {e}")
+
+    def warm_up(self):
+        """Run one dummy batch through every model to trace and allocate kernels."""
+        if self.forecast_engine is not None:
+            self.forecast_engine.forecast(
+                np.zeros((1, WEATHER_SEQUENCE_LENGTH, len(WEATHER_FEATURES)), dtype=np.float32), 1
+            )
+        if self.risk_model is not None:
+            self.risk_model.predict(np.zeros((1, len(RISK_FEATURES))), verbose=0)
+        self.warmed_up = True
+
+
+class ModelRegistry:
+    """Lazily loaded, atomically swappable models shared by the whole process.
+
+    Nothing is imported or loaded until the first ``get``; the app starts
+    a background warm-up at startup so the first request does not pay for
+    the TensorFlow import, model load and graph tracing. ``activate``
+    builds and warms a new bundle off to the side and then publishes it
+    with a single reference swap; requests already holding the previous
+    bundle finish on it. Models come from the versioned artifact store
+    under ``model_path``, and ``watch`` polls its active version so every
+    worker switches to a newly published model without a restart. With
+    the ``numpy`` runtime, models are served from their NumPy runtime
+    export (see ``app.ml.runtime``), or converted from Keras when a version
+    has none, and TensorFlow is only imported for that conversion. Keras
+    models loaded from disk are cached per file, so training and
+    evaluation code asking for the same artifact shares the served
+    instance instead of loading its own copy; a swap evicts every cached
+    model outside the new and previous versions.
+    """
+
+    def __init__(
+        self,
+        model_path: str = settings.MODEL_PATH,
+        loader: Optional[Callable[[Optional[str]], ModelBundle]] = None,
+        runtime: str = settings.MODEL_RUNTIME
+    ):
+        """Initialize model registry."""
+        if runtime not in ("numpy", "keras"):
+            raise ValueError(f"Unknown model runtime {runtime!r}")
+        self.model_path = model_path
+        self.runtime = runtime
+        self.store = ModelArtifactStore(model_path)
+        self._loader = loader or self._load_bundle
+        self._bundle: Optional[ModelBundle] = None
+        self._lock = threading.Lock()
+        self._keras_cache: Dict[str, Tuple[float, Any]] = {}
+        self._keras_lock = threading.Lock()
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._failed_version: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether a bundle has been loaded."""
+        return self._bundle is not None
+
+    @property
+    def version(self) -> str:
+        """Version of the active bundle, without loading it."""
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle.version
+        return self.store.active_version() or DEFAULT_MODEL_VERSION
+
+    def get(self) -> ModelBundle:
+        """The active bundle, loading the default version on first use."""
+        bundle = self._bundle
+        if bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._bundle = self._loader(None)
+                bundle = self._bundle
+        return bundle
+
+    async def aget(self) -> ModelBundle:
+        """``get`` that loads in a worker thread instead of blocking the event loop."""
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+        return await asyncio.to_thread(self.get)
+
+    def activate(self, version: Optional[str] = None, warm_up: bool = True) -> ModelBundle:
+        """Load ``version``, warm it up and make it the active bundle."""
+        bundle = self._loader(version)
+        if warm_up:
+            bundle.warm_up()
+        return self.install(bundle)
+
+    def install(self, bundle: ModelBundle) -> ModelBundle:
+        """Publish an already built bundle."""
+        with self._lock:
+            previous, self._bundle = self._bundle, bundle
+        self._evict_keras_models(bundle, previous)
+        logger.info(
+            f"Activated model version {bundle.version}"
+            + (f" (replacing {previous.version})" if previous is not None else "")
+        )
+        return bundle
+
+    def warm_up(self) -> ModelBundle:
+        """Load the active bundle if needed and warm it up."""
+        bundle = self.get()
+        if not bundle.warmed_up:
+            bundle.warm_up()
+            logger.info(f"Warmed up model version {bundle.version}")
+        return bundle
+
+    def start_warm_up(self):
+        """Warm the models up in a background thread."""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.get_running_loop().create_task(self._run_warm_up())
+
+    async def _run_warm_up(self):
+        """Background warm-up task."""
+        try:
+            await asyncio.to_thread(self.warm_up)
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {e}")
+
+    def check_for_update(self) -> Optional[ModelBundle]:
+        """Activate the store's active version if it differs from the served one."""
+        version = self.store.active_version()
+        bundle = self._bundle
+        # Before the first load ``get`` picks the active version up by itself
+        if version is None or bundle is None or version in (bundle.version, self._failed_version):
+            return None
+        try:
+            return self.activate(version)
+        except Exception:
+            # Do not retry a broken version on every poll; publishing another one clears this
+            self._failed_version = version
+            raise
+
+    def start_watching(self, interval: float):
+        """Poll the artifact store for a newly activated version every ``interval`` seconds."""
+        if self._watch_task is None and interval > 0:
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    async def _watch(self, interval: float):
+        """Background polling task; a version that fails to load keeps the current one serving."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.check_for_update)
+            except Exception as e:
+                logger.error(f"Failed to activate new model version: {e}")
+
+    async def stop(self):
+        """Stop polling and wait for a running warm-up to finish."""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        if self._warm_up_task is not None:
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+            self._warm_up_task = None
+
+    def _evict_keras_models(self, *bundles: Optional[ModelBundle]):
+        """Drop cached Keras models not loaded from the directory of one of ``bundles``."""
+        keep = {
+            os.path.abspath(bundle.source)
+            for bundle in bundles if bundle is not None and bundle.source
+        }
+        with self._keras_lock:
+            for path in list(self._keras_cache):
+                if os.path.dirname(os.path.abspath(path)) not in keep:
+                    del self._keras_cache[path]
+
+    def load_keras_model(self, path: str) -> Any:
+        """Load a Keras model file once per process; reloaded when the file changes."""
+        modified = os.path.getmtime(path)
+        with self._keras_lock:
+            cached = self._keras_cache.get(path)
+            if cached is not None and cached[0] == modified:
+                return cached[1]
+
+            # Import here to keep TensorFlow off the import path
+            import tensorflow as tf
+            model = tf.keras.models.load_model(path)
+            self._keras_cache[path] = (modified, model)
+            return model
+
+    def _load_serving_model(self, path: str, model_file: str, runtime_file: Optional[str]) -> Any:
+        """Model to serve from ``path``, preferring its NumPy runtime export."""
+        if self.runtime == "numpy" and runtime_file:
+            runtime_path = os.path.join(path, runtime_file)
+            if os.path.exists(runtime_path):
+                return NumpyModel.load(runtime_path)
+        return self._serving_model(self.load_keras_model(os.path.join(path, model_file)))
+
+    def _serving_model(self, model: Any) -> Any:
+        """A Keras model converted to the configured runtime."""
+        if self.runtime != "numpy":
+            return model
+        try:
+            return NumpyModel.from_keras(model)
+        except ValueError as e:
+            logger.warning(f"Serving {model.name} through Keras: {e}")
+            return model
+
+    def _load_bundle(self, version: Optional[str]) -> ModelBundle:
+        """Load a bundle from the artifact store.
+
+        Without an explicit version this loads the store's active version,
+        or a flat pre-versioning model directory, and falls back to the
+        default models if neither loads.
+        """
+        requested = version
+        version = version or self.store.active_version()
+        try:
+            if version is not None:
+                return self._load_version(version)
+            return self._load_unversioned()
+
+        except Exception as e:
+            if requested is not None:
+                raise
+            logger.warning(f"Could not load AI models: {e}")
+            return self._default_bundle()
+
+    def _load_version(self, version: str) -> ModelBundle:
+        """Load every model listed in a published version's manifest."""
+        # Import here to keep joblib/scikit-learn off the import path
+        import joblib
+
+        manifest = self.store.manifest(version)
+        path = self.store.version_path(version)
+        loaded = {}
+        for name, entry in manifest["components"].items():
+            expected = list(COMPONENTS[name]["features"])
+            if entry.get("features", expected) != expected:
+                raise ValueError(
+                    f"Model version {version} {name} model was trained on features "
+                    f"{entry['features']}, expected {expected}"
+                )
+            loaded[name] = (
+                self._load_serving_model(path, entry["model"], entry.get("runtime")),
+                joblib.load(os.path.join(path, entry["scaler"])) if entry.get("scaler") else None
+            )
+
+        weather_model, weather_scaler = loaded.get("weather", (None, None))
+        risk_model, risk_scaler = loaded.get("risk", (None, None))
+        logger.info(f"AI models {version} loaded from {path}")
+        return ModelBundle(
+            version=version,
+            weather_model=weather_model,
+            risk_model=risk_model,
+            weather_scaler=weather_scaler,
+            risk_scaler=risk_scaler,
+            source=path,
+            manifest=manifest
+        )
+
+    def _load_unversioned(self) -> ModelBundle:
+        """Load models saved directly into ``model_path`` before versioning."""
+        # Import here to keep joblib/scikit-learn off the import path
+        import joblib
+
+        def scaler(file_name: str) -> Any:
+            scaler_file = os.path.join(self.model_path, file_name)
+            return joblib.load(scaler_file) if os.path.exists(scaler_file) else None
+
+        bundle = ModelBundle(
+            version=DEFAULT_MODEL_VERSION,
+            weather_model=self._load_serving_model(self.model_path, WEATHER_MODEL_FILE, WEATHER_RUNTIME_FILE),
+            risk_model=self._load_serving_model(self.model_path, RISK_MODEL_FILE, RISK_RUNTIME_FILE),
+            weather_scaler=scaler(WEATHER_SCALER_FILE),
+            risk_scaler=scaler(RISK_SCALER_FILE),
+            source=self.model_path
+        )
+        logger.info(f"AI models loaded from {self.model_path}")
+        return bundle
+
+    def _default_bundle(self) -> ModelBundle:
+        """Untrained default models for when no trained artifacts are available."""
+        # Import here to keep TensorFlow off the import path
+        import tensorflow as tf
+
+        # Create simple LSTM model for weather prediction
+        weather_model = tf.keras.Sequential([
+            tf.keras.layers.LSTM(
+                50, return_sequences=True,
+                input_shape=(WEATHER_SEQUENCE_LENGTH, len(WEATHER_FEATURES))
+            ),
+            tf.keras.layers.LSTM(50, return_sequences=False),
+            tf.keras.layers.Dense(25),
+            tf.keras.layers.Dense(len(WEATHER_FEATURES))
+        ])
+        weather_model.compile(optimizer='adam', loss='mse')
+
+        # Create neural network for risk assessment
+        risk_model = tf.keras.Sequential([
+            tf.keras.layers.Dense(64, activation='relu', input_shape=(len(RISK_FEATURES),)),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(32, activation='relu'),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(16, activation='relu'),
+            tf.keras.layers.Dense(6, activation='sigmoid')  # 6 risk types
+        ])
+        risk_model.compile(optimizer='adam', loss='binary_crossentropy')
+
+        logger.info("Default AI models initialized")
+        return ModelBundle(
+            version=DEFAULT_MODEL_VERSION,
+            weather_model=self._serving_model(weather_model),
+            risk_model=self._serving_model(risk_model)
+        )
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,188 @@
+"""Concurrent, rate-limited notification fan-out."""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationChannel:
+    """Delivery settings for one notification channel.
+
+    ``send`` delivers to a single recipient and returns success. Providers
+    that accept bulk requests can also supply ``send_batch``, which takes up
+    to ``batch_size`` recipients and returns one success flag per recipient.
+    Each provider request consumes one token from the channel's rate limiter.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[Any, Any], Awaitable[bool]],
+        concurrency: int = 10,
+        rate_per_second: float = 10.0,
+        burst: Optional[float] = None,
+        send_batch: Optional[Callable[[List[Any], Any], Awaitable[List[bool]]]] = None,
+        batch_size: int = 1,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.5
+    ):
+        """Initialize notification channel."""
+        self.name = name
+        self.send = send
+        self.send_batch = send_batch
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size) if send_batch else 1
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.limiter = TokenBucket(rate_per_second, burst)
+
+
+class NotificationPipeline:
+    """Fan notifications out over all channels concurrently.
+
+    Every channel gets its own bounded worker pool and token bucket, so a
+    slow or throttled provider never holds up the others. Failed sends are
+    retried with exponential backoff and jitter, and results are aggregated
+    into a single report.
+    """
+
+    def __init__(self, channels: Sequence[NotificationChannel]):
+        """Initialize notification pipeline."""
+        self.channels = {channel.name: channel for channel in channels}
+
+    async def dispatch(
+        self,
+        deliveries: Dict[str, List[Any]],
+        alert: Any
+    ) -> Dict[str, Any]:
+        """Deliver ``alert`` to each channel's recipients and aggregate results.
+
+        Args:
+            deliveries: Recipients keyed by channel name.
+            alert: Alert passed through to the channel send functions.
+
+        Returns:
+            Report with ``notifications_sent``, ``errors``, ``channels_used``
+            and a per-channel breakdown.
+        """
+        results = {
+            "notifications_sent": 0,
+            "errors": [],
+            "channels_used": [],
+            "channels": {}
+        }
+
+        channel_names = [
+            name for name, recipients in deliveries.items()
+            if recipients and name in self.channels
+        ]
+        for name in deliveries:
+            if name not in self.channels and deliveries[name]:
+                results["errors"].append(f"Unknown notification channel: {name}")
+
+        channel_results = await asyncio.gather(*[
+            self._dispatch_channel(self.channels[name], deliveries[name], alert)
+            for name in channel_names
+        ])
+
+        for name, channel_result in zip(channel_names, channel_results):
+            results["channels"][name] = {
+                "sent": channel_result["sent"],
+                "failed": channel_result["failed"]
+            }
+            results["notifications_sent"] += channel_result["sent"]
+            results["errors"].extend(channel_result["errors"])
+            if channel_result["sent"]:
+                results["channels_used"].append(name)
+
+        return results
+
+    async def _dispatch_channel(
+        self,
+        channel: NotificationChannel,
+        recipients: List[Any],
+        alert: Any
+    ) -> Dict[str, Any]:
+        """Deliver to one channel's recipients with a bounded worker pool."""
+        channel_result = {"sent": 0, "failed": 0, "errors": []}
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for start in range(0, len(recipients), channel.batch_size):
+            queue.put_nowait(recipients[start:start + channel.batch_size])
+
+        async def worker():
+            while True:
+                try:
+                    batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                sent, errors = await self._deliver_batch(channel, batch, alert)
+                channel_result["sent"] += sent
+                channel_result["failed"] += len(batch) - sent
+                channel_result["errors"].extend(errors)
+
+        workers = min(channel.concurrency, queue.qsize())
+        await asyncio.gather(*[worker() for _ in range(workers)])
+
+        logger.info(
+            f"Channel {channel.name}: {channel_result['sent']} sent, "
+            f"{channel_result['failed']} failed"
+        )
+        return channel_result
+
+    async def _deliver_batch(
+        self,
+        channel: NotificationChannel,
+        batch: List[Any],
+        alert: Any
+    ) -> tuple:
+        """Send one batch, retrying recipients whose delivery failed."""
+        pending = batch
+        sent = 0
+        last_error = None
+
+        for attempt in range(channel.max_attempts):
+            if attempt:
+                delay = channel.backoff_seconds * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, channel.backoff_seconds))
+
+            await channel.limiter.acquire()
+            try:
+                if channel.send_batch is not None:
+                    outcomes = await channel.send_batch(pending, alert)
+                else:
+                    outcomes = [await channel.send(pending[0], alert)]
+            except Exception as e:
+                last_error = e
+                outcomes = [False] * len(pending)
+
+            if len(outcomes) != len(pending):
+                # Recipients without an outcome count as failed and are retried
+                last_error = ValueError(
+                    f"{channel.name} returned {len(outcomes)} outcomes for {len(pending)} recipients"
+                )
+                logger.warning(str(last_error))
+                outcomes = list(outcomes[:len(pending)]) + [False] * (len(pending) - len(outcomes))
+
+            sent += sum(1 for outcome in outcomes if outcome)
+            pending = [
+                recipient for recipient, outcome in zip(pending, outcomes) if not outcome
+            ]
+            if not pending:
+                return sent, []
+
+        reason = f": {last_error}" if last_error else ""
+        errors = [
+            f"Error sending {channel.name} notification to user "
+            f"{getattr(recipient, 'id', recipient)}{reason}"
+            for recipient in pending
+        ]
+        for error in errors:
+            logger.error(error)
+        return sent, errors
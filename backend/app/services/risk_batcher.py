@@ -0,0 +1,92 @@
+"""Micro-batching of risk assessments on the ingest path."""
+
+import logging
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.models.climate import ClimateData, RiskAssessment
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RiskAssessmentBatcher:
+    """Collect pending climate data rows and score them with one model call.
+
+    Callers await ``submit``; rows are flushed once ``max_batch_size`` rows
+    are pending or ``max_wait_ms`` has elapsed since the first pending row,
+    whichever comes first. Each caller's future resolves to its own
+    ``RiskAssessment``.
+    """
+
+    def __init__(
+        self,
+        prediction_service,
+        max_batch_size: int = settings.RISK_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.RISK_BATCH_MAX_WAIT_MS
+    ):
+        """Initialize risk assessment batcher."""
+        self.prediction_service = prediction_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: List[Tuple[ClimateData, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, climate_data: ClimateData) -> Optional[RiskAssessment]:
+        """Queue climate data for scoring and wait for its risk assessment."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((climate_data, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the pending rows to a scoring task."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._score_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score_batch(self, batch: List[Tuple[ClimateData, asyncio.Future]]):
+        """Score one batch and resolve every caller's future."""
+        try:
+            risk_assessments = await self.prediction_service.generate_risk_assessments(
+                [climate_data for climate_data, _ in batch]
+            )
+            for (_, future), risk_assessment in zip(batch, risk_assessments):
+                if not future.done():
+                    future.set_result(risk_assessment)
+
+        except Exception as e:
+            logger.error(f"Error scoring risk assessment batch: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def flush(self):
+        """Score any pending rows immediately and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        """Get batcher queue statistics."""
+        return {
+            "pending": len(self._pending),
+            "in_flight_batches": len(self._tasks),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
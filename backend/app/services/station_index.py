@@ -0,0 +1,144 @@
+"""In-process spatial index over active weather stations."""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models.climate import WeatherStation
+from app.utils.geo_index import GeoGridIndex
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "station_index_pending"
+
+
+class StationIndex:
+    """Nearest-k and within-radius lookup of active weather stations.
+
+    The index is loaded from the database on first use and then kept in
+    sync incrementally as stations are inserted, moved, deactivated or
+    deleted, so forecast lookups never scan the station table. Like the
+    station registry, changes made inside a transaction are staged on the
+    session and applied only once it commits.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.5):
+        """Initialize station index."""
+        self._index = GeoGridIndex(cell_size_deg)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index has been loaded from the database."""
+        return self._loaded
+
+    def ensure_loaded(self, db: Session):
+        """Load the index from the database if it has not been loaded yet."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        """Reload all active stations from the database."""
+        stations = db.query(
+            WeatherStation.id, WeatherStation.latitude, WeatherStation.longitude
+        ).filter(WeatherStation.is_active == True).all()
+
+        self._index.clear()
+        for station_pk, latitude, longitude in stations:
+            self._index.upsert(station_pk, latitude, longitude)
+
+        self._loaded = True
+        logger.info(f"Station index loaded with {len(stations)} active stations")
+
+    def refresh_station(self, station: WeatherStation, db: Optional[Session] = None):
+        """Add, move or drop a station according to its current state.
+
+        With a session the change is applied when ``db`` commits.
+        """
+        if station.id is None:
+            return
+
+        position = None if station.is_active is False else (station.latitude, station.longitude)
+        self._stage(db, station.id, position)
+
+    def remove_station(self, station_pk: int, db: Optional[Session] = None):
+        """Drop a station from the index, when ``db`` commits if given."""
+        self._stage(db, station_pk, None)
+
+    def _stage(
+        self,
+        db: Optional[Session],
+        station_pk: int,
+        position: Optional[Tuple[float, float]]
+    ):
+        """Record a station position (None removes it), applied on commit."""
+        if db is None:
+            self._apply({station_pk: position})
+        else:
+            db.info.setdefault(PENDING_KEY, {})[station_pk] = position
+
+    def _apply(self, changes: Dict[int, Optional[Tuple[float, float]]]):
+        """Apply committed station changes."""
+        for station_pk, position in changes.items():
+            if position is None:
+                self._index.remove(station_pk)
+            else:
+                self._index.upsert(station_pk, *position)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        radius_km: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """The ``k`` nearest stations as (station pk, distance_km)."""
+        return self._index.nearest(latitude, longitude, k=k, max_radius_km=radius_km)
+
+    def within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[Tuple[int, float]]:
+        """Stations within ``radius_km`` as (station pk, distance_km), nearest first."""
+        return self._index.query_radius(latitude, longitude, radius_km)
+
+    def __len__(self) -> int:
+        """Number of indexed stations."""
+        return len(self._index)
+
+
+station_index = StationIndex()
+
+
+@event.listens_for(WeatherStation, "after_insert")
+@event.listens_for(WeatherStation, "after_update")
+def _sync_station_index(mapper, connection, target):
+    """Stage inserted and updated stations for the station index."""
+    station_index.refresh_station(target, object_session(target))
+
+
+@event.listens_for(WeatherStation, "after_delete")
+def _remove_from_station_index(mapper, connection, target):
+    """Stage deleted stations for removal from the station index."""
+    station_index.remove_station(target.id, object_session(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_station_index_changes(session):
+    """Apply staged station changes once their transaction has committed."""
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes:
+        station_index._apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_station_index_changes(session):
+    """Discard staged station changes from a rolled-back transaction."""
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,121 @@
+"""Process-local cache of station identifiers to primary keys."""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.climate import WeatherStation
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "station_registry_pending"
+
+
+class StationRegistry:
+    """Map external station identifiers (e.g. IoT sensor IDs) to station pks.
+
+    The registry is warmed from the database at startup and kept in sync
+    through mapper events. Changes made inside a transaction are staged on
+    the session and only applied once it commits, so a rolled-back station
+    insert can never leave a dangling primary key behind.
+    """
+
+    def __init__(self):
+        """Initialize station registry."""
+        self._station_pks: Dict[str, int] = {}
+        self._loaded = False
+        # Reentrant: ensure_loaded holds it while rebuild takes it again
+        self._lock = threading.RLock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the registry has been loaded from the database."""
+        return self._loaded
+
+    def ensure_loaded(self, db: Session):
+        """Load the registry from the database if it has not been loaded yet."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        """Reload every station identifier from the database."""
+        rows = db.query(WeatherStation.station_id, WeatherStation.id).all()
+
+        with self._lock:
+            self._station_pks = dict(rows)
+            self._loaded = True
+        logger.info(f"Station registry loaded with {len(rows)} stations")
+
+    def get(self, station_id: str) -> Optional[int]:
+        """Primary key of a station, or None if it is not known."""
+        return self._station_pks.get(station_id)
+
+    def lookup(self, station_ids: Iterable[str]) -> Dict[str, int]:
+        """Primary keys of the known stations among ``station_ids``."""
+        station_pks = self._station_pks
+        return {
+            station_id: station_pks[station_id]
+            for station_id in station_ids if station_id in station_pks
+        }
+
+    def stage(self, db: Optional[Session], station_id: str, station_pk: Optional[int]):
+        """Record a station change, applied when ``db`` commits.
+
+        A ``station_pk`` of None removes the station. Without a session the
+        change is applied immediately.
+        """
+        if db is None:
+            self._apply({station_id: station_pk})
+        else:
+            db.info.setdefault(PENDING_KEY, {})[station_id] = station_pk
+
+    def _apply(self, changes: Dict[str, Optional[int]]):
+        """Apply committed station changes."""
+        with self._lock:
+            for station_id, station_pk in changes.items():
+                if station_pk is None:
+                    self._station_pks.pop(station_id, None)
+                else:
+                    self._station_pks[station_id] = station_pk
+
+    def __len__(self) -> int:
+        """Number of known stations."""
+        return len(self._station_pks)
+
+
+station_registry = StationRegistry()
+
+
+@event.listens_for(WeatherStation, "after_insert")
+@event.listens_for(WeatherStation, "after_update")
+def _stage_station_registry(mapper, connection, target):
+    """Stage inserted, renamed and updated stations for the station registry."""
+    db = object_session(target)
+    for previous_id in inspect(target).attrs.station_id.history.deleted or ():
+        if previous_id != target.station_id:
+            station_registry.stage(db, previous_id, None)
+    station_registry.stage(db, target.station_id, target.id)
+
+
+@event.listens_for(WeatherStation, "after_delete")
+def _stage_station_registry_removal(mapper, connection, target):
+    """Stage deleted stations for removal from the station registry."""
+    station_registry.stage(object_session(target), target.station_id, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_station_registry_changes(session):
+    """Apply staged station changes once their transaction has committed."""
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes:
+        station_registry._apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_station_registry_changes(session):
+    """Discard staged station changes from a rolled-back transaction."""
+    session.info.pop(PENDING_KEY, None)
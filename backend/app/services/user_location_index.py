@@ -0,0 +1,216 @@
+"""In-process spatial index of user home locations for alert fan-out."""
+
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, event
+from sqlalchemy.orm import Session, object_session
+
+from app.models.user import User
+from app.utils.geo_index import GeoGridIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NOTIFICATION_RADIUS_KM = 50
+
+PENDING_KEY = "user_location_index_pending"
+
+
+class UserLocationIndex:
+    """Radius lookup of active users by their default location.
+
+    Each user is notified when within the larger of the alert radius and
+    their own notification radius, so the index also tracks per-user radii
+    to bound how far a query has to look. As with the station index,
+    changes made inside a transaction are staged on the session and
+    applied only once it commits; commits happen on sync-session
+    threadpool workers, so every read and write of the index and radii
+    holds the lock.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.5):
+        """Initialize user location index."""
+        self._index = GeoGridIndex(cell_size_deg)
+        self._radii: Dict[int, float] = {}
+        self._radius_counts: Counter = Counter()
+        self._loaded = False
+        # Reentrant: ensure_loaded holds it while rebuild takes it again
+        self._lock = threading.RLock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index has been loaded from the database."""
+        return self._loaded
+
+    def ensure_loaded(self, db: Session):
+        """Load the index from the database if it has not been loaded yet."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        """Reload all active users with a location from the database."""
+        users = db.query(
+            User.id, User.default_latitude, User.default_longitude, User.notification_radius
+        ).filter(
+            and_(
+                User.is_active == True,
+                User.default_latitude.isnot(None),
+                User.default_longitude.isnot(None)
+            )
+        ).all()
+
+        with self._lock:
+            self._index.clear()
+            self._radii.clear()
+            self._radius_counts.clear()
+            for user_id, latitude, longitude, notification_radius in users:
+                self._upsert(user_id, latitude, longitude, notification_radius)
+
+            self._loaded = True
+        logger.info(f"User location index loaded with {len(self._index)} users")
+
+    def _parse_location(
+        self,
+        latitude: Optional[str],
+        longitude: Optional[str]
+    ) -> Optional[Tuple[float, float]]:
+        """Parse a stored location, returning None when missing or invalid."""
+        if latitude is None or longitude is None:
+            return None
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except (ValueError, TypeError):
+            return None
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        return latitude, longitude
+
+    def _upsert(
+        self,
+        user_id: int,
+        latitude: Optional[str],
+        longitude: Optional[str],
+        notification_radius: Optional[int]
+    ):
+        """Index or move a user, dropping them if their location is invalid.
+
+        Callers hold the lock.
+        """
+        location = self._parse_location(latitude, longitude)
+        if location is None:
+            logger.warning(f"Invalid location data for user {user_id}")
+            self._remove(user_id)
+            return
+
+        self._drop_radius(user_id)
+        radius = float(notification_radius or DEFAULT_NOTIFICATION_RADIUS_KM)
+        self._radii[user_id] = radius
+        self._radius_counts[radius] += 1
+        self._index.upsert(user_id, *location)
+
+    def _drop_radius(self, user_id: int):
+        """Forget a user's notification radius; callers hold the lock."""
+        radius = self._radii.pop(user_id, None)
+        if radius is not None:
+            self._radius_counts[radius] -= 1
+            if self._radius_counts[radius] <= 0:
+                del self._radius_counts[radius]
+
+    def _remove(self, user_id: int):
+        """Drop a user's location and radius; callers hold the lock."""
+        self._drop_radius(user_id)
+        self._index.remove(user_id)
+
+    def refresh_user(self, user: User, db: Optional[Session] = None):
+        """Add, move or drop a user according to their current state.
+
+        With a session the change is applied when ``db`` commits.
+        """
+        if user.id is None:
+            return
+
+        if user.is_active is False or user.default_latitude is None or user.default_longitude is None:
+            self._stage(db, user.id, None)
+        else:
+            self._stage(
+                db, user.id, (user.default_latitude, user.default_longitude, user.notification_radius)
+            )
+
+    def remove_user(self, user_id: int, db: Optional[Session] = None):
+        """Drop a user from the index, when ``db`` commits if given."""
+        self._stage(db, user_id, None)
+
+    def _stage(
+        self,
+        db: Optional[Session],
+        user_id: int,
+        location: Optional[Tuple[Optional[str], Optional[str], Optional[int]]]
+    ):
+        """Record a user's location and radius (None removes them), applied on commit."""
+        if db is None:
+            self._apply({user_id: location})
+        else:
+            db.info.setdefault(PENDING_KEY, {})[user_id] = location
+
+    def _apply(self, changes: Dict[int, Optional[Tuple[Optional[str], Optional[str], Optional[int]]]]):
+        """Apply committed user changes."""
+        with self._lock:
+            for user_id, location in changes.items():
+                if location is None:
+                    self._remove(user_id)
+                else:
+                    self._upsert(user_id, *location)
+
+    def find_users_in_range(
+        self,
+        latitude: float,
+        longitude: float,
+        alert_radius_km: float
+    ) -> List[Tuple[int, float]]:
+        """Users within max(alert radius, their notification radius) as (id, distance_km)."""
+        with self._lock:
+            max_user_radius = max(self._radius_counts, default=0.0)
+            search_radius = max(alert_radius_km, max_user_radius)
+
+            return [
+                (user_id, distance)
+                for user_id, distance in self._index.query_radius(latitude, longitude, search_radius)
+                if distance <= max(alert_radius_km, self._radii.get(user_id, 0.0))
+            ]
+
+    def __len__(self) -> int:
+        """Number of indexed users."""
+        return len(self._index)
+
+
+user_location_index = UserLocationIndex()
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def _sync_user_location_index(mapper, connection, target):
+    """Stage inserted and updated users for the user location index."""
+    user_location_index.refresh_user(target, object_session(target))
+
+
+@event.listens_for(User, "after_delete")
+def _remove_from_user_location_index(mapper, connection, target):
+    """Stage deleted users for removal from the user location index."""
+    user_location_index.remove_user(target.id, object_session(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_location_index_changes(session):
+    """Apply staged user changes once their transaction has committed."""
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes:
+        user_location_index._apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_location_index_changes(session):
+    """Discard staged user changes from a rolled-back transaction."""
+    session.info.pop(PENDING_KEY, None)
@@ -112,6 +112,21 @@ class TestClimateEndpoints:
         assert data["temperature"] == climate_data["temperature"]
         assert data["data_source"] == "test"
     
+    def test_create_duplicate_climate_data(self, client, test_station, auth_headers):
+        """Test posting the same reading twice is rejected as a conflict."""
+        climate_data = {
+            "station_id": test_station.id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "temperature": 25.5,
+            "data_source": "test"
+        }
+        
+        response = client.post("/api/v1/climate/data", json=climate_data, headers=auth_headers)
+        assert response.status_code == 200
+        
+        response = client.post("/api/v1/climate/data", json=climate_data, headers=auth_headers)
+        assert response.status_code == 409
+    
     def test_get_climate_data(self, client, test_station, db):
         """Test getting climate data."""
         # Create test climate data
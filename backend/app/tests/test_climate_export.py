@@ -0,0 +1,117 @@
+"""Tests for streaming climate data export."""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import database
+from app.db.base import Base
+from app.models.climate import ClimateData, WeatherStation
+from app.services.climate_export import (
+    EXPORT_COLUMN_NAMES, ArrowWriter, ClimateDataExporter, CSVWriter, ExportFormatError,
+    NDJSONWriter, get_export_writer
+)
+
+
+class TestClimateDataExporter:
+    """Test keyset-segmented export against a SQLite database."""
+
+    @pytest_asyncio.fixture
+    async def sessions(self, tmp_path, monkeypatch):
+        """Async session factory on a fresh SQLite database with tied timestamps."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            station = WeatherStation(station_id="st-0", name="Station 0", latitude=0.0, longitude=0.0)
+            session.add(station)
+            await session.flush()
+
+            start = datetime(2024, 3, 1)
+            # Three readings per timestamp so segment boundaries fall inside ties
+            session.add_all([
+                ClimateData(
+                    station_id=station.id,
+                    timestamp=start + timedelta(hours=step // 3),
+                    temperature=float(step),
+                    # Tied readings come from different sources
+                    data_source=f"test-{step % 3}"
+                )
+                for step in range(50)
+            ])
+            await session.commit()
+
+        monkeypatch.setattr(database, "AsyncSessionLocal", factory)
+        yield factory
+        await engine.dispose()
+
+    async def _export(self, exporter, writer, **filters):
+        """Collect an export into bytes."""
+        return b"".join([chunk async for chunk in exporter.stream(writer, **filters)])
+
+    @pytest.mark.asyncio
+    async def test_segments_return_every_row_once_in_order(self, sessions):
+        """Small chunks and segments yield the same rows as one large read."""
+        exporter = ClimateDataExporter(chunk_size=4, segment_rows=7)
+        chunks = [rows async for rows in exporter.iter_chunks()]
+
+        assert max(len(rows) for rows in chunks) <= 4
+        temperatures = [row[EXPORT_COLUMN_NAMES.index("temperature")] for rows in chunks for row in rows]
+        assert temperatures == [float(step) for step in range(50)]
+
+        window = await self._export(
+            exporter, NDJSONWriter(),
+            start_time=datetime(2024, 3, 1, 2), end_time=datetime(2024, 3, 1, 4)
+        )
+        records = [json.loads(line) for line in window.decode().splitlines()]
+        assert [record["temperature"] for record in records] == [float(step) for step in range(6, 15)]
+
+    @pytest.mark.asyncio
+    async def test_csv_export_and_unknown_format(self, sessions):
+        """CSV exports carry one header row; unknown formats are rejected."""
+        body = await self._export(ClimateDataExporter(chunk_size=16, segment_rows=16), CSVWriter())
+        rows = list(csv.reader(io.StringIO(body.decode())))
+
+        assert rows[0] == EXPORT_COLUMN_NAMES
+        assert len(rows) == 51
+
+        with pytest.raises(ExportFormatError):
+            get_export_writer("xlsx")
+
+    @pytest.mark.asyncio
+    async def test_arrow_stream_export(self, sessions):
+        """Arrow IPC exports read back as one stream with a batch per chunk."""
+        pa = pytest.importorskip("pyarrow")
+        body = await self._export(ClimateDataExporter(chunk_size=16, segment_rows=32), ArrowWriter())
+
+        reader = pa.ipc.open_stream(body)
+        batches = list(reader)
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+
+        assert reader.schema.names == EXPORT_COLUMN_NAMES
+        assert [batch.num_rows for batch in batches] == [16, 16, 16, 2]
+        assert table.column("temperature").to_pylist() == [float(step) for step in range(50)]
+        assert table.column("timestamp")[0].as_py().replace(tzinfo=None) == datetime(2024, 3, 1)
+
+    @pytest.mark.asyncio
+    async def test_parquet_export(self, sessions):
+        """Parquet exports read back with one row group per chunk."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        import pyarrow as pa
+
+        body = await self._export(
+            ClimateDataExporter(chunk_size=20, segment_rows=20), ArrowWriter(parquet=True)
+        )
+
+        assert pq.ParquetFile(pa.BufferReader(body)).num_row_groups == 3
+        table = pq.read_table(pa.BufferReader(body))
+        assert table.column_names == EXPORT_COLUMN_NAMES
+        assert table.column("temperature").to_pylist() == [float(step) for step in range(50)]
+        assert set(table.column("data_source").to_pylist()) == {"test-0", "test-1", "test-2"}
@@ -0,0 +1,114 @@
+"""Tests for hourly and daily climate rollups."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.climate import ClimateData, ClimateRollup, RiskAssessment, WeatherStation
+from app.services.climate_rollups import ClimateRollupService
+
+
+class TestClimateRollups:
+    """Test rollup compaction and range summaries against raw aggregates."""
+
+    @pytest.fixture
+    def db(self):
+        """Session on a fresh in-memory SQLite database with readings over four days."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+
+        stations = [
+            WeatherStation(station_id=f"st-{i}", name=f"Station {i}", latitude=0.0, longitude=float(i))
+            for i in range(2)
+        ]
+        session.add_all(stations)
+        session.flush()
+
+        start = datetime(2024, 3, 1, 0, 7)
+        for step in range(4 * 24 * 3):
+            for station in stations:
+                reading = ClimateData(
+                    station_id=station.id,
+                    timestamp=start + timedelta(minutes=20 * step),
+                    temperature=None if step % 7 == 0 else (step % 50) - 10.0 + station.id,
+                    data_source="test"
+                )
+                session.add(reading)
+                if step % 5 == 0:
+                    session.add(RiskAssessment(climate_data=reading, overall_risk=(step % 10) / 10))
+        session.commit()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def _raw_summary(self, db, start, end):
+        """Temperature and risk aggregates straight from raw rows."""
+        window = (ClimateData.timestamp >= start, ClimateData.timestamp <= end)
+        records, count, total, minimum, maximum = db.query(
+            func.count(ClimateData.id), func.count(ClimateData.temperature),
+            func.sum(ClimateData.temperature), func.min(ClimateData.temperature),
+            func.max(ClimateData.temperature)
+        ).filter(*window).one()
+        assessments, risk_total, risk_max = db.query(
+            func.count(RiskAssessment.id), func.sum(RiskAssessment.overall_risk),
+            func.max(RiskAssessment.overall_risk)
+        ).join(ClimateData).filter(*window).one()
+        return records, count, total, minimum, maximum, assessments, risk_total, risk_max
+
+    def _rollup_summary(self, service, db, start, end):
+        """The same aggregates as answered by the rollup service."""
+        summary = service.summarize(db, start, end)
+        temperature, risk = summary["temperature"], summary["overall_risk"]
+        return (
+            summary["records"]["count"], temperature["count"], temperature["total"],
+            temperature["minimum"], temperature["maximum"],
+            summary["risk_assessments"]["count"], risk["total"], risk["maximum"]
+        )
+
+    def test_summary_matches_raw_aggregates(self, db):
+        """Test summaries from rollups plus ragged edges equal raw aggregates."""
+        service = ClimateRollupService(watermark_lag_seconds=0)
+        result = service.compact(db)
+
+        assert result["hours"] == 4 * 24
+        assert db.query(ClimateRollup).filter(ClimateRollup.granularity == "day").count() > 0
+
+        ranges = [
+            (datetime(2024, 3, 1, 0, 0), datetime(2024, 3, 5)),
+            (datetime(2024, 3, 1, 5, 13), datetime(2024, 3, 3, 22, 41)),
+            (datetime(2024, 3, 2, 3, 30), datetime(2024, 3, 2, 4, 10)),
+            (datetime(2024, 3, 1, 23, 0), datetime(2024, 3, 3, 1, 0))
+        ]
+        for start, end in ranges:
+            assert self._rollup_summary(service, db, start, end) == pytest.approx(
+                self._raw_summary(db, start, end)
+            )
+
+    def test_compaction_is_incremental(self, db):
+        """Test a later compaction only recomputes hours touched by new data."""
+        service = ClimateRollupService(watermark_lag_seconds=0)
+        service.compact(db)
+
+        # Age existing data and rollups so the backfill below is the only new row
+        for model, column in (
+            (ClimateData, "created_at"), (RiskAssessment, "created_at"), (ClimateRollup, "computed_at")
+        ):
+            db.execute(model.__table__.update().values({column: datetime(2000, 1, 1)}))
+        db.commit()
+        assert service.compact(db)["hours"] == 0
+
+        # Backfill into an hour that is already rolled up
+        db.add(ClimateData(
+            station_id=1, timestamp=datetime(2024, 3, 2, 12, 30), temperature=99.0, data_source="late"
+        ))
+        db.commit()
+
+        assert service.compact(db)["hours"] == 1
+        start, end = datetime(2024, 3, 1), datetime(2024, 3, 4)
+        assert self._rollup_summary(service, db, start, end) == pytest.approx(
+            self._raw_summary(db, start, end)
+        )
@@ -0,0 +1,201 @@
+"""Tests for the data ingestion service."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.climate import ClimateData, WeatherStation
+from app.services.data_ingestion import DataIngestionService
+from app.services.station_registry import station_registry
+from app.utils.rate_limiter import TokenBucket
+
+
+class TestClimateBatchIngestion:
+    """Test deduplication of batched readings on the unique dedup key."""
+
+    @pytest.fixture
+    def db(self):
+        """Session on a fresh in-memory SQLite database with one station."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        session.add(WeatherStation(id=1, station_id="st", name="Station", latitude=0.0, longitude=0.0))
+        session.commit()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def readings(self, hours, data_source="test", temperature=20.0):
+        """Readings for station 1 at the given hours of a day."""
+        start = datetime(2024, 5, 1)
+        return [
+            {
+                "station_id": 1,
+                "timestamp": start + timedelta(hours=hour),
+                "data_source": data_source,
+                "temperature": temperature
+            }
+            for hour in hours
+        ]
+
+    def test_skips_duplicates_within_and_across_batches(self, db):
+        """Test repeated keys are stored once and counted as duplicates."""
+        service = DataIngestionService()
+
+        first = service.ingest_climate_batch(self.readings([0, 1, 1, 2]), db)
+        assert (first["records_processed"], first["duplicates"], first["errors"]) == (3, 1, [])
+
+        # Same instant as an aware timestamp, another source and one new hour
+        second = self.readings([2, 3]) + self.readings([0], data_source="other")
+        second[0]["timestamp"] = second[0]["timestamp"].replace(tzinfo=timezone.utc)
+        result = service.ingest_climate_batch(second, db)
+
+        assert (result["records_processed"], result["duplicates"]) == (2, 1)
+        assert db.query(ClimateData).count() == 5
+        assert all(row.blockchain_hash is not None for row in db.query(ClimateData))
+
+    def test_concurrent_batches_insert_each_reading_once(self, db):
+        """Test a reading stored after the batch was prepared is skipped, not duplicated."""
+        service = DataIngestionService()
+        rows = [
+            {column: reading.get(column) for column in ("station_id", "timestamp", "data_source", "temperature")}
+            for reading in self.readings([0, 1])
+        ]
+
+        assert service._insert_readings_if_absent(rows, db) == 2
+        # Another worker racing on the same readings
+        assert service._insert_readings_if_absent(rows, db) == 0
+        db.commit()
+        assert db.query(ClimateData).count() == 2
+
+        with pytest.raises(IntegrityError):
+            db.execute(insert(ClimateData), rows[:1])
+
+    def test_iot_readings_keep_their_measurement_time(self, db, monkeypatch):
+        """Test one sensor's readings in a batch are stored at their own timestamps."""
+        monkeypatch.setattr(station_registry, "_station_pks", {})
+        monkeypatch.setattr(station_registry, "_loaded", False)
+        payload = {"sensor_id": "iot", "latitude": 1.0, "longitude": 2.0, "received_at": "2024-05-01T09:00:00"}
+        batch = [
+            dict(payload, timestamp="2024-05-01T07:00:00Z", temperature=18.0),
+            dict(payload, timestamp="2024-05-01T10:00:00+02:00", temperature=19.0),
+            dict(payload, temperature=20.0)
+        ]
+
+        result = DataIngestionService()._ingest_iot_readings(batch, db)
+
+        assert (result["records_processed"], result["duplicates"]) == (3, 0)
+        stored = db.query(ClimateData.timestamp, ClimateData.temperature).order_by(ClimateData.timestamp).all()
+        assert [(timestamp.hour, temperature) for timestamp, temperature in stored] == [
+            (7, 18.0), (8, 19.0), (9, 20.0)
+        ]
+
+
+class TestOpenWeatherFetch:
+    """Test station fetches share one paced keep-alive session and report failures."""
+
+    @pytest.fixture
+    def stub(self):
+        """Stub OpenWeatherMap server recording concurrency and client connections."""
+        state = {"in_flight": 0, "max_in_flight": 0, "peers": set(), "requests": 0, "failing": set()}
+
+        async def weather(request):
+            state["requests"] += 1
+            state["peers"].add(request.transport.get_extra_info("peername"))
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            latitude = float(request.query["lat"])
+            if latitude in state["failing"]:
+                return web.json_response({"message": "unavailable"}, status=503)
+            return web.json_response({"id": 1000 + int(latitude), "dt": 1700000000, "main": {"temp": latitude}})
+
+        app = web.Application()
+        app.router.add_get("/weather", weather)
+        state["app"] = app
+        return state
+
+    @pytest_asyncio.fixture
+    async def db(self, tmp_path):
+        """Async session on a fresh SQLite database with three stations."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'weather.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            session.add_all([
+                WeatherStation(station_id=f"st-{i}", name=f"Station {i}", latitude=float(i), longitude=0.0)
+                for i in range(3)
+            ])
+            await session.commit()
+            yield session
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_until_closed(self):
+        """Test the HTTP session is created once and recreated after close."""
+        service = DataIngestionService()
+
+        session = service._get_http_session()
+        assert service._get_http_session() is session
+        await service.close()
+        assert session.closed
+
+        reopened = service._get_http_session()
+        assert reopened is not session
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_fetches_are_bounded_paced_and_kept_alive(self, stub):
+        """Test station fetches respect concurrency and rate, reusing pooled connections."""
+        service = DataIngestionService()
+        service.openweather_concurrency = 2
+        service.weather_client.concurrency = 2
+        service.weather_client.limiter = TokenBucket(rate=50, capacity=2)
+        service.weather_client.openweather_api_key = "test"
+        stations = [
+            WeatherStation(station_id=f"st-{i}", name=f"Station {i}", latitude=float(i), longitude=0.0)
+            for i in range(8)
+        ]
+
+        async with TestServer(stub["app"]) as server:
+            service.weather_client.openweather_base_url = str(server.make_url("")).rstrip("/")
+            started = time.monotonic()
+            results = await service._fetch_openweather_stations(service._get_http_session(), stations)
+            elapsed = time.monotonic() - started
+            await service.close()
+
+        assert [station for station, _ in results] == stations
+        assert [data["main"]["temp"] for _, data in results] == [float(i) for i in range(8)]
+        assert stub["requests"] == 8
+        assert stub["max_in_flight"] <= 2
+        assert len(stub["peers"]) <= 2
+        # Six requests beyond the burst of two at 50 per second
+        assert elapsed >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_failed_fetches_are_reported(self, stub, db):
+        """Test stations whose fetch returned nothing are listed in the errors."""
+        stub["failing"].add(1.0)
+        service = DataIngestionService()
+        service.openweather_api_key = "test"
+        service.weather_client.openweather_api_key = "test"
+        service.weather_client.limiter = TokenBucket(rate=1000, capacity=10)
+
+        async with TestServer(stub["app"]) as server:
+            service.weather_client.openweather_base_url = str(server.make_url("")).rstrip("/")
+            result = await service.ingest_openweather_data(db=db)
+            await service.close()
+
+        assert result["records_processed"] == 2
+        assert result["errors"] == ["No data returned for station st-1"]
@@ -0,0 +1,39 @@
+"""Tests for database engine configuration."""
+
+import importlib.util
+
+import pytest
+
+import app.db.database
+from app.core.config import settings
+
+
+def load_database_module():
+    """Execute app/db/database.py as a fresh module, leaving the shared engines alone."""
+    spec = importlib.util.spec_from_file_location("database_under_test", app.db.database.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestDatabaseEngines:
+    """Test that engines are created for every supported database."""
+
+    @pytest.mark.parametrize("database_url", ["sqlite:///./climate_guardian.db", "sqlite://"])
+    def test_imports_with_sqlite(self, monkeypatch, database_url):
+        """SQLite URLs create both engines without queue pool arguments."""
+        monkeypatch.setattr(settings, "DATABASE_URL", database_url)
+        monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", None)
+
+        module = load_database_module()
+
+        assert module.async_engine.url.drivername == "sqlite+aiosqlite"
+        assert module.engine.url.drivername == "sqlite"
+
+    def test_pool_options_for_server_databases(self):
+        """PostgreSQL gets the configured pool size."""
+        options = app.db.database.get_pool_options("postgresql+asyncpg://user:pw@db/climate")
+
+        assert options["pool_size"] == settings.DATABASE_POOL_SIZE
+        assert options["max_overflow"] == settings.DATABASE_MAX_OVERFLOW
+        assert app.db.database.get_pool_options("sqlite+aiosqlite:///x.db") == {}
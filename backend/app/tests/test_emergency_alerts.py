@@ -0,0 +1,105 @@
+"""Tests for location-filtered, keyset-paginated alert listing."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints import emergency
+from app.db.base import Base
+from app.models.emergency import AlertSeverity, AlertStatus, EmergencyAlert
+
+ISSUED = datetime(2024, 6, 1, 12)
+# About 55.6 km north of the query point
+NEAR_LATITUDE = 0.5
+
+
+def alert(number: int, latitude: float, radius=None, issued_at=ISSUED, **fields) -> EmergencyAlert:
+    """Alert on the prime meridian."""
+    return EmergencyAlert(
+        alert_id=f"ALERT-{number}",
+        title=f"Alert {number}",
+        description="Test alert",
+        severity=AlertSeverity.HIGH,
+        latitude=latitude,
+        longitude=0.0,
+        radius=radius,
+        issued_at=issued_at,
+        **fields
+    )
+
+
+async def list_alerts(db, **params):
+    """Call the endpoint with its query defaults; returns (alert ids, next cursor)."""
+    query = {
+        "latitude": None, "longitude": None, "radius": None, "severity": None, "status": None,
+        "risk_type": None, "active_only": True, "limit": 50, "offset": 0, "cursor": None
+    }
+    query.update(params)
+    response = await emergency.get_emergency_alerts(db=db, **query)
+    return [row["alert_id"] for row in json.loads(response.body)], response.headers.get("X-Next-Cursor")
+
+
+class TestAlertListing:
+    """Test radius filtering and cursor continuation against SQLite."""
+
+    @pytest_asyncio.fixture
+    async def db(self, tmp_path):
+        """Async session on a fresh SQLite database."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'alerts.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            yield session
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_each_alert_uses_its_own_radius(self, db):
+        """Test alerts match within their own radius, or the query radius when they have none."""
+        db.add_all([
+            alert(1, NEAR_LATITUDE, radius=100),
+            alert(2, NEAR_LATITUDE, radius=10),
+            alert(3, NEAR_LATITUDE),
+            alert(4, 30.0, radius=1000),
+            alert(5, NEAR_LATITUDE, radius=100, status=AlertStatus.RESOLVED)
+        ])
+        await db.commit()
+
+        assert (await list_alerts(db, latitude=0.0, longitude=0.0))[0] == ["ALERT-1"]
+        assert sorted((await list_alerts(db, latitude=0.0, longitude=0.0, radius=60))[0]) == [
+            "ALERT-1", "ALERT-3"
+        ]
+        assert sorted((await list_alerts(db))[0]) == ["ALERT-1", "ALERT-2", "ALERT-3", "ALERT-4"]
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_cover_matches_once_in_order(self, db):
+        """Test cursor pages walk every match newest first across ties and scan chunks."""
+        issued = {}
+        for number in range(60):
+            # Two matching alerts per timestamp; every other alert is out of range,
+            # so a page of 7 matches needs more than one 14-row scan chunk
+            issued[number] = ISSUED - timedelta(minutes=number // 4)
+            db.add(alert(number, NEAR_LATITUDE if number % 2 else 20.0, radius=100, issued_at=issued[number]))
+        await db.commit()
+
+        # Newest first, ties broken by id (insertion order) descending
+        matches = sorted(range(1, 60, 2), key=lambda number: (issued[number], number), reverse=True)
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = await list_alerts(db, latitude=0.0, longitude=0.0, limit=7, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+        assert sum(pages, []) == [f"ALERT-{number}" for number in matches]
+
+        offset_page, _ = await list_alerts(db, latitude=0.0, longitude=0.0, limit=7, offset=7)
+        assert offset_page == pages[1]
+
+        with pytest.raises(HTTPException):
+            await list_alerts(db, cursor="not-a-cursor")
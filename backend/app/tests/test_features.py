@@ -0,0 +1,107 @@
+"""Tests for the shared training/serving feature pipeline."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.features import (
+    RISK_FEATURES, WEATHER_FEATURES, prepare_climate_frame, risk_features, weather_features
+)
+from app.ml.models.risk_analyzer import RiskAnalyzer
+from app.ml.models.weather_predictor import WeatherPredictor
+from app.models.climate import ClimateData
+
+
+class TestFeaturePipeline:
+    """Test that every input shape yields the same feature matrices."""
+
+    @pytest.fixture
+    def readings(self):
+        """Unsaved readings with gaps, zeros and mixed naive/aware timestamps."""
+        start = datetime(2024, 12, 31, 21, 0)
+        readings = []
+        for i in range(6):
+            values = {name: float(i * 3 + offset) for offset, name in enumerate(WEATHER_FEATURES)}
+            values["pm10"] = None if i % 2 else 4.0
+            if i == 2:
+                values["pressure"] = None
+                values["visibility"] = 0.0
+            timestamp = start + timedelta(hours=i)
+            readings.append(ClimateData(
+                station_id=1,
+                timestamp=timestamp.replace(tzinfo=timezone.utc) if i % 3 else timestamp,
+                **values
+            ))
+        return readings
+
+    def test_rows_frame_and_struct_array_agree(self, readings):
+        """ORM rows, a DataFrame and a structured array featurize identically."""
+        frame = pd.DataFrame([
+            {name: getattr(reading, name) for name in ("timestamp", "pm10") + WEATHER_FEATURES}
+            for reading in readings
+        ])
+        records = frame.assign(timestamp=pd.to_datetime(frame["timestamp"], utc=True)).to_records(index=False)
+
+        expected = risk_features(readings)
+        assert expected.shape == (6, len(RISK_FEATURES))
+        np.testing.assert_allclose(risk_features(frame), expected)
+        np.testing.assert_allclose(risk_features(records), expected)
+        np.testing.assert_allclose(weather_features(records), weather_features(readings))
+
+        # A mapping of column arrays, with and without timestamps
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+        np.testing.assert_allclose(risk_features(columns), expected)
+        np.testing.assert_allclose(weather_features(columns), weather_features(readings))
+        without_time = {name: values for name, values in columns.items() if name != "timestamp"}
+        assert np.isnan(risk_features(without_time)[:, 10:]).all()
+        assert risk_features({}).shape == (0, len(RISK_FEATURES))
+
+        # Missing values take the defaults, measured zeros are kept
+        row = dict(zip(RISK_FEATURES, expected[2]))
+        assert row["pressure"] == 1013.25 and row["visibility"] == 0.0 and row["pm10"] == 4.0
+        assert expected[1, RISK_FEATURES.index("pm10")] == 0.0
+        # 2025-01-01 00:00 UTC rolls over to hour 0 of day 1
+        assert tuple(expected[3, 10:12]) == (0.0, 1.0)
+        np.testing.assert_allclose(expected[3, 12:], [0.0, 1.0, np.sin(2 * np.pi / 365)], atol=1e-12)
+
+    def test_training_uses_serving_features(self, readings, tmp_path):
+        """The risk model trains on exactly the matrix the service predicts from."""
+        frame = pd.DataFrame([
+            {column.name: getattr(reading, column.name) for column in ClimateData.__table__.columns}
+            for reading in readings
+        ])
+        prepared = prepare_climate_frame(frame.assign(timestamp=frame["timestamp"].astype(object)))
+        training = RiskAnalyzer(model_path=str(tmp_path)).prepare_features(prepared)
+
+        assert list(training.columns) == list(RISK_FEATURES)
+        np.testing.assert_allclose(training.to_numpy(), risk_features(readings))
+        assert np.isnan(risk_features([ClimateData(station_id=1, timestamp=None)])[0, 10:]).all()
+
+    def test_training_windows_stay_within_stations(self, tmp_path):
+        """Windows are cut per station and the lazy dataset matches the eager windows."""
+        predictor = WeatherPredictor(model_path=str(tmp_path))
+        length = predictor.sequence_length
+        start = datetime(2024, 1, 1)
+        frame = pd.DataFrame([
+            {"station_id": station, "timestamp": start + timedelta(hours=hour), "temperature": station * 100.0 + hour}
+            for station, hours in ((1, length + 6), (2, length + 2), (3, length - 1))
+            for hour in range(hours)
+        ]).sample(frac=1, random_state=0)
+
+        features, starts, scaler = predictor.prepare_data(frame)
+        stations = np.repeat([1, 2, 3], [length + 6, length + 2, length - 1])
+        assert len(starts) == 6 + 2
+        X, y = predictor._create_sequences(features, stations)
+        np.testing.assert_array_equal(X[7], features[length + 7:2 * length + 7])
+        np.testing.assert_array_equal(y[7], features[2 * length + 7])
+
+        # Temperatures encode the station, so a crossing window would mix hundreds
+        rows = np.concatenate([X, y[:, np.newaxis]], axis=1).reshape(-1, len(WEATHER_FEATURES))
+        temperatures = np.round(scaler.inverse_transform(rows)[:, 0]).reshape(len(starts), -1)
+        assert (np.ptp(temperatures // 100, axis=1) == 0).all()
+
+        batches = list(predictor._sequence_dataset(features, starts, batch_size=3).as_numpy_iterator())
+        np.testing.assert_array_equal(np.concatenate([windows for windows, _ in batches]), X)
+        np.testing.assert_array_equal(np.concatenate([targets for _, targets in batches]), y)
@@ -0,0 +1,77 @@
+"""Tests for the forecast response cache."""
+
+import asyncio
+
+import pytest
+
+from app.services.forecast_cache import ForecastCache
+
+
+class TestForecastCache:
+    """Test keying, expiry, eviction and request coalescing."""
+
+    def test_nearby_locations_share_a_key(self):
+        """Test keys are quantized to cells and include horizon and model version."""
+        cache = ForecastCache(cell_size_deg=0.05)
+
+        key = cache.make_key(40.7128, -74.0060, 24, "v1.0")
+
+        assert cache.make_key(40.7130, -74.0062, 24, "v1.0") == key
+        assert cache.make_key(40.9128, -74.0060, 24, "v1.0") != key
+        assert cache.make_key(40.7128, -74.0060, 48, "v1.0") != key
+        assert cache.make_key(40.7128, -74.0060, 24, "v2.0") != key
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_computation(self):
+        """Test single-flight coalescing of concurrent misses."""
+        cache = ForecastCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"forecast": calls}
+
+        results = await asyncio.gather(*[
+            cache.get_or_compute("key", compute) for _ in range(20)
+        ])
+
+        assert calls == 1
+        assert all(result == {"forecast": 1} for result in results)
+        assert await cache.get_or_compute("key", compute) == {"forecast": 1}
+        assert cache.get_stats()["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """Test a failed computation is retried on the next request."""
+        cache = ForecastCache()
+
+        async def fail():
+            raise RuntimeError("model unavailable")
+
+        async def succeed():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("key", fail)
+        assert await cache.get_or_compute("key", succeed) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_lru_bounds(self):
+        """Test expired and least recently used entries are evicted."""
+        cache = ForecastCache(ttl_seconds=0.05, max_entries=2)
+
+        async def value(result):
+            return result
+
+        await cache.get_or_compute("a", lambda: value(1))
+        await cache.get_or_compute("b", lambda: value(2))
+        await cache.get_or_compute("a", lambda: value(None))
+        await cache.get_or_compute("c", lambda: value(3))
+
+        assert await cache.get_or_compute("a", lambda: value("fresh")) == 1
+        assert await cache.get_or_compute("b", lambda: value("fresh")) == "fresh"
+
+        await asyncio.sleep(0.06)
+        assert await cache.get_or_compute("a", lambda: value("expired")) == "expired"
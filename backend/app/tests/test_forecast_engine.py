@@ -0,0 +1,81 @@
+"""Tests for the batched forecasting engine."""
+
+import numpy as np
+import pytest
+
+from app.ml.runtime import NumpyModel
+from app.services.forecast_engine import BatchForecastEngine, WindowRingBuffer
+
+SEQUENCE_LENGTH = 5
+N_FEATURES = 3
+
+
+def lstm_model(rng: np.random.Generator) -> NumpyModel:
+    """LSTM predicting one step of every feature, so windows can be rolled forward."""
+    units = N_FEATURES
+    return NumpyModel([
+        {
+            "type": "lstm",
+            "activation": "tanh",
+            "recurrent_activation": "sigmoid",
+            "return_sequences": False,
+            "kernel": rng.normal(size=(N_FEATURES, 4 * units)),
+            "recurrent_kernel": rng.normal(size=(units, 4 * units)),
+            "bias": rng.normal(size=4 * units)
+        },
+        {"type": "dense", "activation": "linear", "kernel": 3 * np.eye(units), "bias": np.zeros(units)}
+    ])
+
+
+class TestWindowRingBuffer:
+    """Test the ring buffer matches a shifted window."""
+
+    def test_window_follows_pushed_steps(self):
+        """Test the window stays the last steps in order through several wraps."""
+        rng = np.random.default_rng(0)
+        expected = rng.normal(size=(2, SEQUENCE_LENGTH, N_FEATURES)).astype(np.float32)
+        ring = WindowRingBuffer(expected)
+
+        for _ in range(2 * SEQUENCE_LENGTH + 2):
+            step = rng.normal(size=(2, N_FEATURES)).astype(np.float32)
+            ring.push(step)
+            expected = np.concatenate([expected[:, 1:], step[:, np.newaxis]], axis=1)
+            window = ring.window()
+
+            # A view into the buffer, never a copy
+            assert np.shares_memory(window, ring.buffer)
+            np.testing.assert_array_equal(window, expected)
+
+
+class TestBatchForecastEngine:
+    """Test batched rollouts against stepping each window on its own."""
+
+    @pytest.fixture
+    def model(self):
+        """Small seeded NumPy runtime model."""
+        return lstm_model(np.random.default_rng(1))
+
+    def test_batch_rollout_matches_single_rollouts(self, model):
+        """Test every row of a batched rollout equals the naive per-window rollout."""
+        windows = np.random.default_rng(2).normal(size=(4, SEQUENCE_LENGTH, N_FEATURES)).astype(np.float32)
+        engine = BatchForecastEngine(model, SEQUENCE_LENGTH, N_FEATURES)
+
+        forecast = engine.forecast(windows, 7)
+
+        assert forecast.shape == (4, 7, N_FEATURES)
+        for row, window in enumerate(windows):
+            window = window[np.newaxis]
+            for hour in range(7):
+                step = model.predict(window)
+                np.testing.assert_allclose(forecast[row, hour], step[0], rtol=1e-5, atol=1e-6)
+                window = np.concatenate([window[:, 1:], step[:, np.newaxis]], axis=1)
+
+        # A single window is treated as a batch of one
+        np.testing.assert_allclose(engine.forecast(windows[0], 7), forecast[:1], rtol=1e-5, atol=1e-6)
+
+    def test_rejects_mismatched_windows(self, model):
+        """Test windows of the wrong shape are rejected."""
+        engine = BatchForecastEngine(model, SEQUENCE_LENGTH, N_FEATURES)
+
+        with pytest.raises(ValueError):
+            engine.forecast(np.zeros((1, SEQUENCE_LENGTH + 1, N_FEATURES)), 2)
@@ -0,0 +1,72 @@
+"""Tests for the grid-bucketed geospatial index."""
+
+import numpy as np
+import pytest
+
+from app.utils.geo_index import GeoGridIndex, haversine_km
+
+
+class TestGeoGridIndex:
+    """Test radius and nearest-neighbour queries against brute force."""
+
+    @pytest.fixture
+    def points(self):
+        """Random points, clustered around the antimeridian for wrap coverage."""
+        rng = np.random.default_rng(42)
+        latitudes = rng.uniform(-85, 85, 2000)
+        longitudes = rng.uniform(-180, 180, 2000)
+        longitudes[:300] = rng.choice([-179.8, 179.8], 300)
+        return latitudes, longitudes
+
+    @pytest.fixture
+    def index(self, points):
+        """Index populated with the random points."""
+        index = GeoGridIndex(cell_size_deg=0.5)
+        for key, (latitude, longitude) in enumerate(zip(*points)):
+            index.upsert(key, latitude, longitude)
+        return index
+
+    def test_haversine_known_distance(self):
+        """Test haversine against a known city-pair distance."""
+        distance = haversine_km(40.7128, -74.0060, np.array([34.0522]), np.array([-118.2437]))
+        assert distance[0] == pytest.approx(3936, rel=0.01)
+
+    @pytest.mark.parametrize("radius_km", [10, 100, 1000])
+    def test_query_radius_matches_brute_force(self, index, points, radius_km):
+        """Test radius queries return exactly the points within the radius."""
+        latitudes, longitudes = points
+        for latitude, longitude in [(0, 0), (45, 179.9), (-60, -179.9), (10, 20)]:
+            distances = haversine_km(latitude, longitude, latitudes, longitudes)
+            expected = set(np.flatnonzero(distances <= radius_km).tolist())
+
+            results = index.query_radius(latitude, longitude, radius_km)
+
+            assert {key for key, _ in results} == expected
+            assert [d for _, d in results] == sorted(d for _, d in results)
+
+    def test_nearest(self, index, points):
+        """Test nearest-k returns the k closest points."""
+        latitudes, longitudes = points
+        distances = haversine_km(12.0, 34.0, latitudes, longitudes)
+
+        results = index.nearest(12.0, 34.0, k=5)
+
+        assert [d for _, d in results] == pytest.approx(np.sort(distances)[:5].tolist())
+
+    def test_nearest_respects_max_radius(self, index):
+        """Test nearest-k never returns points beyond the radius cap."""
+        results = index.nearest(0.0, 0.0, k=50, max_radius_km=200)
+        assert all(distance <= 200 for _, distance in results)
+
+    def test_upsert_moves_and_remove(self):
+        """Test moving and removing points keeps the index consistent."""
+        index = GeoGridIndex()
+        index.upsert("a", 10.0, 10.0)
+        index.upsert("b", 10.1, 10.1)
+        index.upsert("a", -10.0, -10.0)
+
+        assert [key for key, _ in index.query_radius(10.0, 10.0, 50)] == ["b"]
+        assert index.remove("b") is True
+        assert index.remove("b") is False
+        assert len(index) == 1
+        assert [key for key, _ in index.nearest(0.0, 0.0)] == ["a"]
@@ -0,0 +1,63 @@
+"""Tests for the NumPy inference runtime."""
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from app.ml.artifacts import RISK_RUNTIME_FILE, WEATHER_RUNTIME_FILE
+from app.ml.models.risk_analyzer import RiskAnalyzer
+from app.ml.models.weather_predictor import WeatherPredictor
+from app.ml.runtime import NumpyModel
+from app.services.forecast_engine import BatchForecastEngine
+
+
+def randomize_batch_norm(model: tf.keras.Model, rng: np.random.Generator):
+    """Give BatchNormalization layers non-trivial statistics, as after training."""
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.BatchNormalization):
+            gamma, beta, mean, variance = layer.get_weights()
+            layer.set_weights([
+                rng.uniform(0.5, 1.5, gamma.shape), rng.normal(0, 0.1, beta.shape),
+                rng.normal(0, 0.5, mean.shape), rng.uniform(0.5, 2.0, variance.shape)
+            ])
+
+
+class TestNumpyRuntime:
+    """Test that exported models match Keras inference."""
+
+    @pytest.fixture
+    def rng(self):
+        """Seeded random generator."""
+        tf.keras.utils.set_random_seed(7)
+        return np.random.default_rng(7)
+
+    def test_weather_model_parity(self, rng, tmp_path):
+        """The exported LSTM stack matches Keras for direct calls and forecast rollouts."""
+        predictor = WeatherPredictor(model_path=str(tmp_path))
+        predictor.model = predictor.build_model((predictor.sequence_length, len(predictor.feature_columns)))
+        randomize_batch_norm(predictor.model, rng)
+        runtime = NumpyModel.load(predictor.export_runtime())
+
+        windows = rng.normal(size=(16, predictor.sequence_length, len(predictor.feature_columns))).astype(np.float32)
+        expected = predictor.model(windows, training=False).numpy()
+        np.testing.assert_allclose(runtime.predict(windows), expected, rtol=1e-4, atol=1e-5)
+
+        keras_forecast = BatchForecastEngine(predictor.model).forecast(windows, 6)
+        numpy_forecast = BatchForecastEngine(runtime).forecast(windows, 6)
+        np.testing.assert_allclose(numpy_forecast, keras_forecast, rtol=1e-4, atol=1e-4)
+        assert (tmp_path / WEATHER_RUNTIME_FILE).exists()
+
+    def test_risk_model_parity(self, rng, tmp_path):
+        """The exported dense network matches Keras, including batch normalization."""
+        analyzer = RiskAnalyzer(model_path=str(tmp_path))
+        analyzer.model = analyzer.build_model(len(analyzer.feature_columns))
+        randomize_batch_norm(analyzer.model, rng)
+        analyzer.save_model()
+        runtime = NumpyModel.load(str(tmp_path / RISK_RUNTIME_FILE))
+
+        features = rng.normal(size=(256, len(analyzer.feature_columns))).astype(np.float32)
+        expected = analyzer.model.predict(features, verbose=0)
+        np.testing.assert_allclose(runtime.predict(features, batch_size=256, verbose=0), expected, atol=1e-5)
+
+        with pytest.raises(ValueError):
+            NumpyModel.from_keras(tf.keras.Sequential([tf.keras.layers.Conv1D(2, 3, input_shape=(8, 1))]))
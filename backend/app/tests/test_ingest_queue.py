@@ -0,0 +1,85 @@
+"""Tests for the bounded ingest queue."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.ingest_queue import BoundedIngestQueue
+
+
+class TestBoundedIngestQueue:
+    """Test thread handoff, batching and overflow policies."""
+
+    @pytest.mark.asyncio
+    async def test_thread_producer_is_written_in_batches(self):
+        """Test items from a foreign thread all arrive, in bounded batches."""
+        batches = []
+
+        async def write_batch(batch):
+            batches.append(list(batch))
+            await asyncio.sleep(0.001)
+            return {"records_processed": len(batch), "errors": []}
+
+        queue = BoundedIngestQueue(
+            write_batch, max_size=50, batch_size=20, flush_interval_ms=10,
+            overflow_policy="block", block_timeout_seconds=5
+        )
+        queue.start()
+
+        producer = threading.Thread(
+            target=lambda: [queue.submit_threadsafe(i) for i in range(500)]
+        )
+        producer.start()
+        await asyncio.get_running_loop().run_in_executor(None, producer.join)
+        await queue.stop()
+
+        assert sorted(item for batch in batches for item in batch) == list(range(500))
+        assert max(len(batch) for batch in batches) <= 20
+        assert len(batches) < 500
+        stats = queue.get_stats()
+        assert stats["dropped"] == 0
+        assert stats["records_written"] == 500
+        assert stats["high_watermark"] <= 50
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy, kept", [
+        ("drop_newest", [0, 1, 2]),
+        ("drop_oldest", [7, 8, 9]),
+    ])
+    async def test_drop_policies(self, policy, kept):
+        """Test a full queue drops the newest or the oldest items."""
+        written = []
+        release = asyncio.Event()
+
+        async def write_batch(batch):
+            await release.wait()
+            written.extend(batch)
+            return {"records_processed": len(batch), "errors": []}
+
+        queue = BoundedIngestQueue(
+            write_batch, max_size=3, batch_size=100, flush_interval_ms=0,
+            overflow_policy=policy
+        )
+        queue.start()
+
+        # Let the consumer take one item and stall in write_batch
+        queue.submit_threadsafe("stalled")
+        await asyncio.sleep(0.01)
+        for i in range(10):
+            queue.submit_threadsafe(i)
+
+        assert queue.get_stats()["depth"] == 3
+        assert queue.get_stats()["dropped"] == 7
+
+        release.set()
+        await queue.stop()
+        assert written == ["stalled"] + kept
+
+    def test_rejects_unknown_policy(self):
+        """Test an unknown overflow policy is rejected."""
+        async def write_batch(batch):
+            return {}
+
+        with pytest.raises(ValueError):
+            BoundedIngestQueue(write_batch, overflow_policy="spill")
@@ -0,0 +1,86 @@
+"""Tests for sharded IoT connector workers."""
+
+import json
+from types import SimpleNamespace
+
+import paho.mqtt.client as mqtt
+
+from app.utils.iot_connector import sensor_shard
+from app.utils.iot_coordinator import IoTConnectorPool
+
+
+class FakeBroker:
+    """In-process broker delivering to subscribed connectors.
+
+    Shared subscriptions (``$share/<group>/<filter>``) deliver each message
+    to one member of the group, round robin; plain subscriptions deliver to
+    every subscriber.
+    """
+
+    def __init__(self, workers):
+        self.subscriptions = [
+            (worker, topic) for worker in workers for topic, _ in worker._subscription_topics()
+        ]
+        self.next_member = {}
+
+    def publish(self, topic, payload):
+        shared = {}
+        for worker, subscription in self.subscriptions:
+            if subscription.startswith("$share/"):
+                _, group, topic_filter = subscription.split("/", 2)
+                if mqtt.topic_matches_sub(topic_filter, topic):
+                    shared.setdefault((group, topic_filter), []).append(worker)
+            elif mqtt.topic_matches_sub(subscription, topic):
+                worker._on_message(None, None, SimpleNamespace(topic=topic, payload=payload))
+
+        for key, members in shared.items():
+            index = self.next_member.get(key, 0)
+            self.next_member[key] = index + 1
+            member = members[index % len(members)]
+            member._on_message(None, None, SimpleNamespace(topic=topic, payload=payload))
+
+
+class TestIoTConnectorPool:
+    """Test shared-subscription and hash sharding with an in-process broker."""
+
+    def _publish_readings(self, pool, sensors, rounds):
+        """Publish ``rounds`` readings per sensor and capture what each worker queues."""
+        queued = {index: [] for index in range(pool.shard_count)}
+        for index, worker in enumerate(pool.workers):
+            worker.ingest_queue.submit_threadsafe = lambda item, index=index: queued[index].append(item) or True
+
+        broker = FakeBroker(pool.workers)
+        payload = json.dumps({"timestamp": "2024-01-01T00:00:00", "temperature": 20}).encode()
+        for _ in range(rounds):
+            for sensor_id in sensors:
+                broker.publish(f"climate_guardian/sensors/{sensor_id}/data", payload)
+        return queued
+
+    def test_shared_subscription_spreads_messages(self):
+        """Test each message reaches exactly one worker of the share group."""
+        pool = IoTConnectorPool(shard_count=3, sharding_mode="shared")
+        sensors = [f"sensor-{i}" for i in range(10)]
+
+        queued = self._publish_readings(pool, sensors, rounds=3)
+        status = pool.get_connection_status()
+
+        assert [len(items) for items in queued.values()] == [10, 10, 10]
+        assert status["registered_sensors"] == 10
+        assert status["shard_count"] == 3
+        assert len(pool.get_sensor_registry()) == 10
+        assert [topic for topic, _ in pool.workers[1]._subscription_topics()] == [
+            "$share/climate_guardian_ingest/climate_guardian/sensors/+/data",
+            "$share/climate_guardian_ingest/climate_guardian/sensors/+/status"
+        ]
+
+    def test_hash_sharding_pins_sensors_to_one_worker(self):
+        """Test hash mode keeps every reading of a sensor on its own shard."""
+        pool = IoTConnectorPool(shard_count=4, sharding_mode="hash")
+        sensors = [f"sensor-{i}" for i in range(20)]
+
+        queued = self._publish_readings(pool, sensors, rounds=2)
+
+        assert sum(len(items) for items in queued.values()) == 40
+        for index, items in queued.items():
+            assert all(sensor_shard(item["sensor_id"], 4) == index for item in items)
+        assert pool.get_connection_status()["registered_sensors"] == 20
@@ -0,0 +1,129 @@
+"""Tests for the process-wide model registry."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.ml.artifacts import RISK_MODEL_FILE, RISK_SCALER_FILE, WEATHER_MODEL_FILE, ModelArtifactStore
+from app.ml.features import RISK_FEATURES
+from app.models.climate import ClimateData
+from app.services.ai_prediction import PredictionService
+from app.services.model_registry import ModelBundle, ModelRegistry
+
+
+class FakeRiskModel:
+    """Risk model returning a constant score per row."""
+
+    def __init__(self, score: float):
+        """Initialize fake risk model."""
+        self.score = score
+        self.calls = 0
+
+    def predict(self, features, batch_size=None, verbose=0):
+        """Constant predictions for every row."""
+        self.calls += 1
+        return np.full((len(features), 6), self.score)
+
+
+class TestModelRegistry:
+    """Test lazy loading, warm-up and version swaps."""
+
+    @pytest.fixture
+    def loads(self):
+        """Versions requested from the loader, in order."""
+        return []
+
+    @pytest.fixture
+    def registry(self, loads):
+        """Registry whose loader builds fake bundles and counts loads."""
+        lock = threading.Lock()
+
+        def loader(version):
+            with lock:
+                loads.append(version)
+            score = 0.2 if version is None else 0.8
+            return ModelBundle(version or "v1.0", None, FakeRiskModel(score))
+
+        return ModelRegistry(model_path="/nonexistent", loader=loader)
+
+    def test_loads_once_on_first_use(self, registry, loads):
+        """Nothing loads at construction; concurrent first use loads exactly once."""
+        assert not registry.is_loaded
+        assert registry.version == "v1.0"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            bundles = list(pool.map(lambda _: registry.get(), range(32)))
+
+        assert loads == [None]
+        assert all(bundle is bundles[0] for bundle in bundles)
+
+        registry.warm_up()
+        assert bundles[0].warmed_up and bundles[0].risk_model.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_swap_is_atomic_and_versioned(self, registry, loads):
+        """Predictions use one bundle per call and report the version that served them."""
+        service = PredictionService(registry)
+        readings = [ClimateData(id=1, station_id=1, timestamp=datetime(2024, 7, 1, 12), temperature=30.0)]
+
+        before = registry.get()
+        first = await service.generate_risk_assessments(readings)
+        activated = registry.activate("v2")
+        second = await service.generate_risk_assessments(readings)
+
+        assert loads == [None, "v2"]
+        assert activated.warmed_up and registry.get() is activated
+        assert service.model_version == "v2"
+        assert (first[0].model_version, first[0].flood_risk) == ("v1.0", pytest.approx(0.2))
+        assert (second[0].model_version, second[0].flood_risk) == ("v2", pytest.approx(0.8))
+        assert before.version == "v1.0"
+
+    def test_publishes_and_hot_swaps_store_versions(self, tmp_path):
+        """A newly activated version is picked up by polling; retrained-only parts are inherited."""
+        store = ModelArtifactStore(str(tmp_path))
+        registry = ModelRegistry(model_path=str(tmp_path), runtime="keras")
+        registry.load_keras_model = lambda path: FakeRiskModel(0.5) if path.endswith(RISK_MODEL_FILE) else None
+
+        first = store.new_version()
+        (tmp_path / first / RISK_MODEL_FILE).write_bytes(b"model")
+        joblib.dump(StandardScaler().fit(np.eye(len(RISK_FEATURES))), tmp_path / first / RISK_SCALER_FILE)
+        store.publish(first, metrics={"risk": {"val_auc": np.float32(0.75)}})
+
+        served = registry.get()
+        assert registry.check_for_update() is None
+        assert served.version == first and served.risk_scaler.n_features_in_ == len(RISK_FEATURES)
+        assert served.manifest["components"]["risk"]["metrics"] == {"val_auc": 0.75}
+
+        # A weather-only retrain carries the active risk model over
+        second = store.new_version()
+        (tmp_path / second / WEATHER_MODEL_FILE).write_bytes(b"model")
+        assert registry.version == first
+        manifest = store.publish(second)
+
+        assert manifest["components"]["risk"]["inherited_from"] == first
+        assert (tmp_path / second / RISK_SCALER_FILE).exists()
+        swapped = registry.check_for_update()
+        assert swapped is registry.get() and swapped.version == second
+        assert served.version == first and served.risk_model is not swapped.risk_model
+        with pytest.raises(ValueError):
+            store.activate("v0")
+
+    def test_swaps_evict_keras_models_of_older_versions(self, tmp_path):
+        """Only models of the active and previous versions stay cached."""
+        registry = ModelRegistry(model_path=str(tmp_path), loader=lambda version: None)
+
+        def install(version):
+            # Loading a version caches its models before the swap
+            registry._keras_cache[str(tmp_path / version / RISK_MODEL_FILE)] = (0.0, FakeRiskModel(0.5))
+            registry.install(ModelBundle(version, None, None, source=str(tmp_path / version)))
+            return sorted(path.split("/")[-2] for path in registry._keras_cache)
+
+        registry._keras_cache[str(tmp_path / RISK_MODEL_FILE)] = (0.0, FakeRiskModel(0.5))
+        assert install("v1") == ["v1"]
+        assert install("v2") == ["v1", "v2"]
+        assert install("v3") == ["v2", "v3"]
@@ -0,0 +1,77 @@
+"""Tests for the concurrent notification fan-out."""
+
+import pytest
+
+from app.services.notification_pipeline import NotificationChannel, NotificationPipeline
+
+
+class TestNotificationPipeline:
+    """Test batching, retries and result aggregation."""
+
+    @pytest.mark.asyncio
+    async def test_batches_and_aggregates_per_channel(self):
+        """Test bulk channels get batch-sized requests and single sends get one call each."""
+        batches = []
+        singles = []
+
+        async def send_batch(recipients, alert):
+            batches.append(list(recipients))
+            return [True] * len(recipients)
+
+        async def send(recipient, alert):
+            singles.append(recipient)
+            return True
+
+        pipeline = NotificationPipeline([
+            NotificationChannel("push", send, rate_per_second=1000, send_batch=send_batch, batch_size=3),
+            NotificationChannel("sms", send, rate_per_second=1000)
+        ])
+        report = await pipeline.dispatch(
+            {"push": list(range(7)), "sms": ["a", "b"], "fax": ["c"]}, alert="alert"
+        )
+
+        assert sorted(len(batch) for batch in batches) == [1, 3, 3]
+        assert sorted(sum(batches, [])) == list(range(7))
+        assert sorted(singles) == ["a", "b"]
+        assert report["notifications_sent"] == 9
+        assert report["channels"] == {"push": {"sent": 7, "failed": 0}, "sms": {"sent": 2, "failed": 0}}
+        assert sorted(report["channels_used"]) == ["push", "sms"]
+        assert report["errors"] == ["Unknown notification channel: fax"]
+
+    @pytest.mark.asyncio
+    async def test_retries_only_failed_recipients(self):
+        """Test partial failures are retried and recipients that keep failing are reported."""
+        calls = []
+
+        async def send_batch(recipients, alert):
+            calls.append(list(recipients))
+            if len(calls) == 1:
+                # Provider answered for the first two recipients only
+                return [True, False]
+            return [recipient != 3 for recipient in recipients]
+
+        channel = NotificationChannel(
+            "email", None, rate_per_second=1000, send_batch=send_batch,
+            batch_size=5, max_attempts=3, backoff_seconds=0
+        )
+        report = await NotificationPipeline([channel]).dispatch({"email": [0, 1, 2, 3, 4]}, alert=None)
+
+        assert calls == [[0, 1, 2, 3, 4], [1, 2, 3, 4], [3]]
+        assert report["channels"]["email"] == {"sent": 4, "failed": 1}
+        assert len(report["errors"]) == 1 and "user 3" in report["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_exceptions_fail_the_whole_attempt(self):
+        """Test a raising provider is retried and its error is reported."""
+        attempts = []
+
+        async def send(recipient, alert):
+            attempts.append(recipient)
+            raise ConnectionError("provider down")
+
+        channel = NotificationChannel("sms", send, rate_per_second=1000, max_attempts=2, backoff_seconds=0)
+        report = await NotificationPipeline([channel]).dispatch({"sms": ["a"]}, alert=None)
+
+        assert attempts == ["a", "a"]
+        assert report["notifications_sent"] == 0 and report["channels_used"] == []
+        assert report["errors"] == ["Error sending sms notification to user a: provider down"]
@@ -0,0 +1,39 @@
+"""Tests for the async token bucket."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.rate_limiter import TokenBucket
+
+
+class TestTokenBucket:
+    """Test burst capacity and pacing."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        """Test a full bucket serves its capacity at once and then paces at the rate."""
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.05
+
+        started = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(10)])
+        elapsed = time.monotonic() - started
+        # Ten more tokens at 50 per second
+        assert 0.18 <= elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_requests(self):
+        """Test rates and acquisitions that could never succeed are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+        bucket = TokenBucket(rate=2)
+        assert bucket.capacity == 2
+        with pytest.raises(ValueError):
+            await bucket.acquire(3)
@@ -0,0 +1,114 @@
+"""Tests for micro-batched risk assessment."""
+
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.climate import ClimateData
+from app.services.ai_prediction import PredictionService
+from app.services.model_registry import ModelBundle, ModelRegistry
+from app.services.risk_batcher import RiskAssessmentBatcher
+
+
+class RecordingRiskModel:
+    """Risk model recording batch sizes; optionally failing."""
+
+    def __init__(self, fail: bool = False):
+        """Initialize recording risk model."""
+        self.fail = fail
+        self.batch_sizes = []
+
+    def predict(self, features, batch_size=None, verbose=0):
+        """Constant predictions, one row per input row."""
+        self.batch_sizes.append(len(features))
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return np.full((len(features), 6), 0.5)
+
+
+def reading(reading_id: int, timestamp=datetime(2024, 7, 1, 12)) -> ClimateData:
+    """Climate reading with a hot temperature."""
+    return ClimateData(id=reading_id, station_id=1, timestamp=timestamp, temperature=40.0)
+
+
+class TestRiskAssessmentBatcher:
+    """Test flush triggers and rule-based fallback."""
+
+    def service(self, model: RecordingRiskModel) -> PredictionService:
+        """Prediction service serving ``model`` as version v1."""
+        return PredictionService(
+            ModelRegistry(model_path="/nonexistent", loader=lambda version: ModelBundle("v1", None, model))
+        )
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        """Test reaching the batch size scores at once, with each caller getting its own row."""
+        model = RecordingRiskModel()
+        batcher = RiskAssessmentBatcher(self.service(model), max_batch_size=3, max_wait_ms=60000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*[batcher.submit(reading(reading_id)) for reading_id in (1, 2, 3)]), 1
+        )
+
+        assert model.batch_sizes == [3]
+        assert [result.climate_data_id for result in results] == [1, 2, 3]
+        assert all(result.model_version == "v1" for result in results)
+        assert batcher.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushes_after_max_wait(self):
+        """Test a partial batch is scored once the wait elapses, or on an explicit flush."""
+        model = RecordingRiskModel()
+        batcher = RiskAssessmentBatcher(self.service(model), max_batch_size=100, max_wait_ms=5)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(reading(1)), batcher.submit(reading(2))), 1
+        )
+        assert model.batch_sizes == [2]
+        assert [result.climate_data_id for result in results] == [1, 2]
+
+        batcher.max_wait = 60
+        pending = asyncio.ensure_future(batcher.submit(reading(3)))
+        await asyncio.sleep(0)
+        assert batcher.get_stats()["pending"] == 1
+        await batcher.flush()
+        assert (await pending).climate_data_id == 3
+        assert model.batch_sizes == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_rules(self):
+        """Test rows without features, and whole batches the model fails, get rule-based scores."""
+        model = RecordingRiskModel()
+        batcher = RiskAssessmentBatcher(self.service(model), max_batch_size=2, max_wait_ms=60000)
+
+        scored, unscored = await asyncio.gather(
+            batcher.submit(reading(1)), batcher.submit(reading(2, timestamp=None))
+        )
+        assert model.batch_sizes == [1]
+        assert scored.model_version == "v1"
+        assert unscored.model_version == "rule_based_v1.0"
+        assert unscored.heat_wave_risk == pytest.approx(0.5)
+
+        model.fail = True
+        results = await asyncio.gather(batcher.submit(reading(3)), batcher.submit(reading(4)))
+        assert [result.model_version for result in results] == ["rule_based_v1.0"] * 2
+        assert [result.climate_data_id for result in results] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failing prediction service fails every caller of the batch."""
+        class FailingService:
+            """Prediction service that cannot reach its models."""
+
+            async def generate_risk_assessments(self, climate_data_batch):
+                """Fail the whole batch."""
+                raise ConnectionError("registry down")
+
+        batcher = RiskAssessmentBatcher(FailingService(), max_batch_size=2, max_wait_ms=60000)
+        results = await asyncio.gather(
+            batcher.submit(reading(1)), batcher.submit(reading(2)), return_exceptions=True
+        )
+
+        assert [type(result) for result in results] == [ConnectionError, ConnectionError]
@@ -0,0 +1,58 @@
+"""Tests for MQTT sensor payload decoding and validation."""
+
+import pytest
+
+from app.utils.sensor_payload import (
+    SensorPayloadValidator, decode_binary, decode_payload, encode_binary
+)
+
+
+class TestSensorPayload:
+    """Test single-pass validation and the compact binary format."""
+
+    def test_validate_coerces_numbers_and_counts_rejections(self):
+        """Test valid payloads are coerced and invalid ones are counted."""
+        validator = SensorPayloadValidator()
+        payloads = [
+            {"timestamp": "2024-01-01T00:00:00Z", "temperature": "21.5", "latitude": 10},
+            {"timestamp": "not-a-time", "temperature": 20},
+            {"timestamp": "2024-01-01T00:00:00", "humidity": "wet"},
+            {"timestamp": "2024-01-01T00:00:00", "longitude": 200},
+            {"temperature": 20},
+            ["not", "an", "object"]
+        ]
+
+        results = validator.validate_batch(payloads)
+
+        assert results[0]["temperature"] == 21.5
+        assert results[0]["latitude"] == 10.0
+        assert results[1:] == [None] * 5
+        assert validator.rejected == {
+            "invalid_timestamp": 1,
+            "invalid_number": 1,
+            "invalid_longitude": 1,
+            "missing_timestamp": 1,
+            "not_an_object": 1
+        }
+
+    def test_binary_round_trip(self):
+        """Test binary payloads decode to the same fields as JSON payloads."""
+        reading = {
+            "timestamp": "2024-06-01T12:00:00+00:00",
+            "temperature": 21.5,
+            "pm25": 12.25,
+            "latitude": 40.5,
+            "longitude": -74.25
+        }
+
+        payload = encode_binary(reading)
+        decoded = decode_payload(payload)
+
+        assert len(payload) == 8 + 4 * 4
+        assert decoded == reading
+        assert SensorPayloadValidator().validate(decoded) == reading
+        assert decode_payload(b'{"timestamp": "2024-06-01T12:00:00"}') == {
+            "timestamp": "2024-06-01T12:00:00"
+        }
+        with pytest.raises(ValueError):
+            decode_binary(payload[:-1])
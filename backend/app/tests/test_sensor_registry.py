@@ -0,0 +1,55 @@
+"""Tests for the columnar IoT sensor registry."""
+
+import pytest
+
+from app.utils.sensor_registry import SensorRegistry
+
+
+class TestSensorRegistry:
+    """Test ring-buffer history, status tracking and stale eviction."""
+
+    def test_ring_buffer_keeps_latest_readings(self):
+        """Test only the last ``history_size`` readings are kept, oldest first."""
+        registry = SensorRegistry(history_size=3, initial_capacity=1)
+
+        for i in range(5):
+            registry.update("s1", {"temperature": i, "latitude": 1.5, "longitude": 2.5}, now=1000.0 + i)
+
+        readings = registry.recent_readings("s1")
+        info = registry.get("s1")
+
+        assert [reading["temperature"] for reading in readings] == [2.0, 3.0, 4.0]
+        assert info["message_count"] == 5
+        assert info["last_reading"] == {"temperature": 4.0}
+        assert info["latitude"] == pytest.approx(1.5)
+
+    def test_status_and_growth(self):
+        """Test statuses are tracked and storage grows past its initial capacity."""
+        registry = SensorRegistry(initial_capacity=2)
+
+        for i in range(10):
+            registry.update(f"s{i}", {"humidity": 50}, now=1000.0)
+        registry.update_status("s3", "maintenance", now=1001.0)
+
+        snapshot = registry.snapshot()
+        assert len(snapshot) == 10
+        assert snapshot["s3"]["status"] == "maintenance"
+        assert snapshot["s4"]["status"] == "unknown"
+
+    def test_stale_sensors_are_evicted_and_rows_reused(self):
+        """Test silent sensors are evicted and their rows reused."""
+        registry = SensorRegistry(stale_after_seconds=60, eviction_interval_seconds=3600)
+        registry.update("old", {"temperature": 1}, now=1000.0)
+        registry.update("live", {"temperature": 2}, now=1050.0)
+        memory = registry.memory_bytes
+
+        assert registry.evict_stale(now=1100.0) == 1
+        assert "old" not in registry
+        assert registry.get("old") is None
+
+        registry.update("new", {"pressure": 1010}, now=1100.0)
+        assert len(registry) == 2
+        assert registry.recent_readings("new")[0] == {
+            "timestamp": registry.get("new")["last_seen"], "pressure": 1010.0
+        }
+        assert registry.memory_bytes == memory
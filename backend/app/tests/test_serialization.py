@@ -0,0 +1,73 @@
+"""Tests for projected list responses and keyset pagination."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.emergency import EmergencyResponse
+from app.schemas.emergency import EmergencyResponseResponse
+from app.utils.pagination import keyset_after
+from app.utils.serialization import dumps, parse_json_list, response_columns, rows_response
+
+
+class TestProjectedResponses:
+    """Test that projected rows serialize like the pydantic response models."""
+
+    @pytest.fixture
+    def db(self):
+        """Session on a fresh in-memory SQLite database with tied creation times."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        session.add_all([
+            EmergencyResponse(
+                response_id=f"RESP-{i}",
+                alert_id="ALERT-1",
+                response_type="evacuation",
+                equipment_list='["boats", "radios"]' if i % 2 else "not json",
+                estimated_cost=1250.5 * i,
+                created_at=start + timedelta(hours=i // 3)
+            )
+            for i in range(10)
+        ])
+        session.commit()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def test_matches_response_model_json(self, db):
+        """The projected body equals pydantic's rendering of the ORM objects."""
+        columns = response_columns(EmergencyResponse, EmergencyResponseResponse)
+        order = (EmergencyResponse.id,)
+        rows = db.execute(select(*columns).order_by(*order)).all()
+        converters = {name: parse_json_list for name in ("equipment_list", "supporting_agencies", "status_updates")}
+
+        body = json.loads(rows_response(rows, converters=converters).body)
+        expected = [
+            EmergencyResponseResponse.model_validate(response).model_dump(mode="json")
+            for response in db.query(EmergencyResponse).order_by(*order)
+        ]
+        assert body == expected
+        assert dumps({"at": datetime(2024, 3, 1, tzinfo=timezone.utc)}) == b'{"at":"2024-03-01T00:00:00Z"}'
+
+    def test_keyset_pages_cover_every_row_once(self, db):
+        """Walking newest-first pages through ties returns each row exactly once."""
+        key = (EmergencyResponse.created_at, EmergencyResponse.id)
+        query = select(*key).order_by(EmergencyResponse.created_at.desc(), EmergencyResponse.id.desc())
+
+        seen, last = [], None
+        while True:
+            page_query = query if last is None else query.filter(keyset_after(key, last))
+            page = db.execute(page_query.limit(4)).all()
+            if not page:
+                break
+            seen.extend(row.id for row in page)
+            last = tuple(page[-1])
+
+        assert seen == list(range(10, 0, -1))
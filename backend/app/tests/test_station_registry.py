@@ -0,0 +1,109 @@
+"""Tests for the station registry cache and IoT station resolution."""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.climate import WeatherStation
+from app.services.data_ingestion import DataIngestionService
+from app.services.station_index import station_index
+from app.services.station_registry import station_registry
+
+
+class TestStationRegistry:
+    """Test commit-gated cache updates and batched station creation."""
+
+    @pytest.fixture
+    def db(self):
+        """Session on a fresh in-memory SQLite database with a warm registry."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        station_registry.rebuild(session)
+        station_index.rebuild(session)
+        yield session
+        session.close()
+        engine.dispose()
+
+    def test_changes_apply_on_commit_only(self, db):
+        """Test staged stations are cached on commit and discarded on rollback."""
+        db.add(WeatherStation(station_id="kept", name="Kept", latitude=1.0, longitude=1.0))
+        db.flush()
+        assert station_registry.get("kept") is None
+        db.commit()
+        assert station_registry.get("kept") is not None
+
+        db.add(WeatherStation(station_id="lost", name="Lost", latitude=1.0, longitude=1.0))
+        db.flush()
+        db.rollback()
+        assert station_registry.get("lost") is None
+
+    def test_resolve_creates_each_unseen_station_once(self, db):
+        """Test unseen sensors are created in bulk and then served from the cache."""
+        service = DataIngestionService()
+        batch = [
+            {"sensor_id": f"sensor-{i % 3}", "latitude": 10.0 + i % 3, "longitude": 20.0}
+            for i in range(9)
+        ]
+
+        first = service._resolve_iot_stations(batch, db)
+        db.commit()
+
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+        second = service._resolve_iot_stations(batch, db)
+
+        assert statements == []
+        assert first == second
+        assert len(first) == 3
+        assert db.query(WeatherStation).count() == 3
+
+    def test_geo_index_follows_committed_stations_only(self, db):
+        """Test stations created for a rolled-back batch never reach the geo index."""
+        service = DataIngestionService()
+
+        service._resolve_iot_stations([{"sensor_id": "lost", "latitude": 40.0, "longitude": -100.0}], db)
+        assert station_index.nearest(40.0, -100.0, radius_km=5) == []
+        db.rollback()
+        assert station_index.nearest(40.0, -100.0, radius_km=5) == []
+
+        kept = service._resolve_iot_stations([{"sensor_id": "kept", "latitude": 40.0, "longitude": -100.0}], db)
+        db.commit()
+        assert [pk for pk, _ in station_index.nearest(40.0, -100.0, radius_km=5)] == [kept["kept"]]
+
+        station = db.get(WeatherStation, kept["kept"])
+        station.is_active = False
+        db.flush()
+        db.rollback()
+        assert len(station_index.nearest(40.0, -100.0, radius_km=5)) == 1
+
+    def test_first_batch_loads_a_cold_registry(self, tmp_path, monkeypatch):
+        """Test an IoT batch on a never-loaded registry loads it instead of hanging."""
+        monkeypatch.setattr(station_registry, "_station_pks", {})
+        monkeypatch.setattr(station_registry, "_loaded", False)
+
+        async def ingest():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cold.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            async with async_sessionmaker(engine)() as db:
+                outcome["result"] = await DataIngestionService().ingest_iot_sensor_batch(
+                    [{"sensor_id": "cold", "latitude": 1.0, "longitude": 2.0, "temperature": 20.0}], db
+                )
+            await engine.dispose()
+
+        # A deadlock would block the event loop itself, so run it on a thread we can abandon
+        outcome = {}
+        worker = threading.Thread(target=lambda: asyncio.run(ingest()), daemon=True)
+        worker.start()
+        worker.join(timeout=10)
+
+        assert not worker.is_alive(), "IoT ingestion hung loading the station registry"
+        assert outcome["result"]["records_processed"] == 1 and outcome["result"]["errors"] == []
+        assert station_registry.is_loaded and station_registry.get("cold") is not None
@@ -0,0 +1,152 @@
+"""Tests for the user location index used by alert fan-out."""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.user import User
+from app.services.user_location_index import user_location_index
+
+
+def make_user(name: str, latitude: str, longitude: str, notification_radius: int = 50) -> User:
+    """User with the required columns filled in."""
+    return User(
+        email=f"{name}@example.com",
+        username=name,
+        hashed_password="x",
+        default_latitude=latitude,
+        default_longitude=longitude,
+        notification_radius=notification_radius
+    )
+
+
+class TestUserLocationIndex:
+    """Test the index follows user changes and applies per-user radii."""
+
+    @pytest.fixture
+    def db(self):
+        """Session on a fresh in-memory SQLite database with a loaded index."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        user_location_index.rebuild(session)
+        yield session
+        session.close()
+        engine.dispose()
+
+    def in_range(self, latitude: float, longitude: float, radius_km: float):
+        """Ids of the users an alert at the location reaches."""
+        return sorted(user_id for user_id, _ in user_location_index.find_users_in_range(
+            latitude, longitude, radius_km
+        ))
+
+    def test_rebuild_loads_active_users_with_locations(self, db):
+        """Test only active users with a valid location are loaded."""
+        located = make_user("located", "10.0", "20.0")
+        inactive = make_user("inactive", "10.0", "20.0")
+        inactive.is_active = False
+        db.add_all([located, inactive, make_user("nowhere", None, None), make_user("bad", "abc", "20.0")])
+        db.commit()
+
+        user_location_index.rebuild(db)
+
+        assert len(user_location_index) == 1
+        assert self.in_range(10.0, 20.0, 10) == [located.id]
+
+    def test_insert_update_and_delete(self, db):
+        """Test mapper events add, move, deactivate and remove users."""
+        user = make_user("mover", "10.0", "20.0", notification_radius=1)
+        db.add(user)
+        db.commit()
+        assert self.in_range(10.0, 20.0, 5) == [user.id]
+
+        user.default_latitude = "30.0"
+        db.commit()
+        assert self.in_range(10.0, 20.0, 5) == []
+        assert self.in_range(30.0, 20.0, 5) == [user.id]
+
+        user.is_active = False
+        db.commit()
+        assert self.in_range(30.0, 20.0, 5) == []
+
+        user.is_active = True
+        db.commit()
+        assert self.in_range(30.0, 20.0, 5) == [user.id]
+
+        db.delete(user)
+        db.commit()
+        assert len(user_location_index) == 0
+
+    def test_rolled_back_changes_are_discarded(self, db):
+        """Test changes flushed in a rolled-back transaction never reach the index."""
+        user = make_user("stayer", "10.0", "20.0")
+        db.add(user)
+        db.commit()
+
+        user.default_latitude = "30.0"
+        db.add(make_user("ghost", "10.0", "20.0"))
+        db.flush()
+        # Flushed but not committed yet
+        assert self.in_range(10.0, 20.0, 5) == [user.id]
+        db.rollback()
+
+        assert self.in_range(10.0, 20.0, 5) == [user.id]
+        assert self.in_range(30.0, 20.0, 5) == []
+        assert len(user_location_index) == 1
+
+        db.delete(user)
+        db.flush()
+        db.rollback()
+        assert self.in_range(10.0, 20.0, 5) == [user.id]
+
+    def test_user_radius_extends_alert_reach(self, db):
+        """Test users are reached within the larger of the alert and their own radius."""
+        # Both users are about 111 km north of the alert
+        near_sighted = make_user("near", "11.0", "20.0", notification_radius=10)
+        far_sighted = make_user("far", "11.0", "20.001", notification_radius=200)
+        db.add_all([near_sighted, far_sighted])
+        db.commit()
+
+        assert self.in_range(10.0, 20.0, 50) == [far_sighted.id]
+        assert self.in_range(10.0, 20.0, 150) == sorted([near_sighted.id, far_sighted.id])
+
+        far_sighted.notification_radius = 10
+        db.commit()
+        assert self.in_range(10.0, 20.0, 50) == []
+
+    def test_concurrent_updates_and_queries(self, db):
+        """Test queries stay consistent while other threads move users."""
+        users = [make_user(f"user{user_id}", "10.0", "20.0", user_id) for user_id in range(1, 201)]
+        for user_id, user in enumerate(users, start=1):
+            user.id = user_id
+            user_location_index.refresh_user(user)
+
+        errors = []
+
+        def churn():
+            try:
+                for _ in range(50):
+                    for user in users:
+                        # Each new radius value adds and drops radius buckets
+                        user.notification_radius += 1
+                        user_location_index.refresh_user(user)
+            except Exception as e:
+                errors.append(e)
+
+        def query():
+            try:
+                for _ in range(200):
+                    assert len(self.in_range(10.0, 20.0, 1)) == 200
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=churn), threading.Thread(target=query)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
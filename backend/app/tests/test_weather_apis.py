@@ -0,0 +1,87 @@
+"""Tests for the weather API client against a local HTTP stub."""
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.utils.weather_apis import OPENWEATHER_GROUP_SIZE, WeatherAPIClient
+
+
+def city_weather(city_id: int, temperature: float) -> dict:
+    """Minimal OpenWeatherMap current weather payload."""
+    return {
+        "id": city_id,
+        "dt": 1700000000,
+        "main": {"temp": temperature, "humidity": 50, "pressure": 1013},
+        "wind": {"speed": 3.0, "deg": 180},
+        "clouds": {"all": 20},
+        "weather": [{"main": "Clouds", "description": "few clouds"}],
+    }
+
+
+class TestOpenWeatherBulk:
+    """Test group requests and per-point fallback."""
+
+    @pytest.fixture
+    def stub(self):
+        """Stub OpenWeatherMap server recording the requests it receives."""
+        state = {"requests": [], "group_status": 200}
+
+        async def weather(request):
+            state["requests"].append("weather")
+            latitude = float(request.query["lat"])
+            return web.json_response(city_weather(1000 + int(latitude), latitude))
+
+        async def group(request):
+            state["requests"].append("group")
+            if state["group_status"] != 200:
+                return web.Response(status=state["group_status"])
+            city_ids = [int(city_id) for city_id in request.query["id"].split(",")]
+            assert len(city_ids) <= OPENWEATHER_GROUP_SIZE
+            return web.json_response({
+                "cnt": len(city_ids),
+                "list": [city_weather(city_id, city_id - 1000) for city_id in city_ids],
+            })
+
+        app = web.Application()
+        app.router.add_get("/weather", weather)
+        app.router.add_get("/group", group)
+        state["app"] = app
+        return state
+
+    @pytest.mark.asyncio
+    async def test_group_requests_after_cities_are_learned(self, stub):
+        """Test known cities are fetched in groups and split back per location."""
+        locations = [(float(latitude), 0.0) for latitude in range(45)]
+
+        async with TestServer(stub["app"]) as server:
+            async with WeatherAPIClient(openweather_base_url=str(server.make_url(""))) as client:
+                client.openweather_api_key = "test"
+
+                first = await client.get_current_weather_openweather_many(locations)
+                assert stub["requests"].count("weather") == 45
+
+                stub["requests"].clear()
+                second = await client.get_current_weather_openweather_many(locations)
+
+        assert stub["requests"] == ["group"] * 3
+        assert [r["temperature"] for r in second] == [r["temperature"] for r in first]
+        assert [r["temperature"] for r in second] == [latitude for latitude, _ in locations]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_group_endpoint_unavailable(self, stub):
+        """Test an unavailable group endpoint falls back to per-point requests."""
+        locations = [(1.0, 0.0), (2.0, 0.0)]
+
+        async with TestServer(stub["app"]) as server:
+            async with WeatherAPIClient(openweather_base_url=str(server.make_url(""))) as client:
+                client.openweather_api_key = "test"
+                await client.get_current_weather_openweather_many(locations)
+
+                stub["group_status"] = 404
+                stub["requests"].clear()
+                results = await client.get_current_weather_openweather_many(locations)
+                assert client.group_supported is False
+
+        assert stub["requests"] == ["group", "weather", "weather"]
+        assert [r["temperature"] for r in results] == [1.0, 2.0]
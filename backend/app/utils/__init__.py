@@ -2,8 +2,13 @@
 
 from app.utils.weather_apis import WeatherAPIClient
 from app.utils.iot_connector import IoTConnector
+from app.utils.iot_coordinator import IoTConnectorPool
+from app.utils.geo_index import GeoGridIndex, haversine_km
 
 __all__ = [
     "WeatherAPIClient",
-    "IoTConnector"
+    "IoTConnector",
+    "IoTConnectorPool",
+    "GeoGridIndex",
+    "haversine_km"
 ]
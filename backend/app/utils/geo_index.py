@@ -0,0 +1,238 @@
+"""Grid-bucketed geospatial index with vectorized haversine queries."""
+
+import logging
+import math
+import threading
+import numpy as np
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(
+    latitude: float,
+    longitude: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points."""
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    lat2 = np.radians(latitudes)
+    lon2 = np.radians(longitudes)
+
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bounding_box(
+    latitude: float,
+    longitude: float,
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """Approximate (min_lat, max_lat, min_lon, max_lon) enclosing a radius.
+
+    Longitude bounds are widened to the full range near the poles or when
+    the box would wrap the antimeridian.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, latitude - lat_delta)
+    max_lat = min(90.0, latitude + lat_delta)
+
+    max_abs_lat = max(abs(min_lat), abs(max_lat))
+    if max_abs_lat >= 89.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    lon_delta = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+    if lon_delta >= 180.0 or longitude - lon_delta < -180.0 or longitude + lon_delta > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    return min_lat, max_lat, longitude - lon_delta, longitude + lon_delta
+
+
+class _GridCell:
+    """Points in one grid cell, stored as parallel coordinate arrays."""
+
+    __slots__ = ("keys", "latitudes", "longitudes", "size")
+
+    def __init__(self, capacity: int = 8):
+        """Initialize an empty cell."""
+        self.keys: List[Hashable] = []
+        self.latitudes = np.empty(capacity, dtype=np.float64)
+        self.longitudes = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def append(self, key: Hashable, latitude: float, longitude: float) -> int:
+        """Append a point and return its slot."""
+        if self.size == len(self.latitudes):
+            self.latitudes = np.resize(self.latitudes, 2 * self.size)
+            self.longitudes = np.resize(self.longitudes, 2 * self.size)
+        slot = self.size
+        self.keys.append(key)
+        self.latitudes[slot] = latitude
+        self.longitudes[slot] = longitude
+        self.size += 1
+        return slot
+
+    def remove(self, slot: int) -> Optional[Hashable]:
+        """Swap-remove a slot, returning the key that moved into it (if any)."""
+        last = self.size - 1
+        moved_key = None
+        if slot != last:
+            moved_key = self.keys[last]
+            self.keys[slot] = moved_key
+            self.latitudes[slot] = self.latitudes[last]
+            self.longitudes[slot] = self.longitudes[last]
+        self.keys.pop()
+        self.size -= 1
+        return moved_key
+
+
+class GeoGridIndex:
+    """Spatial index of keyed points bucketed into fixed-size lat/lon cells.
+
+    Radius queries prune to the cells overlapping the query bounding box
+    and then run a vectorized haversine over the surviving points, so query
+    cost scales with the number of nearby points rather than the index size.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.5):
+        """Initialize geo grid index."""
+        self.cell_size_deg = cell_size_deg
+        self._n_lon_cells = int(math.ceil(360.0 / cell_size_deg))
+        self._cells: Dict[Tuple[int, int], _GridCell] = {}
+        self._locations: Dict[Hashable, Tuple[Tuple[int, int], int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Number of indexed points."""
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a key is indexed."""
+        return key in self._locations
+
+    def _cell_for(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Grid cell coordinates for a point."""
+        row = int(math.floor((latitude + 90.0) / self.cell_size_deg))
+        col = int(math.floor((longitude + 180.0) / self.cell_size_deg)) % self._n_lon_cells
+        return row, col
+
+    def clear(self):
+        """Remove all points."""
+        with self._lock:
+            self._cells.clear()
+            self._locations.clear()
+
+    def upsert(self, key: Hashable, latitude: float, longitude: float):
+        """Insert a point or move an existing one."""
+        with self._lock:
+            if key in self._locations:
+                self._remove_locked(key)
+
+            cell_key = self._cell_for(latitude, longitude)
+            cell = self._cells.get(cell_key)
+            if cell is None:
+                cell = self._cells[cell_key] = _GridCell()
+
+            slot = cell.append(key, latitude, longitude)
+            self._locations[key] = (cell_key, slot)
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove a point; returns False if it was not indexed."""
+        with self._lock:
+            if key not in self._locations:
+                return False
+            self._remove_locked(key)
+            return True
+
+    def _remove_locked(self, key: Hashable):
+        """Remove a point; the caller holds the lock."""
+        cell_key, slot = self._locations.pop(key)
+        cell = self._cells[cell_key]
+        moved_key = cell.remove(slot)
+        if moved_key is not None:
+            self._locations[moved_key] = (cell_key, slot)
+        if cell.size == 0:
+            del self._cells[cell_key]
+
+    def _candidate_cells(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[_GridCell]:
+        """Cells overlapping the bounding box of a radius query."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        min_row, min_col = self._cell_for(min_lat, min_lon)
+        max_row, _ = self._cell_for(max_lat, min_lon)
+
+        if min_lon == -180.0 and max_lon == 180.0:
+            n_cols = self._n_lon_cells
+        else:
+            n_cols = int(math.floor((max_lon + 180.0) / self.cell_size_deg)) - min_col + 1
+
+        # Scanning existing cells is cheaper than probing a very large box
+        if (max_row - min_row + 1) * n_cols > len(self._cells):
+            return [
+                cell for (row, col), cell in self._cells.items()
+                if min_row <= row <= max_row
+                and (n_cols >= self._n_lon_cells or (col - min_col) % self._n_lon_cells < n_cols)
+            ]
+
+        cells = []
+        for row in range(min_row, max_row + 1):
+            for offset in range(n_cols):
+                cell = self._cells.get((row, (min_col + offset) % self._n_lon_cells))
+                if cell is not None:
+                    cells.append(cell)
+        return cells
+
+    def query_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[Tuple[Any, float]]:
+        """Keys within ``radius_km`` of a point as (key, distance_km), nearest first."""
+        with self._lock:
+            cells = self._candidate_cells(latitude, longitude, radius_km)
+            if not cells:
+                return []
+
+            keys = [key for cell in cells for key in cell.keys]
+            latitudes = np.concatenate([cell.latitudes[:cell.size] for cell in cells])
+            longitudes = np.concatenate([cell.longitudes[:cell.size] for cell in cells])
+
+        distances = haversine_km(latitude, longitude, latitudes, longitudes)
+        matches = np.flatnonzero(distances <= radius_km)
+        matches = matches[np.argsort(distances[matches], kind="stable")]
+
+        return [(keys[i], float(distances[i])) for i in matches]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        max_radius_km: Optional[float] = None
+    ) -> List[Tuple[Any, float]]:
+        """The ``k`` nearest keys as (key, distance_km), optionally capped by radius."""
+        if k <= 0 or not self._locations:
+            return []
+
+        limit = max_radius_km if max_radius_km is not None else math.pi * EARTH_RADIUS_KM
+        radius = min(limit, self.cell_size_deg * KM_PER_DEGREE)
+
+        # Grow the search radius until k points are found or the limit is hit
+        while True:
+            matches = self.query_radius(latitude, longitude, radius)
+            if len(matches) >= k or radius >= limit:
+                return matches[:k]
+            radius = min(limit, radius * 2.0)
@@ -0,0 +1,217 @@
+"""Bounded, batching handoff from producer threads to an asyncio consumer."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+_STOP = object()
+
+
+class BoundedIngestQueue:
+    """Hand items from any thread to a bounded queue drained in batches.
+
+    Producers call ``submit_threadsafe`` from foreign threads (such as the
+    paho network thread); items are moved onto the owning event loop and a
+    single consumer writes them through ``write_batch`` in batches of up to
+    ``batch_size``, waiting at most ``flush_interval_ms`` to fill one.
+
+    When the queue is full the ``overflow_policy`` applies: ``block`` holds
+    the producer for up to ``block_timeout_seconds`` (pushing backpressure to
+    the broker), ``drop_newest`` discards the incoming item and
+    ``drop_oldest`` evicts the oldest queued item to make room.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], Awaitable[Dict[str, Any]]],
+        max_size: int = settings.IOT_QUEUE_MAX_SIZE,
+        batch_size: int = settings.IOT_BATCH_SIZE,
+        flush_interval_ms: float = settings.IOT_FLUSH_INTERVAL_MS,
+        overflow_policy: str = settings.IOT_QUEUE_OVERFLOW_POLICY,
+        block_timeout_seconds: float = settings.IOT_QUEUE_BLOCK_TIMEOUT_SECONDS
+    ):
+        """Initialize bounded ingest queue."""
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow_policy!r}, expected one of {OVERFLOW_POLICIES}"
+            )
+
+        self.write_batch = write_batch
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.overflow_policy = overflow_policy
+        self.block_timeout_seconds = block_timeout_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.high_watermark = 0
+        self.batches_written = 0
+        self.records_written = 0
+        self.write_errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the consumer is running."""
+        return self._consumer is not None and not self._consumer.done()
+
+    def start(self):
+        """Bind to the running event loop and start the batching consumer."""
+        if self.is_running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._consumer = self._loop.create_task(self._consume())
+        logger.info(
+            f"Ingest queue started (max_size={self.max_size}, batch_size={self.batch_size}, "
+            f"policy={self.overflow_policy})"
+        )
+
+    async def stop(self):
+        """Stop the consumer after writing everything still queued."""
+        if self._consumer is None:
+            return
+
+        # The consumer finishes the batches queued ahead of the stop marker
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._consumer
+        self._consumer = None
+
+        # Items that raced in behind the marker
+        while not self._queue.empty():
+            await self._write(self._take_nowait(self.batch_size))
+
+    def submit_threadsafe(self, item: Any) -> bool:
+        """Queue an item from any thread; returns False if it was dropped."""
+        if self._loop is None or self._loop.is_closed():
+            self._count_drop()
+            logger.warning("Ingest queue is not running, dropping item")
+            return False
+
+        if threading.get_ident() == self._loop_thread_id:
+            return self._offer(item)
+
+        if self.overflow_policy == "block":
+            future = asyncio.run_coroutine_threadsafe(self._put(item), self._loop)
+            try:
+                return future.result(timeout=self.block_timeout_seconds)
+            except FutureTimeoutError:
+                future.cancel()
+                self._count_drop()
+                logger.warning("Ingest queue full, dropping item after backpressure timeout")
+                return False
+
+        self._loop.call_soon_threadsafe(self._offer, item)
+        return True
+
+    async def _put(self, item: Any) -> bool:
+        """Wait for room in the queue, then add the item."""
+        await self._queue.put(item)
+        self._count_enqueue()
+        return True
+
+    def _offer(self, item: Any) -> bool:
+        """Add an item without waiting, applying the overflow policy when full."""
+        if self._queue.full():
+            if self.overflow_policy == "drop_oldest" and not self._stopping:
+                self._queue.get_nowait()
+            else:
+                self._count_drop()
+                logger.warning("Ingest queue full, dropping newest item")
+                return False
+            self._count_drop()
+
+        self._queue.put_nowait(item)
+        self._count_enqueue()
+        return True
+
+    def _count_enqueue(self):
+        """Record an enqueued item and the queue's high watermark."""
+        with self._stats_lock:
+            self.enqueued += 1
+            self.high_watermark = max(self.high_watermark, self._queue.qsize())
+
+    def _count_drop(self):
+        """Record a dropped item."""
+        with self._stats_lock:
+            self.dropped += 1
+
+    def _take_nowait(self, limit: int) -> List[Any]:
+        """Take up to ``limit`` items that are already queued."""
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _consume(self):
+        """Drain the queue in batches until the stop marker is reached."""
+        stopped = False
+        while not stopped:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            if batch[-1] is _STOP:
+                batch.pop()
+                stopped = True
+            await self._write(batch)
+
+    async def _write(self, batch: List[Any]):
+        """Write one batch, logging rather than raising on failure."""
+        if not batch:
+            return
+
+        try:
+            result = await self.write_batch(batch)
+            self.batches_written += 1
+            self.records_written += result.get("records_processed", 0)
+            for error in result.get("errors", []):
+                logger.warning(f"Ingest batch error: {error}")
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Error writing ingest batch of {len(batch)} items: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters."""
+        return {
+            "running": self.is_running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "high_watermark": self.high_watermark,
+            "overflow_policy": self.overflow_policy,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "batches_written": self.batches_written,
+            "records_written": self.records_written,
+            "write_errors": self.write_errors
+        }
@@ -3,6 +3,7 @@
 import logging
 import asyncio
 import json
+import zlib
 from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime
 import paho.mqtt.client as mqtt
@@ -10,25 +11,67 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.services.data_ingestion import DataIngestionService
+from app.utils.ingest_queue import BoundedIngestQueue
+from app.utils.sensor_payload import SensorPayloadValidator, decode_payload, loads
+from app.utils.sensor_registry import SensorRegistry
 
 logger = logging.getLogger(__name__)
 
+SHARDING_MODES = ("shared", "hash")
+
+
+def sensor_shard(sensor_id: str, shard_count: int) -> int:
+    """Stable shard index of a sensor, identical across processes."""
+    return zlib.crc32(sensor_id.encode()) % shard_count
+
 
 class IoTConnector:
-    """Connector for IoT weather sensors via MQTT."""
+    """Connector for IoT weather sensors via MQTT.
+    
+    A connector can run as one of ``shard_count`` workers consuming the
+    sensor topics together. In ``shared`` mode the workers subscribe
+    through an MQTT shared subscription (``$share/<group>/...``) and the
+    broker spreads messages across them; in ``hash`` mode every worker
+    subscribes to the plain topics and keeps only the sensors whose
+    ``sensor_shard`` matches its ``shard_index``, which keeps each sensor
+    on one worker without broker support. Only shard 0 handles commands.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        sharding_mode: str = settings.IOT_SHARDING_MODE,
+        share_group: str = settings.IOT_SHARE_GROUP,
+        client_id: Optional[str] = None
+    ):
         """Initialize IoT connector."""
+        if sharding_mode not in SHARDING_MODES:
+            raise ValueError(
+                f"Unknown sharding mode {sharding_mode!r}, expected one of {SHARDING_MODES}"
+            )
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Shard index {shard_index} out of range for {shard_count} shards")
+        
         self.mqtt_client = None
         self.data_ingestion_service = DataIngestionService()
         self.is_connected = False
         self.message_handlers = {}
-        self.sensor_registry = {}
+        self.sensor_registry = SensorRegistry()
+        self.payload_validator = SensorPayloadValidator()
+        self.ingest_queue = BoundedIngestQueue(self._ingest_sensor_batch)
         
         # MQTT configuration
         self.broker_host = settings.MQTT_BROKER_HOST
         self.broker_port = settings.MQTT_BROKER_PORT
-        self.client_id = f"climate_guardian_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.client_id = client_id or f"climate_guardian_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        # Sharding
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.sharding_mode = sharding_mode
+        self.share_group = share_group
+        self.sensor_snapshot: Callable[[], Dict[str, Dict[str, Any]]] = self.sensor_registry.snapshot
         
         # Topic patterns
         self.base_topic = "climate_guardian"
@@ -95,21 +138,29 @@ class IoTConnector:
         """Callback for received MQTT messages."""
         try:
             topic = msg.topic
-            payload = msg.payload.decode('utf-8')
+            is_sensor_topic = "/sensors/" in topic
             
-            logger.debug(f"Received message on topic {topic}: {payload}")
+            # Hash sharding: leave other shards' sensors before decoding anything
+            if is_sensor_topic and not self._owns_sensor(self._sensor_id_from_topic(topic)):
+                return
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Received message on topic {topic}: {msg.payload!r}")
             
-            # Parse JSON payload
+            # Sensor data may use the compact binary format; everything else is JSON
             try:
-                data = json.loads(payload)
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in message: {e}")
+                if is_sensor_topic and "/data" in topic:
+                    data = decode_payload(msg.payload)
+                else:
+                    data = loads(msg.payload)
+            except ValueError as e:
+                logger.error(f"Invalid payload in message on {topic}: {e}")
                 return
             
             # Route message based on topic
-            if "/sensors/" in topic and "/data" in topic:
+            if is_sensor_topic and "/data" in topic:
                 self._handle_sensor_data(topic, data)
-            elif "/sensors/" in topic and "/status" in topic:
+            elif is_sensor_topic and "/status" in topic:
                 self._handle_sensor_status(topic, data)
             elif topic == self.command_topic:
                 self._handle_command(data)
@@ -125,16 +176,33 @@ class IoTConnector:
         """Callback for successful unsubscription."""
         logger.debug(f"Unsubscribed from topic, message ID: {mid}")
     
+    def _subscription_topics(self) -> List[tuple]:
+        """Topics this worker subscribes to, with their QoS."""
+        sensor_topics = [self.sensor_data_topic, self.sensor_status_topic]
+        if self.shard_count > 1 and self.sharding_mode == "shared":
+            sensor_topics = [f"$share/{self.share_group}/{topic}" for topic in sensor_topics]
+        
+        topics = [(topic, 1) for topic in sensor_topics]
+        if self.shard_index == 0:
+            topics.append((self.command_topic, 1))
+        return topics
+    
+    def _owns_sensor(self, sensor_id: str) -> bool:
+        """Whether this worker handles a sensor's messages."""
+        if self.shard_count == 1 or self.sharding_mode != "hash":
+            return True
+        return sensor_shard(sensor_id, self.shard_count) == self.shard_index
+    
+    @staticmethod
+    def _sensor_id_from_topic(topic: str) -> str:
+        """Extract the sensor ID from a sensor topic."""
+        topic_parts = topic.split('/')
+        return topic_parts[2] if len(topic_parts) > 2 else "unknown"
+    
     def _subscribe_to_topics(self):
         """Subscribe to relevant MQTT topics."""
         try:
-            topics = [
-                (self.sensor_data_topic, 1),
-                (self.sensor_status_topic, 1),
-                (self.command_topic, 1)
-            ]
-            
-            for topic, qos in topics:
+            for topic, qos in self._subscription_topics():
                 result = self.mqtt_client.subscribe(topic, qos)
                 if result[0] == mqtt.MQTT_ERR_SUCCESS:
                     logger.info(f"Subscribed to topic: {topic}")
@@ -148,29 +216,25 @@ class IoTConnector:
         """Handle incoming sensor data."""
         try:
             # Extract sensor ID from topic
-            topic_parts = topic.split('/')
-            sensor_id = topic_parts[2] if len(topic_parts) > 2 else "unknown"
+            sensor_id = self._sensor_id_from_topic(topic)
             
-            # Validate sensor data
-            if not self._validate_sensor_data(data):
-                logger.warning(f"Invalid sensor data from {sensor_id}: {data}")
+            # Validate and coerce sensor data in one pass
+            enhanced_data = self.payload_validator.validate(data)
+            if enhanced_data is None:
+                logger.warning(f"Invalid sensor data from {sensor_id}")
                 return
             
             # Add metadata
-            enhanced_data = {
-                **data,
-                "sensor_id": sensor_id,
-                "received_at": datetime.utcnow().isoformat(),
-                "topic": topic
-            }
+            enhanced_data["sensor_id"] = sensor_id
+            enhanced_data["received_at"] = datetime.utcnow().isoformat()
+            enhanced_data["topic"] = topic
             
             # Update sensor registry
             self._update_sensor_registry(sensor_id, enhanced_data)
             
-            # Process data asynchronously
-            asyncio.create_task(self._process_sensor_data(enhanced_data))
-            
-            logger.info(f"Processed sensor data from {sensor_id}")
+            # Hand off to the event loop; written in batches by the queue consumer
+            if self.ingest_queue.submit_threadsafe(enhanced_data):
+                logger.debug(f"Queued sensor data from {sensor_id}")
             
         except Exception as e:
             logger.error(f"Error handling sensor data: {e}")
@@ -179,15 +243,10 @@ class IoTConnector:
         """Handle sensor status updates."""
         try:
             # Extract sensor ID from topic
-            topic_parts = topic.split('/')
-            sensor_id = topic_parts[2] if len(topic_parts) > 2 else "unknown"
+            sensor_id = self._sensor_id_from_topic(topic)
             
             # Update sensor registry
-            if sensor_id not in self.sensor_registry:
-                self.sensor_registry[sensor_id] = {}
-            
-            self.sensor_registry[sensor_id]["status"] = data
-            self.sensor_registry[sensor_id]["last_status_update"] = datetime.utcnow()
+            self.sensor_registry.update_status(sensor_id, data.get("status", "unknown"))
             
             logger.info(f"Updated status for sensor {sensor_id}: {data.get('status', 'unknown')}")
             
@@ -212,99 +271,23 @@ class IoTConnector:
         except Exception as e:
             logger.error(f"Error handling command: {e}")
     
-    def _validate_sensor_data(self, data: Dict[str, Any]) -> bool:
-        """Validate incoming sensor data."""
-        try:
-            required_fields = ["timestamp"]
-            
-            # Check required fields
-            for field in required_fields:
-                if field not in data:
-                    return False
-            
-            # Validate timestamp
-            try:
-                datetime.fromisoformat(data["timestamp"].replace('Z', '+00:00'))
-            except (ValueError, AttributeError):
-                return False
-            
-            # Validate numeric fields
-            numeric_fields = [
-                "temperature", "humidity", "pressure", "wind_speed",
-                "precipitation", "pm25", "pm10", "co", "no2", "so2", "o3"
-            ]
-            
-            for field in numeric_fields:
-                if field in data:
-                    try:
-                        float(data[field])
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid numeric value for {field}: {data[field]}")
-                        return False
-            
-            # Validate coordinate fields
-            if "latitude" in data:
-                try:
-                    lat = float(data["latitude"])
-                    if not (-90 <= lat <= 90):
-                        return False
-                except (ValueError, TypeError):
-                    return False
-            
-            if "longitude" in data:
-                try:
-                    lon = float(data["longitude"])
-                    if not (-180 <= lon <= 180):
-                        return False
-                except (ValueError, TypeError):
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error validating sensor data: {e}")
-            return False
-    
-    async def _process_sensor_data(self, data: Dict[str, Any]):
-        """Process validated sensor data."""
-        try:
-            # Import here to avoid circular imports
-            from app.db.database import SessionLocal
-            
-            db = SessionLocal()
-            try:
-                # Ingest data into database
-                climate_data = await self.data_ingestion_service.ingest_iot_sensor_data(data, db)
-                
-                if climate_data:
-                    logger.info(f"Successfully ingested IoT sensor data: {data['sensor_id']}")
-                else:
-                    logger.warning(f"Failed to ingest IoT sensor data: {data['sensor_id']}")
-                    
-            finally:
-                db.close()
-                
-        except Exception as e:
-            logger.error(f"Error processing sensor data: {e}")
+    async def _ingest_sensor_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Write a batch of validated sensor data in one transaction."""
+        # Import here to avoid circular imports
+        from app.db.database import AsyncSessionLocal
+        
+        async with AsyncSessionLocal() as db:
+            result = await self.data_ingestion_service.ingest_iot_sensor_batch(batch, db)
+        
+        logger.info(
+            f"Ingested {result['records_processed']} of {len(batch)} IoT sensor readings"
+        )
+        return result
     
     def _update_sensor_registry(self, sensor_id: str, data: Dict[str, Any]):
         """Update sensor registry with latest data."""
         try:
-            if sensor_id not in self.sensor_registry:
-                self.sensor_registry[sensor_id] = {
-                    "first_seen": datetime.utcnow(),
-                    "message_count": 0
-                }
-            
-            registry_entry = self.sensor_registry[sensor_id]
-            registry_entry["last_seen"] = datetime.utcnow()
-            registry_entry["message_count"] = registry_entry.get("message_count", 0) + 1
-            registry_entry["last_data"] = data
-            
-            # Update location if provided
-            if "latitude" in data and "longitude" in data:
-                registry_entry["latitude"] = data["latitude"]
-                registry_entry["longitude"] = data["longitude"]
+            self.sensor_registry.update(sensor_id, data)
             
         except Exception as e:
             logger.error(f"Error updating sensor registry: {e}")
@@ -349,11 +332,11 @@ class IoTConnector:
                 "client_id": self.client_id,
                 "sensors": {
                     sensor_id: {
-                        "last_seen": info["last_seen"].isoformat(),
+                        "last_seen": info["last_seen"],
                         "message_count": info["message_count"],
-                        "status": info.get("status", {}).get("status", "unknown")
+                        "status": info["status"]
                     }
-                    for sensor_id, info in self.sensor_registry.items()
+                    for sensor_id, info in self.sensor_snapshot().items()
                 },
                 "timestamp": datetime.utcnow().isoformat()
             }
@@ -386,6 +369,9 @@ class IoTConnector:
             if not self.mqtt_client:
                 self.setup_mqtt_client()
             
+            # Start the batching consumer on this event loop
+            self.ingest_queue.start()
+            
             # Connect to broker
             self.mqtt_client.connect(self.broker_host, self.broker_port, 60)
             
@@ -417,20 +403,16 @@ class IoTConnector:
                 
                 self.is_connected = False
                 logger.info("IoT connector disconnected")
+            
+            # Write anything still queued
+            await self.ingest_queue.stop()
                 
         except Exception as e:
             logger.error(f"Error disconnecting IoT connector: {e}")
     
     def get_sensor_registry(self) -> Dict[str, Any]:
         """Get current sensor registry."""
-        return {
-            sensor_id: {
-                **info,
-                "first_seen": info["first_seen"].isoformat(),
-                "last_seen": info["last_seen"].isoformat()
-            }
-            for sensor_id, info in self.sensor_registry.items()
-        }
+        return self.sensor_registry.snapshot()
     
     def get_connection_status(self) -> Dict[str, Any]:
         """Get connection status information."""
@@ -439,7 +421,12 @@ class IoTConnector:
             "broker_host": self.broker_host,
             "broker_port": self.broker_port,
             "client_id": self.client_id,
+            "shard_index": self.shard_index,
+            "shard_count": self.shard_count,
             "registered_sensors": len(self.sensor_registry),
+            "sensor_registry_bytes": self.sensor_registry.memory_bytes,
+            "ingest_queue": self.ingest_queue.get_stats(),
+            "payload_validation": self.payload_validator.get_stats(),
             "uptime": datetime.utcnow().isoformat()
         }
     
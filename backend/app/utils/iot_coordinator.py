@@ -0,0 +1,128 @@
+"""Coordinator for sharded IoT connector workers."""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.iot_connector import IoTConnector
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_counters(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum numeric counters across workers, keeping other values from the first."""
+    merged: Dict[str, Any] = {}
+    for worker_stats in stats:
+        for key, value in worker_stats.items():
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, bool) or not isinstance(value, (int, float, dict)):
+                continue
+            elif isinstance(value, dict):
+                merged[key] = _merge_counters([merged[key], value])
+            else:
+                merged[key] += value
+    return merged
+
+
+class IoTConnectorPool:
+    """Run ``shard_count`` IoT connector workers as one connector.
+
+    Each worker is a full ``IoTConnector`` with its own MQTT client and
+    network thread, sensor registry and ingestion batcher, consuming its
+    share of the sensor topics (see ``IoTConnector`` for the sharding
+    modes). The pool starts and stops the workers together and aggregates
+    their registries and status, so callers see a single connector.
+
+    Workers share the process, so this spreads network I/O, decoding and
+    batching across threads; to use more cores, run the same configuration
+    in several processes with ``shared`` mode and the broker balances
+    across all of them.
+    """
+
+    def __init__(
+        self,
+        shard_count: int = settings.IOT_SHARD_COUNT,
+        sharding_mode: str = settings.IOT_SHARDING_MODE,
+        share_group: str = settings.IOT_SHARE_GROUP,
+        client_id_prefix: Optional[str] = None
+    ):
+        """Initialize IoT connector pool."""
+        self.shard_count = max(1, shard_count)
+        self.sharding_mode = sharding_mode
+        self.share_group = share_group
+
+        prefix = client_id_prefix or f"climate_guardian_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.workers = [
+            IoTConnector(
+                shard_index=index,
+                shard_count=self.shard_count,
+                sharding_mode=sharding_mode,
+                share_group=share_group,
+                client_id=f"{prefix}_shard{index}"
+            )
+            for index in range(self.shard_count)
+        ]
+
+        # Command responses from shard 0 list the sensors of every shard
+        for worker in self.workers:
+            worker.sensor_snapshot = self.get_sensor_registry
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether every worker is connected."""
+        return all(worker.is_connected for worker in self.workers)
+
+    async def connect(self):
+        """Connect every worker to the MQTT broker."""
+        await asyncio.gather(*(worker.connect() for worker in self.workers))
+        connected = sum(worker.is_connected for worker in self.workers)
+        logger.info(f"IoT connector pool connected {connected} of {self.shard_count} workers")
+
+    async def disconnect(self):
+        """Disconnect every worker, writing what they still have queued."""
+        await asyncio.gather(*(worker.disconnect() for worker in self.workers))
+        logger.info("IoT connector pool disconnected")
+
+    def get_sensor_registry(self) -> Dict[str, Any]:
+        """Merged sensor registry; the most recently seen entry wins."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for worker in self.workers:
+            for sensor_id, info in worker.sensor_registry.snapshot().items():
+                current = merged.get(sensor_id)
+                if current is None or (info["last_seen"] or "") > (current["last_seen"] or ""):
+                    merged[sensor_id] = info
+        return merged
+
+    def get_connection_status(self) -> Dict[str, Any]:
+        """Aggregated connection status with a per-worker breakdown."""
+        statuses = [worker.get_connection_status() for worker in self.workers]
+        return {
+            "connected": self.is_connected,
+            "broker_host": self.workers[0].broker_host,
+            "broker_port": self.workers[0].broker_port,
+            "sharding_mode": self.sharding_mode,
+            "shard_count": self.shard_count,
+            "connected_workers": sum(status["connected"] for status in statuses),
+            "registered_sensors": len(set().union(
+                *(worker.sensor_registry.sensor_ids() for worker in self.workers)
+            )),
+            "sensor_registry_bytes": sum(status["sensor_registry_bytes"] for status in statuses),
+            "ingest_queue": _merge_counters([status["ingest_queue"] for status in statuses]),
+            "payload_validation": _merge_counters(
+                [status["payload_validation"] for status in statuses]
+            ),
+            "workers": statuses,
+            "uptime": datetime.utcnow().isoformat()
+        }
+
+    async def send_sensor_command(self, sensor_id: str, command: Dict[str, Any]) -> bool:
+        """Send a command to a sensor through the first connected worker."""
+        for worker in self.workers:
+            if worker.is_connected:
+                return await worker.send_sensor_command(sensor_id, command)
+
+        logger.error("No IoT connector worker is connected")
+        return False
@@ -0,0 +1,62 @@
+"""Keyset pagination cursor helpers."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises a 400 error when the cursor is malformed or has the wrong arity.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            raise ValueError("Cursor payload must be a list")
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    return values
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = True):
+    """Filter continuing a scan ordered by ``columns`` after the row ``values``.
+
+    The comparison is lexicographic, so the last column should be unique
+    (normally the primary key) to break ties.
+    """
+    column, value = columns[-1], values[-1]
+    condition = column < value if descending else column > value
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        beyond = column < value if descending else column > value
+        condition = or_(beyond, and_(column == value, condition))
+    return condition
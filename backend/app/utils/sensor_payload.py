@@ -0,0 +1,178 @@
+"""Decoding and validation of MQTT sensor payloads."""
+
+import json
+import logging
+import struct
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = (
+    "temperature", "humidity", "pressure", "wind_speed",
+    "precipitation", "pm25", "pm10", "co", "no2", "so2", "o3"
+)
+
+COORDINATE_BOUNDS = {
+    "latitude": (-90.0, 90.0),
+    "longitude": (-180.0, 180.0)
+}
+
+# Compact binary format for constrained sensors (little-endian):
+#   magic (B) | version (B) | timestamp, epoch seconds (I) | field mask (H)
+# followed by one float32 per field whose bit is set in the mask, in
+# BINARY_FIELDS order.
+BINARY_MAGIC = 0xC7
+BINARY_VERSION = 1
+BINARY_FIELDS = NUMERIC_FIELDS + ("wind_direction", "latitude", "longitude")
+
+_BINARY_HEADER = struct.Struct("<BBIH")
+_BINARY_MASK_LIMIT = 1 << len(BINARY_FIELDS)
+
+JSON_DECODER = "orjson" if orjson is not None else "json"
+
+
+@lru_cache(maxsize=256)
+def _binary_body(mask: int) -> struct.Struct:
+    """Struct for the float32 values selected by a field mask."""
+    return struct.Struct("<" + "f" * bin(mask).count("1"))
+
+
+def loads(payload: bytes) -> Any:
+    """Decode a JSON payload, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def is_binary_payload(payload: bytes) -> bool:
+    """Whether a payload uses the compact binary format."""
+    return len(payload) >= _BINARY_HEADER.size and payload[0] == BINARY_MAGIC
+
+
+def encode_binary(data: Dict[str, Any]) -> bytes:
+    """Encode a sensor reading in the compact binary format."""
+    timestamp = data["timestamp"]
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+    mask = 0
+    values = []
+    for bit, field in enumerate(BINARY_FIELDS):
+        if data.get(field) is not None:
+            mask |= 1 << bit
+            values.append(float(data[field]))
+
+    return _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, int(timestamp), mask) + \
+        _binary_body(mask).pack(*values)
+
+
+def decode_binary(payload: bytes) -> Dict[str, Any]:
+    """Decode a compact binary payload into the same dict a JSON payload yields."""
+    magic, version, timestamp, mask = _BINARY_HEADER.unpack_from(payload)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary payload version {version}")
+
+    if mask >= _BINARY_MASK_LIMIT:
+        raise ValueError("Binary payload has unknown fields in its mask")
+
+    body = _binary_body(mask)
+    if len(payload) != _BINARY_HEADER.size + body.size:
+        raise ValueError("Binary payload length does not match its field mask")
+
+    values = iter(body.unpack_from(payload, _BINARY_HEADER.size))
+    data = {"timestamp": datetime.utcfromtimestamp(timestamp).isoformat() + "+00:00"}
+    for bit, field in enumerate(BINARY_FIELDS):
+        if mask >> bit & 1:
+            data[field] = next(values)
+    return data
+
+
+def decode_payload(payload: bytes) -> Any:
+    """Decode a binary or JSON sensor payload."""
+    if is_binary_payload(payload):
+        return decode_binary(payload)
+    return loads(payload)
+
+
+class SensorPayloadValidator:
+    """Validate sensor payloads against a precomputed field schema.
+
+    Each payload is checked in a single pass: the timestamp is parsed once,
+    numeric fields present in the payload are coerced to float in place of
+    their raw values, and coordinates are range checked on the coerced
+    values. Valid payloads come back as new dicts ready for ingestion, so
+    downstream code never re-parses them; invalid payloads come back as
+    None and the rejection reason is counted rather than logged.
+    """
+
+    def __init__(
+        self,
+        numeric_fields: Iterable[str] = NUMERIC_FIELDS,
+        coordinate_bounds: Optional[Dict[str, tuple]] = None,
+        required_fields: Iterable[str] = ("timestamp",)
+    ):
+        """Initialize sensor payload validator."""
+        self.coordinate_bounds = dict(coordinate_bounds or COORDINATE_BOUNDS)
+        self.required_fields = tuple(required_fields)
+        self._coerced_fields = frozenset(numeric_fields) | frozenset(self.coordinate_bounds)
+        self._bounds = tuple(self.coordinate_bounds.items())
+        self.rejected: Dict[str, int] = {}
+
+    def _reject(self, reason: str) -> None:
+        """Count a rejected payload."""
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return None
+
+    def validate(self, data: Any) -> Optional[Dict[str, Any]]:
+        """Coerced copy of a valid payload, or None if it is invalid."""
+        if not isinstance(data, dict):
+            return self._reject("not_an_object")
+
+        for field in self.required_fields:
+            if field not in data:
+                return self._reject(f"missing_{field}")
+
+        timestamp = data["timestamp"]
+        try:
+            if timestamp[-1] == 'Z':
+                timestamp = timestamp[:-1] + '+00:00'
+            datetime.fromisoformat(timestamp)
+        except (ValueError, TypeError, IndexError):
+            return self._reject("invalid_timestamp")
+
+        record = dict(data)
+        try:
+            for field in self._coerced_fields.intersection(data):
+                value = data[field]
+                if type(value) is not float:
+                    record[field] = float(value)
+        except (ValueError, TypeError):
+            return self._reject("invalid_number")
+
+        for field, (low, high) in self._bounds:
+            value = record.get(field)
+            # NaN fails both comparisons and is rejected here as well
+            if value is not None and not low <= value <= high:
+                return self._reject(f"invalid_{field}")
+
+        return record
+
+    def validate_batch(self, payloads: Iterable[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Validate payloads together; results are aligned with the input."""
+        validate = self.validate
+        return [validate(data) for data in payloads]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rejection counters and the JSON decoder in use."""
+        return {
+            "json_decoder": JSON_DECODER,
+            "rejected": dict(self.rejected),
+            "rejected_total": sum(self.rejected.values())
+        }
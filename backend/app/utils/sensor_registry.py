@@ -0,0 +1,283 @@
+"""Compact columnar registry of IoT sensors with per-sensor reading history."""
+
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+READING_FIELDS = (
+    "temperature", "humidity", "pressure", "wind_speed", "precipitation",
+    "pm25", "pm10", "co", "no2", "so2", "o3"
+)
+
+
+def _to_float(value: Any) -> float:
+    """Coerce a payload value to float, NaN when missing or invalid."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+
+def _isoformat(timestamp: float) -> Optional[str]:
+    """ISO timestamp for epoch seconds, None for NaN."""
+    if math.isnan(timestamp):
+        return None
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
+
+class SensorRegistry:
+    """Columnar table of sensors keyed by a dense row index.
+
+    Per-sensor state lives in NumPy columns rather than dicts: timestamps
+    are epoch floats, statuses are interned to small integer codes, and the
+    last ``history_size`` readings are kept in a fixed-size ring buffer of
+    float32 values. Rows of sensors silent for ``stale_after_seconds`` are
+    freed and reused, so memory stays bounded by the live fleet.
+
+    Writers (the MQTT network thread) and readers (API handlers) are
+    serialized by a lock.
+    """
+
+    def __init__(
+        self,
+        history_size: int = settings.IOT_SENSOR_HISTORY,
+        stale_after_seconds: float = settings.IOT_SENSOR_STALE_SECONDS,
+        eviction_interval_seconds: float = 60.0,
+        initial_capacity: int = 1024
+    ):
+        """Initialize sensor registry."""
+        self.history_size = max(1, history_size)
+        self.stale_after_seconds = stale_after_seconds
+        self.eviction_interval_seconds = eviction_interval_seconds
+
+        self._rows: Dict[str, int] = {}
+        self._sensor_ids: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        self._status_names: List[str] = ["unknown"]
+        self._status_codes: Dict[str, int] = {"unknown": 0}
+        self._lock = threading.Lock()
+        self._last_eviction = time.time()
+
+        n_fields = len(READING_FIELDS)
+        self._first_seen = np.empty(0, dtype=np.float64)
+        self._last_seen = np.empty(0, dtype=np.float64)
+        self._status_updated = np.empty(0, dtype=np.float64)
+        self._message_count = np.empty(0, dtype=np.int64)
+        self._latitude = np.empty(0, dtype=np.float32)
+        self._longitude = np.empty(0, dtype=np.float32)
+        self._status = np.empty(0, dtype=np.int16)
+        self._heads = np.empty(0, dtype=np.int32)
+        self._readings = np.empty((0, self.history_size, n_fields), dtype=np.float32)
+        self._reading_times = np.empty((0, self.history_size), dtype=np.float64)
+        self._grow(max(1, initial_capacity))
+
+    def _grow(self, capacity: int):
+        """Resize every column to ``capacity`` rows, keeping existing data."""
+        def resized(column: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            return grown
+
+        self._first_seen = resized(self._first_seen, np.nan)
+        self._last_seen = resized(self._last_seen, np.nan)
+        self._status_updated = resized(self._status_updated, np.nan)
+        self._message_count = resized(self._message_count, 0)
+        self._latitude = resized(self._latitude, np.nan)
+        self._longitude = resized(self._longitude, np.nan)
+        self._status = resized(self._status, 0)
+        self._heads = resized(self._heads, 0)
+        self._readings = resized(self._readings, np.nan)
+        self._reading_times = resized(self._reading_times, np.nan)
+
+    def _row_for(self, sensor_id: str, now: float) -> int:
+        """Row of a sensor, allocating and resetting one on first sight."""
+        row = self._rows.get(sensor_id)
+        if row is not None:
+            return row
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._sensor_ids[row] = sensor_id
+        else:
+            row = len(self._sensor_ids)
+            if row == len(self._last_seen):
+                self._grow(2 * row)
+            self._sensor_ids.append(sensor_id)
+
+        self._rows[sensor_id] = row
+        self._first_seen[row] = now
+        self._last_seen[row] = now
+        self._status_updated[row] = np.nan
+        self._message_count[row] = 0
+        self._latitude[row] = np.nan
+        self._longitude[row] = np.nan
+        self._status[row] = 0
+        self._heads[row] = 0
+        self._readings[row] = np.nan
+        self._reading_times[row] = np.nan
+        return row
+
+    def update(self, sensor_id: str, data: Dict[str, Any], now: Optional[float] = None):
+        """Record a reading from a sensor."""
+        now = time.time() if now is None else now
+        values = [_to_float(data.get(field)) for field in READING_FIELDS]
+
+        with self._lock:
+            row = self._row_for(sensor_id, now)
+            self._last_seen[row] = now
+            self._message_count[row] += 1
+
+            if "latitude" in data and "longitude" in data:
+                self._latitude[row] = _to_float(data["latitude"])
+                self._longitude[row] = _to_float(data["longitude"])
+
+            slot = self._heads[row]
+            self._readings[row, slot] = values
+            self._reading_times[row, slot] = now
+            self._heads[row] = (slot + 1) % self.history_size
+
+        self._maybe_evict(now)
+
+    def update_status(self, sensor_id: str, status: str, now: Optional[float] = None):
+        """Record a status report from a sensor."""
+        now = time.time() if now is None else now
+        status = str(status)
+
+        with self._lock:
+            code = self._status_codes.get(status)
+            if code is None:
+                code = len(self._status_names)
+                self._status_codes[status] = code
+                self._status_names.append(status)
+
+            row = self._row_for(sensor_id, now)
+            self._last_seen[row] = now
+            self._status[row] = code
+            self._status_updated[row] = now
+
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        """Free the rows of sensors not seen within ``stale_after_seconds``."""
+        now = time.time() if now is None else now
+        cutoff = now - self.stale_after_seconds
+
+        with self._lock:
+            used = len(self._sensor_ids)
+            stale_rows = np.flatnonzero(self._last_seen[:used] < cutoff)
+            for row in stale_rows.tolist():
+                del self._rows[self._sensor_ids[row]]
+                self._sensor_ids[row] = None
+                self._last_seen[row] = np.nan
+                self._free_rows.append(row)
+            self._last_eviction = now
+
+        if len(stale_rows):
+            logger.info(f"Evicted {len(stale_rows)} stale sensors from the registry")
+        return len(stale_rows)
+
+    def _maybe_evict(self, now: float):
+        """Run stale-sensor eviction at most once per eviction interval."""
+        if now - self._last_eviction >= self.eviction_interval_seconds:
+            self.evict_stale(now)
+
+    def _records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Plain-dict views of sensor rows, gathered column by column."""
+        last_slots = (self._heads[rows] - 1) % self.history_size
+        last_values = self._readings[rows, last_slots].tolist()
+        latitudes = self._latitude[rows].tolist()
+        longitudes = self._longitude[rows].tolist()
+        statuses = self._status[rows].tolist()
+
+        return [
+            {
+                "first_seen": _isoformat(first_seen),
+                "last_seen": _isoformat(last_seen),
+                "message_count": message_count,
+                "status": self._status_names[status],
+                "last_status_update": _isoformat(status_updated),
+                "latitude": None if math.isnan(latitude) else latitude,
+                "longitude": None if math.isnan(longitude) else longitude,
+                "last_reading": {
+                    field: value
+                    for field, value in zip(READING_FIELDS, values) if not math.isnan(value)
+                }
+            }
+            for first_seen, last_seen, message_count, status, status_updated,
+                latitude, longitude, values in zip(
+                    self._first_seen[rows].tolist(),
+                    self._last_seen[rows].tolist(),
+                    self._message_count[rows].tolist(),
+                    statuses,
+                    self._status_updated[rows].tolist(),
+                    latitudes,
+                    longitudes,
+                    last_values
+                )
+        ]
+
+    def get(self, sensor_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of one sensor, or None if unknown."""
+        with self._lock:
+            row = self._rows.get(sensor_id)
+            return self._records(np.array([row]))[0] if row is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every registered sensor."""
+        with self._lock:
+            sensor_ids = list(self._rows)
+            rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(sensor_ids))
+            return dict(zip(sensor_ids, self._records(rows)))
+
+    def sensor_ids(self) -> List[str]:
+        """IDs of every registered sensor."""
+        with self._lock:
+            return list(self._rows)
+
+    def recent_readings(self, sensor_id: str) -> List[Dict[str, Any]]:
+        """A sensor's buffered readings, oldest first."""
+        with self._lock:
+            row = self._rows.get(sensor_id)
+            if row is None:
+                return []
+
+            order = np.roll(np.arange(self.history_size), -int(self._heads[row]))
+            times = self._reading_times[row, order]
+            values = self._readings[row, order]
+
+        return [
+            {
+                "timestamp": _isoformat(float(timestamp)),
+                **{
+                    field: float(value)
+                    for field, value in zip(READING_FIELDS, reading) if not np.isnan(value)
+                }
+            }
+            for timestamp, reading in zip(times, values) if not np.isnan(timestamp)
+        ]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the columnar storage."""
+        return sum(column.nbytes for column in (
+            self._first_seen, self._last_seen, self._status_updated, self._message_count,
+            self._latitude, self._longitude, self._status, self._heads,
+            self._readings, self._reading_times
+        ))
+
+    def __len__(self) -> int:
+        """Number of registered sensors."""
+        return len(self._rows)
+
+    def __contains__(self, sensor_id: str) -> bool:
+        """Whether a sensor is registered."""
+        return sensor_id in self._rows
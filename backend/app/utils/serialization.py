@@ -0,0 +1,73 @@
+"""Fast JSON responses for list endpoints built from column projections."""
+
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def response_columns(model, schema: Type[BaseModel]) -> List[Any]:
+    """Table columns of ``model`` backing every field of ``schema``, in schema order.
+
+    Selecting these instead of the entity skips ORM identity-map bookkeeping
+    and loads exactly what the response needs.
+    """
+    columns = model.__table__.columns
+    missing = [name for name in schema.model_fields if name not in columns]
+    if missing:
+        raise ValueError(f"{schema.__name__} fields without a {model.__name__} column: {missing}")
+    return [columns[name] for name in schema.model_fields]
+
+
+def parse_json_list(value: Any) -> Any:
+    """Decode a list stored as a JSON string, like the schema validators do."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    return value
+
+
+def _default(value: Any) -> Any:
+    """Standard-library fallback matching orjson's output for non-JSON types."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset().total_seconds() == 0:
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON the way pydantic renders response models, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+def rows_response(
+    rows: Iterable[Any],
+    converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """JSON array response from projected rows, skipping per-row model validation.
+
+    ``converters`` post-process individual columns (e.g. JSON text columns).
+    """
+    items = [row._asdict() for row in rows]
+    for name, convert in (converters or {}).items():
+        for item in items:
+            item[name] = convert(item[name])
+    return Response(content=dumps(items), media_type="application/json", headers=headers)
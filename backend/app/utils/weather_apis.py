@@ -3,35 +3,58 @@
 import logging
 import asyncio
 import aiohttp
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import json
 
 from app.core.config import settings
+from app.utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# OpenWeatherMap accepts at most this many city IDs per group request
+OPENWEATHER_GROUP_SIZE = 20
+
 
 class WeatherAPIClient:
     """Client for various weather APIs."""
     
-    def __init__(self):
-        """Initialize weather API client."""
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        limiter: Optional[TokenBucket] = None,
+        concurrency: int = 10,
+        openweather_base_url: Optional[str] = None
+    ):
+        """Initialize weather API client.
+        
+        A caller-supplied ``session`` is shared and left open on exit. When a
+        ``limiter`` is given, every OpenWeatherMap request takes one token.
+        """
         self.openweather_api_key = settings.OPENWEATHERMAP_API_KEY
         self.noaa_api_key = settings.NOAA_API_KEY
-        self.session = None
+        self.openweather_base_url = (
+            openweather_base_url or settings.OPENWEATHER_BASE_URL
+        ).rstrip("/")
+        self.session = session
+        self._owns_session = session is None
+        self.limiter = limiter
+        self.concurrency = max(1, concurrency)
+        self.group_supported = True
+        self._city_ids: Dict[Tuple[float, float], int] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={"User-Agent": "ClimateGuardian-AI/1.0"}
-        )
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={"User-Agent": "ClimateGuardian-AI/1.0"}
+            )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        if self._owns_session and self.session:
             await self.session.close()
     
     async def get_current_weather_openweather(
@@ -45,26 +68,150 @@ class WeatherAPIClient:
                 logger.warning("OpenWeatherMap API key not configured")
                 return None
             
-            url = "https://api.openweathermap.org/data/2.5/weather"
-            params = {
-                "lat": latitude,
-                "lon": longitude,
-                "appid": self.openweather_api_key,
-                "units": "metric"
-            }
-            
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_openweather_current(data)
-                else:
-                    logger.error(f"OpenWeatherMap API error: {response.status}")
-                    return None
+            data = await self._fetch_openweather_point(latitude, longitude)
+            return self._parse_openweather_current(data) if data else None
                     
         except Exception as e:
             logger.error(f"Error fetching OpenWeatherMap current weather: {e}")
             return None
     
+    async def _fetch_openweather_point(
+        self,
+        latitude: float,
+        longitude: float
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch the raw current weather response for one coordinate.
+        
+        The city ID in the response is remembered so later calls for the
+        same coordinate can be served by a group request.
+        """
+        url = f"{self.openweather_base_url}/weather"
+        params = {
+            "lat": latitude,
+            "lon": longitude,
+            "appid": self.openweather_api_key,
+            "units": "metric"
+        }
+        
+        if self.limiter:
+            await self.limiter.acquire()
+        async with self.session.get(url, params=params) as response:
+            if response.status != 200:
+                logger.error(f"OpenWeatherMap API error: {response.status}")
+                return None
+            data = await response.json()
+        
+        if data.get("id"):
+            self._city_ids[self._location_key(latitude, longitude)] = data["id"]
+        return data
+    
+    async def _fetch_openweather_group(
+        self,
+        city_ids: List[int]
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Fetch raw current weather for up to ``OPENWEATHER_GROUP_SIZE`` cities.
+        
+        Returns responses keyed by city ID, or None when the request failed.
+        """
+        url = f"{self.openweather_base_url}/group"
+        params = {
+            "id": ",".join(str(city_id) for city_id in city_ids),
+            "appid": self.openweather_api_key,
+            "units": "metric"
+        }
+        
+        if self.limiter:
+            await self.limiter.acquire()
+        async with self.session.get(url, params=params) as response:
+            if response.status in (401, 403, 404):
+                logger.warning(
+                    f"OpenWeatherMap group endpoint unavailable ({response.status}), "
+                    f"falling back to per-location requests"
+                )
+                self.group_supported = False
+                return None
+            if response.status != 200:
+                logger.error(f"OpenWeatherMap group API error: {response.status}")
+                return None
+            data = await response.json()
+        
+        return {item["id"]: item for item in data.get("list", []) if item.get("id")}
+    
+    def _location_key(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Key a coordinate for the learned city ID lookup."""
+        return round(float(latitude), 4), round(float(longitude), 4)
+    
+    async def get_current_weather_openweather_many(
+        self,
+        locations: List[Tuple[float, float]],
+        parse: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get current weather for many coordinates with as few requests as possible.
+        
+        Coordinates whose OpenWeatherMap city is known are packed into group
+        requests and the results split back per coordinate; the rest, and any
+        the group endpoint could not serve, fall back to per-point requests.
+        
+        Args:
+            locations: ``(latitude, longitude)`` pairs.
+            parse: Return parsed readings instead of raw API responses.
+            
+        Returns:
+            One result per location in input order, None where fetching failed.
+        """
+        if not self.openweather_api_key:
+            logger.warning("OpenWeatherMap API key not configured")
+            return [None] * len(locations)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(locations)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        # Group requests for coordinates with a known city
+        by_city: Dict[int, List[int]] = {}
+        if self.group_supported:
+            for position, (latitude, longitude) in enumerate(locations):
+                city_id = self._city_ids.get(self._location_key(latitude, longitude))
+                if city_id is not None:
+                    by_city.setdefault(city_id, []).append(position)
+        
+        async def fetch_group(city_ids: List[int]):
+            async with semaphore:
+                try:
+                    group = await self._fetch_openweather_group(city_ids)
+                except Exception as e:
+                    logger.error(f"Error fetching OpenWeatherMap group: {e}")
+                    return
+            for city_id, item in (group or {}).items():
+                for position in by_city.get(city_id, []):
+                    results[position] = item
+        
+        city_ids = list(by_city)
+        await asyncio.gather(*[
+            fetch_group(city_ids[start:start + OPENWEATHER_GROUP_SIZE])
+            for start in range(0, len(city_ids), OPENWEATHER_GROUP_SIZE)
+        ])
+        
+        # Per-point fallback for everything the group requests did not cover
+        async def fetch_point(position: int):
+            latitude, longitude = locations[position]
+            async with semaphore:
+                try:
+                    results[position] = await self._fetch_openweather_point(latitude, longitude)
+                except Exception as e:
+                    logger.error(f"Error fetching OpenWeatherMap current weather: {e}")
+        
+        await asyncio.gather(*[
+            fetch_point(position)
+            for position, result in enumerate(results) if result is None
+        ])
+        
+        if parse:
+            return [
+                self._parse_openweather_current(result) if result else None
+                for result in results
+            ]
+        return results
+    
     def _parse_openweather_current(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse OpenWeatherMap current weather response."""
         try:
@@ -109,7 +256,7 @@ class WeatherAPIClient:
                 logger.warning("OpenWeatherMap API key not configured")
                 return None
             
-            url = "https://api.openweathermap.org/data/2.5/forecast"
+            url = f"{self.openweather_base_url}/forecast"
             params = {
                 "lat": latitude,
                 "lon": longitude,
@@ -282,7 +429,7 @@ class WeatherAPIClient:
                 logger.warning("OpenWeatherMap API key not configured")
                 return None
             
-            url = "https://api.openweathermap.org/data/2.5/air_pollution"
+            url = f"{self.openweather_base_url}/air_pollution"
             params = {
                 "lat": latitude,
                 "lon": longitude,
@@ -331,23 +478,16 @@ class WeatherAPIClient:
     ) -> List[Dict[str, Any]]:
         """Get weather data for multiple locations concurrently."""
         try:
-            tasks = []
-            for location in locations:
-                lat = location.get("latitude")
-                lon = location.get("longitude")
-                if lat is not None and lon is not None:
-                    task = self.get_current_weather_openweather(lat, lon)
-                    tasks.append(task)
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Filter out exceptions and None results
-            valid_results = [
-                result for result in results 
-                if result is not None and not isinstance(result, Exception)
+            coordinates = [
+                (location["latitude"], location["longitude"])
+                for location in locations
+                if location.get("latitude") is not None and location.get("longitude") is not None
             ]
             
-            return valid_results
+            results = await self.get_current_weather_openweather_many(coordinates)
+            
+            # Filter out failed locations
+            return [result for result in results if result]
             
         except Exception as e:
             logger.error(f"Error fetching multiple locations weather: {e}")
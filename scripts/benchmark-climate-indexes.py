@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark for the climate_data time-series indexes
+Seeds a scratch database, then runs the hot climate_data queries with and
+without the composite indexes and reports their query plans and timings.
+
+The target database is dropped and recreated: point --database-url at a
+scratch database, never at real data.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+# Add backend to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine, insert, select, func, and_, text
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import climate, emergency, user  # noqa: F401  (register models)
+from app.models.climate import ClimateData, WeatherStation
+
+BENCHMARKED_INDEXES = [
+    "ix_climate_data_station_timestamp_source",
+    "ix_climate_data_timestamp_id",
+]
+
+
+def seed(engine, stations: int, readings_per_station: int, now: datetime):
+    """Create the schema and fill it with hourly readings per station"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        db.execute(insert(WeatherStation), [
+            {
+                "station_id": f"BENCH{i:05d}",
+                "name": f"Benchmark station {i}",
+                "latitude": random.uniform(-60, 60),
+                "longitude": random.uniform(-180, 180)
+            }
+            for i in range(stations)
+        ])
+        station_pks = db.execute(select(WeatherStation.id)).scalars().all()
+
+        for station_pk in station_pks:
+            db.execute(insert(ClimateData), [
+                {
+                    "station_id": station_pk,
+                    "timestamp": now - timedelta(hours=hour),
+                    "temperature": random.gauss(15, 8),
+                    "humidity": random.uniform(20, 100),
+                    "pressure": random.gauss(1013, 8),
+                    "data_source": random.choice(["OpenWeatherMap", "NOAA", "IoT_Sensor"])
+                }
+                for hour in range(readings_per_station)
+            ])
+        db.commit()
+        return station_pks
+
+
+def hot_queries(station_pks, now: datetime):
+    """The climate_data access patterns used by the API, ingestion, ML and retention"""
+    station_pk = station_pks[len(station_pks) // 2]
+    week_ago = now - timedelta(days=7)
+
+    return {
+        "get_climate_data (station, range, newest first)": select(ClimateData).filter(
+            ClimateData.station_id == station_pk,
+            ClimateData.timestamp >= week_ago
+        ).order_by(ClimateData.timestamp.desc()).limit(100),
+        "_get_recent_data_for_location (stations, 7 days)": select(ClimateData).filter(
+            ClimateData.station_id.in_(station_pks[:10]),
+            ClimateData.timestamp >= week_ago
+        ).order_by(ClimateData.station_id, ClimateData.timestamp),
+        "ingestion dedup check": select(
+            ClimateData.station_id, ClimateData.timestamp, ClimateData.data_source
+        ).filter(and_(
+            ClimateData.station_id.in_(station_pks[:20]),
+            ClimateData.timestamp >= now - timedelta(hours=2),
+            ClimateData.timestamp <= now,
+            ClimateData.data_source.in_(["OpenWeatherMap"])
+        )),
+        "training/evaluation loader (last 30 days)": select(ClimateData).filter(
+            ClimateData.timestamp >= now - timedelta(days=30),
+            ClimateData.timestamp <= now
+        ),
+        "cleanup_old_data (expired rows)": select(func.count(ClimateData.id)).filter(
+            ClimateData.timestamp < now - timedelta(days=90)
+        ),
+    }
+
+
+def explain(db: Session, query) -> str:
+    """Query plan of a statement, one line"""
+    compiled = str(query.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN" if db.get_bind().dialect.name == "sqlite" else "EXPLAIN"
+    rows = db.execute(text(f"{prefix} {compiled}")).all()
+    return " | ".join(str(row[-1]).strip() for row in rows)
+
+
+def time_query(db: Session, query, repeat: int) -> float:
+    """Median wall time of a statement in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(query).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_queries(engine, queries, repeat: int):
+    """Plan and median timing of every query"""
+    results = {}
+    with Session(engine) as db:
+        db.execute(text("ANALYZE"))
+        for name, query in queries.items():
+            results[name] = (explain(db, query), time_query(db, query, repeat))
+    return results
+
+
+def set_indexes(engine, enabled: bool):
+    """Create or drop the benchmarked climate_data indexes"""
+    indexes = {index.name: index for index in ClimateData.__table__.indexes}
+    for name in BENCHMARKED_INDEXES:
+        if enabled:
+            indexes[name].create(bind=engine, checkfirst=True)
+        else:
+            indexes[name].drop(bind=engine, checkfirst=True)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark climate_data indexes')
+    parser.add_argument('--database-url', default='sqlite:///./benchmark_climate.db',
+                        help='Scratch database URL (dropped and recreated)')
+    parser.add_argument('--stations', type=int, default=100, help='Number of stations')
+    parser.add_argument('--readings-per-station', type=int, default=24 * 120,
+                        help='Hourly readings per station')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per query')
+
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+    print(f"Seeding {args.stations * args.readings_per_station} readings...")
+    station_pks = seed(engine, args.stations, args.readings_per_station, now)
+    queries = hot_queries(station_pks, now)
+
+    set_indexes(engine, False)
+    without = run_queries(engine, queries, args.repeat)
+    set_indexes(engine, True)
+    with_indexes = run_queries(engine, queries, args.repeat)
+
+    for name in queries:
+        plan_before, ms_before = without[name]
+        plan_after, ms_after = with_indexes[name]
+        print(f"\n{name}")
+        print(f"  without indexes: {ms_before:9.2f} ms  {plan_before}")
+        print(f"  with indexes:    {ms_after:9.2f} ms  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
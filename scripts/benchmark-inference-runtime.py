@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark for the NumPy inference runtime
+Builds the weather and risk model architectures, exports them for the NumPy
+runtime and compares serving latency against Keras for risk batches and
+batched multi-hour forecast rollouts.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+# Add backend to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import numpy as np
+
+from app.ml.models.risk_analyzer import RiskAnalyzer
+from app.ml.models.weather_predictor import WeatherPredictor
+from app.ml.runtime import NumpyModel
+from app.services.forecast_engine import BatchForecastEngine
+
+
+def time_call(function, repeat: int) -> float:
+    """Median wall time of a call in milliseconds, after one warm-up call"""
+    function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(name: str, keras_ms: float, numpy_ms: float):
+    """Print one comparison line"""
+    print(f"  {name:<32} keras {keras_ms:9.2f} ms   numpy {numpy_ms:9.2f} ms   {keras_ms / numpy_ms:6.1f}x")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the NumPy inference runtime')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement')
+    parser.add_argument('--hours', type=int, default=24, help='Forecast horizon')
+
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as model_path:
+        weather = WeatherPredictor(model_path)
+        weather.model = weather.build_model((weather.sequence_length, len(weather.feature_columns)))
+        weather_runtime = NumpyModel.load(weather.export_runtime())
+
+        risk = RiskAnalyzer(model_path)
+        risk.model = risk.build_model(len(risk.feature_columns))
+        risk_runtime = NumpyModel.load(risk.export_runtime())
+
+        for name in sorted(os.listdir(model_path)):
+            print(f"{name}: {os.path.getsize(os.path.join(model_path, name)) / 1024:.1f} KiB")
+
+    print("\nRisk assessment (model.predict per batch)")
+    for batch_size in (1, 64, 1024):
+        features = rng.normal(size=(batch_size, len(risk.feature_columns))).astype(np.float32)
+        report(
+            f"batch {batch_size}",
+            time_call(lambda: risk.model.predict(features, batch_size=batch_size, verbose=0), args.repeat),
+            time_call(lambda: risk_runtime.predict(features), args.repeat)
+        )
+
+    print(f"\nWeather forecast ({args.hours}-step batched rollout)")
+    keras_engine = BatchForecastEngine(weather.model, weather.sequence_length, len(weather.feature_columns))
+    numpy_engine = BatchForecastEngine(weather_runtime, weather.sequence_length, len(weather.feature_columns))
+    for batch_size in (1, 32):
+        windows = rng.normal(
+            size=(batch_size, weather.sequence_length, len(weather.feature_columns))
+        ).astype(np.float32)
+        report(
+            f"{batch_size} locations",
+            time_call(lambda: keras_engine.forecast(windows, args.hours), args.repeat),
+            time_call(lambda: numpy_engine.forecast(windows, args.hours), args.repeat)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -21,9 +21,10 @@ import schedule
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from app.db.database import SessionLocal, engine
+from app.db.partitioning import cleanup_old_data
 from app.models.climate import ClimateData, WeatherStation
 from app.services.data_ingestion import DataIngestionService
-from app.services.ai_prediction import AIPredictionService
+from app.services.ai_prediction import PredictionService
 from app.core.config import settings
 
 # Configure logging
@@ -45,7 +46,8 @@ class DataSyncManager:
     def __init__(self):
         self.db = SessionLocal()
         self.data_ingestion_service = DataIngestionService()
-        self.ai_prediction_service = AIPredictionService()
+        # Models are loaded once, on first use, through the shared model registry
+        self.ai_prediction_service = PredictionService()
         self.sync_stats = {
             'start_time': None,
             'end_time': None,
@@ -273,24 +275,30 @@ class DataSyncManager:
                 WeatherStation.is_active == True
             ).all()
             
-            for station in stations:
-                try:
-                    # Generate weather forecast
-                    forecast = await self.ai_prediction_service.generate_weather_forecast(
-                        station_id=station.id,
-                        hours=24
-                    )
-                    
-                    # Generate risk assessment
-                    risk_assessment = await self.ai_prediction_service.generate_risk_assessment(
-                        station_id=station.id
-                    )
-                    
-                    predictions_generated += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error generating predictions for station {station.id}: {str(e)}")
-                    self.sync_stats['errors'] += 1
+            try:
+                # Forecast every station location in one batched rollout
+                await self.ai_prediction_service.generate_forecasts(
+                    [(station.latitude, station.longitude) for station in stations],
+                    hours=24,
+                    db=self.db
+                )
+                
+                # Score the latest reading of every station in one model call
+                latest_by_station = {}
+                for data in recent_data:
+                    latest = latest_by_station.get(data.station_id)
+                    if latest is None or data.timestamp > latest.timestamp:
+                        latest_by_station[data.station_id] = data
+                
+                await self.ai_prediction_service.generate_risk_assessments(
+                    list(latest_by_station.values()), self.db
+                )
+                
+                predictions_generated = len(stations)
+                
+            except Exception as e:
+                logger.error(f"Error generating predictions: {str(e)}")
+                self.sync_stats['errors'] += 1
             
             logger.info(f"Generated predictions for {predictions_generated} stations")
             return {'predictions_generated': predictions_generated}
@@ -305,18 +313,15 @@ class DataSyncManager:
         logger.info("Cleaning up old data")
         
         try:
-            # Remove data older than retention period
-            retention_days = getattr(settings, 'DATA_RETENTION_DAYS', 90)
-            cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-            
-            deleted_count = self.db.query(ClimateData).filter(
-                ClimateData.timestamp < cutoff_date
-            ).delete()
-            
-            self.db.commit()
-            
-            logger.info(f"Cleaned up {deleted_count} old records")
-            return {'records_deleted': deleted_count}
+            # Drops expired monthly partitions when climate_data is partitioned,
+            # otherwise deletes expired rows
+            result = cleanup_old_data(self.db, settings.DATA_RETENTION_DAYS)
+            
+            logger.info(f"Cleaned up {result['records_deleted']} old records")
+            return {
+                'records_deleted': result['records_deleted'],
+                'partitions_dropped': result['partitions_dropped']
+            }
             
         except Exception as e:
             logger.error(f"Data cleanup failed: {str(e)}")